@@ -0,0 +1,360 @@
+import gzip
+import io
+import json
+import os
+import posixpath
+import tarfile
+import time
+import zipfile
+
+from mavetools.client.manifest import write_atomic
+
+
+ARCHIVE_INDEX_VERSION = 1
+
+
+def source_signature(filepath):
+    """
+    Returns a string that changes whenever the file is modified.
+    """
+    stat = os.stat(filepath)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _clone_prefix(names):
+    # Archives usually wrap the clone in a top-level folder, the clone root is the folder of
+    # the least nested main.json
+    candidates = [name for name in names if posixpath.basename(name) == "main.json"]
+    if len(candidates) == 0:
+        return ""
+    root = posixpath.dirname(min(candidates, key=lambda name: name.count("/")))
+    return "" if root == "" else f"{root}/"
+
+
+class _BoundedReader(io.RawIOBase):
+    """
+    Raw reader of the next size bytes of a stream that is positioned at the start of a member.
+    """
+
+    def __init__(self, stream, size):
+        self.stream = stream
+        self.remaining = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = min(len(b), self.remaining)
+        if n == 0:
+            return 0
+        data = self.stream.read(n)
+        b[: len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self.stream.close()
+        super().close()
+
+
+class DirectoryClone:
+    """
+    A local clone stored as a plain directory.
+
+    DirectoryClone, ZipClone and TarClone share one interface, so that LocalClient reads the
+    files of a clone (main.json, csv/*.scores.csv) by their names relative to the clone root,
+    wherever they are stored.
+
+    random_access is False for clones whose files can only be read in order (compressed tars),
+    where files are best read together with iter_files.
+    """
+
+    random_access = True
+
+    def __init__(self, path):
+        self.path = path
+
+    def exists(self, name):
+        return os.path.isfile(f"{self.path}/{name}")
+
+    def open(self, name):
+        """
+        Opens a file of the clone for reading in binary mode.
+        """
+        return open(f"{self.path}/{name}", "rb")
+
+    def open_text(self, name):
+        """
+        Opens a file of the clone for reading in text mode.
+        """
+        return open(f"{self.path}/{name}", "r")
+
+    def iter_files(self, names):
+        """
+        Opens many files of the clone one after another, in the order they are stored.
+
+        Yields
+        ------
+
+        name, f
+            The name and the binary file object of every file in names. The file object is
+            closed when the next file is opened.
+        """
+        for name in names:
+            f = self.open(name)
+            try:
+                yield name, f
+            finally:
+                f.close()
+
+    def mtime(self, name):
+        """
+        Returns the modification time of a file in seconds since the epoch.
+        """
+        return os.path.getmtime(f"{self.path}/{name}")
+
+    def signature(self, name):
+        """
+        Returns a string that changes whenever the file is modified.
+        """
+        return source_signature(f"{self.path}/{name}")
+
+    def list(self, folder):
+        """
+        Returns the names of the files directly inside a folder of the clone.
+        """
+        path = f"{self.path}/{folder}"
+        if not os.path.isdir(path):
+            return []
+        return sorted(filename for filename in os.listdir(path) if os.path.isfile(f"{path}/{filename}"))
+
+    def close(self):
+        pass
+
+
+class _ArchiveClone:
+    """
+    Shared logic of the archive backed clones, which look up members in self.members.
+    """
+
+    random_access = True
+
+    def exists(self, name):
+        return name in self.members
+
+    def open_text(self, name):
+        return io.TextIOWrapper(self.open(name), encoding="utf-8")
+
+    def iter_files(self, names):
+        for name in names:
+            f = self.open(name)
+            try:
+                yield name, f
+            finally:
+                f.close()
+
+    def list(self, folder):
+        prefix = f"{folder.rstrip('/')}/"
+        return sorted(
+            name[len(prefix) :] for name in self.members if name.startswith(prefix) and "/" not in name[len(prefix) :]
+        )
+
+
+class ZipClone(_ArchiveClone):
+    """
+    A local clone stored in a zip archive. The central directory of the archive is its member
+    index, so every member is opened directly without reading the others.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.zip_file = zipfile.ZipFile(path)
+        self.pid = os.getpid()
+        infos = [info for info in self.zip_file.infolist() if not info.is_dir()]
+        prefix = _clone_prefix([info.filename for info in infos])
+        self.members = {
+            info.filename[len(prefix) :]: info for info in infos if info.filename.startswith(prefix)
+        }
+
+    def open(self, name):
+        # a forked process would share the file offset of the archive handle, so it opens its own
+        if self.pid != os.getpid():
+            self.zip_file = zipfile.ZipFile(self.path)
+            self.pid = os.getpid()
+        return self.zip_file.open(self.members[name])
+
+    def mtime(self, name):
+        return time.mktime(self.members[name].date_time + (0, 0, -1))
+
+    def signature(self, name):
+        info = self.members[name]
+        return f"{info.file_size}:{info.CRC}"
+
+    def close(self):
+        self.zip_file.close()
+
+
+class TarClone(_ArchiveClone):
+    """
+    A local clone stored in a tar archive, plain or compressed with gzip (.tar.gz) or
+    zstandard (.tar.zst, needs the zstandard package).
+
+    The member index maps every member to the offset of its data in the uncompressed stream.
+    It is built by one pass over the archive and saved to index_path if given. Members of a
+    plain tar are read by seeking to their offset. Compressed tars have no random access,
+    opening a member decompresses the archive up to it; iter_files reads many members in a
+    single pass over the archive instead.
+    """
+
+    def __init__(self, path, compression=None, index_path=None):
+        """
+        Opens the archive.
+
+        Parameters
+        ----------
+
+        path
+            Path to the archive.
+
+        compression
+            None, "gz" or "zst".
+
+        index_path
+            Path to the json file the member index is cached in, None to build it on every open.
+        """
+
+        self.path = path
+        self.compression = compression
+        self.random_access = compression is None
+        if compression == "zst":
+            try:
+                import zstandard
+            except ImportError:
+                raise ImportError("Reading .tar.zst clones requires the zstandard package") from None
+            self.zstandard = zstandard
+
+        self.signature_of_archive = source_signature(path)
+        self.members = None
+        if index_path is not None and os.path.exists(index_path):
+            f = open(index_path, "r")
+            content = json.load(f)
+            f.close()
+            if content.get("version") == ARCHIVE_INDEX_VERSION and content.get("source") == self.signature_of_archive:
+                self.members = content["members"]
+        if self.members is None:
+            self.members = self.build_index()
+            if index_path is not None:
+                content = {"version": ARCHIVE_INDEX_VERSION, "source": self.signature_of_archive, "members": self.members}
+                write_atomic(index_path, json.dumps(content).encode())
+
+    def _open_stream(self):
+        if self.compression == "gz":
+            return gzip.open(self.path, "rb")
+        f = open(self.path, "rb")
+        if self.compression == "zst":
+            return self.zstandard.ZstdDecompressor().stream_reader(f, closefd=True)
+        return f
+
+    def build_index(self):
+        """
+        Reads all member headers of the archive.
+
+        Returns
+        -------
+
+        members
+            A dictionary mapping member names relative to the clone root to
+            [offset of the data, size, mtime].
+        """
+
+        stream = self._open_stream()
+        try:
+            tar = tarfile.open(fileobj=stream, mode="r|")
+            entries = [(info.name, [info.offset_data, info.size, info.mtime]) for info in tar if info.isfile()]
+            tar.close()
+        finally:
+            stream.close()
+        prefix = _clone_prefix([name for name, _ in entries])
+        return {name[len(prefix) :]: entry for name, entry in entries if name.startswith(prefix)}
+
+    def open(self, name):
+        offset, size, _ = self.members[name]
+        stream = self._open_stream()
+        if self.compression is None:
+            stream.seek(offset)
+        else:
+            # compressed streams only seek forward by decompressing
+            remaining = offset
+            while remaining > 0:
+                skipped = len(stream.read(min(remaining, 1 << 20)))
+                if skipped == 0:
+                    break
+                remaining -= skipped
+        return io.BufferedReader(_BoundedReader(stream, size))
+
+    def iter_files(self, names):
+        # one pass over the stream, the members are recognized by the offsets of their data
+        wanted = {self.members[name][0]: name for name in names}
+        if len(wanted) == 0:
+            return
+        stream = self._open_stream()
+        try:
+            tar = tarfile.open(fileobj=stream, mode="r|")
+            for info in tar:
+                name = wanted.pop(info.offset_data, None) if info.isfile() else None
+                if name is None:
+                    continue
+                f = tar.extractfile(info)
+                try:
+                    yield name, f
+                finally:
+                    f.close()
+                if len(wanted) == 0:
+                    break
+            tar.close()
+        finally:
+            stream.close()
+
+    def mtime(self, name):
+        return self.members[name][2]
+
+    def signature(self, name):
+        offset, size, mtime = self.members[name]
+        return f"{size}:{mtime}:{self.signature_of_archive}"
+
+    def close(self):
+        pass
+
+
+def open_clone(path, index_path=None):
+    """
+    Opens a local clone, either a directory or an archive (.zip, .tar, .tar.gz, .tgz, .tar.zst, .tzst).
+
+    Parameters
+    ----------
+
+    path
+        Path to the clone directory or archive.
+
+    index_path
+        Path to the json file the member index of a tar archive is cached in.
+
+    Returns
+    -------
+
+    clone
+        A DirectoryClone, ZipClone or TarClone instance.
+    """
+
+    if os.path.isdir(path):
+        return DirectoryClone(path)
+    if path.endswith(".zip"):
+        return ZipClone(path)
+    if path.endswith(".tar"):
+        return TarClone(path, index_path=index_path)
+    if path.endswith((".tar.gz", ".tgz")):
+        return TarClone(path, compression="gz", index_path=index_path)
+    if path.endswith((".tar.zst", ".tzst")):
+        return TarClone(path, compression="zst", index_path=index_path)
+    raise ValueError(f"{path} is neither a directory nor a supported archive")
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import threading
+import time
+
+import attr
+
+
+@attr.s
+class ItemResult:
+    """
+    Outcome of one item of a batch operation: either a value or the error that occurred.
+    """
+
+    key = attr.ib()
+    value = attr.ib(default=None)
+    error = attr.ib(default=None)
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class RequestCoalescer:
+    """
+    Shares in-flight calls between callers: while a call for a key is running, further
+    submissions with the same key get the future of the running call instead of a new one.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = {}
+
+    def submit(self, executor, key, func, *args):
+        """
+        Submits func(*args) to an executor, unless a call with the same key is in flight.
+
+        Parameters
+        ----------
+
+        executor
+            A concurrent.futures executor.
+
+        key
+            Hashable identifier of the call.
+
+        func
+            The function to call.
+
+        Returns
+        -------
+
+        future
+            The future of the new or the already running call.
+        """
+
+        with self.lock:
+            future = self.in_flight.get(key)
+            if future is not None and not future.done():
+                return future
+            future = executor.submit(func, *args)
+            self.in_flight[key] = future
+        future.add_done_callback(lambda f: self._done(key, f))
+        return future
+
+    def _done(self, key, future):
+        with self.lock:
+            if self.in_flight.get(key) is future:
+                del self.in_flight[key]
+
+
+class TokenBucket:
+    """
+    Client-side rate limiter: tokens are refilled at a constant rate up to a burst size,
+    every call takes one token and waits if there is none.
+    """
+
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        """
+        Initializes a full bucket.
+
+        Parameters
+        ----------
+
+        rate
+            Number of tokens refilled per second.
+
+        burst
+            Maximum number of tokens in the bucket.
+
+        clock
+            Function returning the current time in seconds.
+
+        sleep
+            Function used to wait for tokens.
+        """
+
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = burst
+        self.last = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Takes one token, waits until one is available if the bucket is empty.
+        """
+
+        while True:
+            with self.lock:
+                now = self.clock()
+                self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            self.sleep(delay)
+
+
+def idempotency_key(url, payload, files, chunk_size=1 << 16):
+    """
+    Derives a stable idempotency key for a POST request, so that a retried upload of the same
+    model can be recognized by the server.
+
+    The content of every attached file is hashed, the files are rewound to their previous
+    position afterwards.
+
+    Parameters
+    ----------
+
+    url
+        Url the payload is posted to.
+
+    payload
+        json payload of the request.
+
+    files
+        Dictionary of multipart file tuples (filename, file object or content, content type).
+
+    chunk_size
+        Number of bytes read from a file at once.
+
+    Returns
+    -------
+
+    key
+        The key as a hex string.
+    """
+
+    h = hashlib.sha256(url.encode())
+    h.update(json.dumps(payload, sort_keys=True, default=str).encode())
+    for field in sorted(files):
+        filename, content = files[field][0], files[field][1]
+        h.update(f"{field}:{filename}:".encode())
+        if isinstance(content, str):
+            h.update(content.encode())
+        elif isinstance(content, bytes):
+            h.update(content)
+        else:
+            position = content.tell()
+            chunk = content.read(chunk_size)
+            while chunk:
+                h.update(chunk.encode() if isinstance(chunk, str) else chunk)
+                chunk = content.read(chunk_size)
+            content.seek(position)
+    return h.hexdigest()
@@ -0,0 +1,239 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from mavetools.client.exceptions import MaveDBOfflineError
+from mavetools.client.manifest import write_atomic
+
+
+class ResponseCache:
+    """
+    A persistent on-disk cache of HTTP response bodies keyed by url.
+
+    The ETag and Last-Modified headers of every stored response are kept, so that repeated
+    requests can be revalidated with If-None-Match/If-Modified-Since and a 304 answer is
+    served from disk. The cache is bounded in size and evicts the least recently used
+    responses first. In offline mode no requests are sent at all.
+    """
+
+    def __init__(self, directory, max_bytes=1 << 30, offline=False):
+        """
+        Opens a cache directory, which is created if it does not exist.
+
+        Parameters
+        ----------
+
+        directory
+            Path to the cache directory.
+
+        max_bytes
+            Maximum total size of all cached bodies.
+
+        offline
+            When True, requests are only answered from the cache.
+        """
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+
+        self.sizes = {}
+        for filename in os.listdir(directory):
+            if filename.endswith(".body"):
+                key = filename[: -len(".body")]
+                self.sizes[key] = os.path.getsize(os.path.join(directory, filename))
+
+    def key(self, url):
+        """
+        Returns the cache key of an url.
+        """
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, f"{key}.{suffix}")
+
+    def size(self):
+        """
+        Returns the total size of all cached bodies in bytes.
+        """
+        with self.lock:
+            return sum(self.sizes.values())
+
+    def lookup(self, url):
+        """
+        Getter for the stored headers of an url.
+
+        Returns
+        -------
+
+        entry
+            A dictionary with url, etag, last_modified and size, None if the url is not cached.
+        """
+
+        key = self.key(url)
+        with self.lock:
+            if key not in self.sizes:
+                return None
+            try:
+                f = open(self._path(key, "json"), "r")
+                entry = json.load(f)
+                f.close()
+            except (OSError, ValueError):
+                return None
+        return entry
+
+    def read(self, url):
+        """
+        Reads the cached body of an url and marks it as recently used.
+
+        Returns
+        -------
+
+        content
+            The body as bytes, None if the url is not cached.
+        """
+
+        key = self.key(url)
+        with self.lock:
+            if key not in self.sizes:
+                return None
+            body_path = self._path(key, "body")
+            try:
+                f = open(body_path, "rb")
+                content = f.read()
+                f.close()
+                os.utime(body_path)
+            except OSError:
+                return None
+        return content
+
+    def conditional_headers(self, url):
+        """
+        Returns the If-None-Match/If-Modified-Since headers that revalidate a cached url.
+        """
+
+        entry = self.lookup(url)
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.get("etag") is not None:
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified") is not None:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url, content, headers):
+        """
+        Stores the body of a response and evicts old entries if the cache grew too large.
+
+        Parameters
+        ----------
+
+        url
+            Requested url.
+
+        content
+            Body of the response as bytes.
+
+        headers
+            Headers of the response.
+        """
+
+        if len(content) > self.max_bytes:
+            return
+        key = self.key(url)
+        entry = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "size": len(content),
+            "stored": time.time(),
+        }
+        with self.lock:
+            write_atomic(self._path(key, "body"), content)
+            write_atomic(self._path(key, "json"), json.dumps(entry).encode())
+            self.sizes[key] = len(content)
+            self.evict()
+
+    def evict(self):
+        """
+        Removes least recently used entries until the cache fits into max_bytes.
+        """
+
+        with self.lock:
+            total = sum(self.sizes.values())
+            if total <= self.max_bytes:
+                return
+            last_used = []
+            for key in self.sizes:
+                try:
+                    last_used.append((os.path.getmtime(self._path(key, "body")), key))
+                except OSError:
+                    last_used.append((0.0, key))
+            last_used.sort()
+            for _, key in last_used:
+                if total <= self.max_bytes:
+                    break
+                total -= self.sizes.pop(key)
+                for suffix in ("body", "json"):
+                    try:
+                        os.remove(self._path(key, suffix))
+                    except OSError:
+                        pass
+
+    def clear(self):
+        """
+        Removes all entries.
+        """
+        with self.lock:
+            max_bytes = self.max_bytes
+            self.max_bytes = -1
+            self.evict()
+            self.max_bytes = max_bytes
+
+    def fetch(self, session, url):
+        """
+        Performs a GET request through the cache.
+
+        Parameters
+        ----------
+
+        session
+            MaveSession used for the request.
+
+        url
+            Requested url.
+
+        Returns
+        -------
+
+        content
+            The body of the response as bytes.
+
+        Raises
+        ------
+        MaveDBOfflineError
+            If the cache is in offline mode and the url is not cached.
+        """
+
+        if self.offline:
+            content = self.read(url)
+            if content is None:
+                raise MaveDBOfflineError(f"{url} is not cached")
+            return content
+
+        headers = self.conditional_headers(url)
+        r = session.get(url, headers=headers)
+        if r.status_code == 304:
+            content = self.read(url)
+            if content is not None:
+                return content
+            # The entry was evicted in the meantime
+            r = session.get(url)
+        content = r.content
+        self.store(url, content, r.headers)
+        return content
@@ -0,0 +1,423 @@
+import json
+import os
+import sqlite3
+import urllib.parse
+
+from mavetools.client.archive import DirectoryClone
+from mavetools.client.json_stream import iter_experiment_sets
+from mavetools.client.urn_index import UrnIndex
+
+
+CATALOG_VERSION = 2
+READ_ONLY_MMAP_SIZE = 1 << 40
+
+
+def scoreset_organism(scoreset):
+    """
+    Returns the organism name of the first target of a scoreset, None if it has none.
+    """
+
+    try:
+        return scoreset["target"]["reference_maps"][0]["genome"]["organism_name"]
+    except (KeyError, IndexError, TypeError):
+        pass
+    try:
+        return scoreset["targetGenes"][0]["targetSequence"]["taxonomy"]["organismName"]
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def experiment_record(experiment_set_urn, experiment):
+    """
+    Returns the metadata of an experiment of main.json without its nested scoresets, which are
+    referenced by urn (scoreSetUrns) like in the experiment records of the MaveDB API.
+    """
+
+    record = {key: value for key, value in experiment.items() if key != "scoreSets"}
+    record.setdefault("experimentSetUrn", experiment_set_urn)
+    record.setdefault("scoreSetUrns", [scoreset["urn"] for scoreset in experiment.get("scoreSets") or []])
+    return record
+
+
+def scoreset_category(scoreset):
+    """
+    Returns the category of the first target gene of a scoreset, None if it has none.
+    """
+
+    try:
+        return scoreset["targetGenes"][0]["category"]
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+class Catalog:
+    """
+    A persistent SQLite index of the scoresets of a local MaveDB clone.
+
+    The catalog is built once from main.json and reused until main.json changes. It stores
+    every scoreset's metadata keyed by urn, together with the fields used for filtering,
+    so that opening it is cheap and lookups by urn are indexed.
+    """
+
+    def __init__(self, path, read_only=False):
+        """
+        Opens an existing catalog.
+
+        Parameters
+        ----------
+
+        path
+            Path to the SQLite file.
+
+        read_only
+            When True, the catalog is opened read-only and read through a memory mapping, so that
+            processes reading the same catalog share its pages instead of each filling a private
+            page cache.
+        """
+
+        self.path = path
+        self.read_only = read_only
+        self._connection = None
+        self._pid = None
+
+    @property
+    def connection(self):
+        """
+        The database connection of the current process. SQLite connections must not be used
+        across a fork, so a forked process opens its own connection on first use.
+        """
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = self.connect()
+            self._pid = os.getpid()
+        return self._connection
+
+    def connect(self):
+        """
+        Opens a new database connection.
+        """
+        if not self.read_only:
+            return sqlite3.connect(self.path, check_same_thread=False)
+        uri = f"file:{urllib.parse.quote(os.path.abspath(self.path))}?mode=ro"
+        connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        connection.execute(f"PRAGMA mmap_size = {READ_ONLY_MMAP_SIZE}")
+        return connection
+
+    def __getstate__(self):
+        # a pickled catalog reopens the database in the receiving process
+        return {"path": self.path, "read_only": self.read_only}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], read_only=state["read_only"])
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+    @classmethod
+    def build(cls, scoresets, path, source=None, experiments=()):
+        """
+        Builds a new catalog, replacing an existing one.
+
+        Parameters
+        ----------
+
+        scoresets
+            Iterable of (experiment_set_urn, experiment_urn, scoreset) tuples,
+            see json_stream.iter_scoresets.
+
+        path
+            Path to the SQLite file.
+
+        source
+            Signature of the source the catalog was built from, see archive.source_signature.
+
+        experiments
+            Iterable of experiment records, see experiment_record. It is read after scoresets,
+            so it may be filled while scoresets is consumed.
+
+        Returns
+        -------
+
+        catalog
+            The new Catalog instance.
+        """
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.part"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        connection = sqlite3.connect(tmp_path)
+        connection.executescript(
+            """
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE scoresets (
+                urn TEXT PRIMARY KEY,
+                position INTEGER,
+                experiment_urn TEXT,
+                experiment_set_urn TEXT,
+                organism TEXT,
+                category TEXT,
+                num_variants INTEGER,
+                data TEXT
+            );
+            CREATE TABLE keywords (urn TEXT, keyword TEXT);
+            CREATE TABLE experiments (urn TEXT PRIMARY KEY, data TEXT);
+            """
+        )
+        rows = (
+            (
+                scoreset["urn"],
+                position,
+                experiment_urn,
+                experiment_set_urn,
+                scoreset_organism(scoreset),
+                scoreset_category(scoreset),
+                scoreset.get("numVariants"),
+                json.dumps(scoreset),
+            )
+            for position, (experiment_set_urn, experiment_urn, scoreset) in enumerate(scoresets)
+        )
+        connection.executemany("INSERT OR REPLACE INTO scoresets VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        keyword_rows = []
+        for urn, data in connection.execute("SELECT urn, data FROM scoresets"):
+            for keyword in json.loads(data).get("keywords") or []:
+                text = keyword["text"] if isinstance(keyword, dict) else keyword
+                keyword_rows.append((urn, text))
+        connection.executemany("INSERT INTO keywords VALUES (?, ?)", keyword_rows)
+        connection.executemany(
+            "INSERT OR REPLACE INTO experiments VALUES (?, ?)",
+            ((experiment["urn"], json.dumps(experiment)) for experiment in experiments),
+        )
+        connection.executescript(
+            """
+            CREATE INDEX scoresets_position ON scoresets (position);
+            CREATE INDEX scoresets_experiment ON scoresets (experiment_urn);
+            CREATE INDEX scoresets_organism ON scoresets (organism);
+            CREATE INDEX scoresets_category ON scoresets (category);
+            CREATE INDEX keywords_keyword ON keywords (keyword);
+            """
+        )
+        connection.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [("version", str(CATALOG_VERSION)), ("source", source)],
+        )
+        connection.commit()
+        connection.close()
+        os.replace(tmp_path, path)
+        return cls(path)
+
+    @classmethod
+    def for_clone(cls, local_instance_path, filename="catalog.sqlite", clone=None):
+        """
+        Opens the catalog of a local clone, building it first if it is missing or older than
+        the main.json of the clone.
+
+        Parameters
+        ----------
+
+        local_instance_path
+            Path to the local clone, or for archived clones the folder the catalog is written to.
+
+        filename
+            Name of the catalog file inside local_instance_path.
+
+        clone
+            The DirectoryClone, ZipClone or TarClone main.json is read from,
+            by default the directory local_instance_path.
+
+        Returns
+        -------
+
+        catalog
+            A Catalog instance.
+        """
+
+        if clone is None:
+            clone = DirectoryClone(local_instance_path)
+        path = f"{local_instance_path}/{filename}"
+        source = clone.signature("main.json")
+        if os.path.exists(path):
+            catalog = cls(path)
+            if catalog.meta("version") == str(CATALOG_VERSION) and catalog.meta("source") == source:
+                return catalog
+            catalog.close()
+
+        # main.json is streamed, so building needs memory for one experiment set at a time
+        experiments = []
+
+        def walk(f):
+            for experiment_set in iter_experiment_sets(f):
+                for experiment in experiment_set["experiments"]:
+                    experiments.append(experiment_record(experiment_set["urn"], experiment))
+                    for scoreset in experiment["scoreSets"]:
+                        yield experiment_set["urn"], experiment["urn"], scoreset
+
+        f = clone.open_text("main.json")
+        try:
+            return cls.build(walk(f), path, source=source, experiments=experiments)
+        finally:
+            f.close()
+
+    def meta(self, key):
+        """
+        Getter for a value of the meta table, None if it is missing.
+        """
+        try:
+            row = self.connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        except sqlite3.DatabaseError:
+            return None
+        return None if row is None else row[0]
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM scoresets").fetchone()[0]
+
+    def __contains__(self, urn):
+        row = self.connection.execute("SELECT 1 FROM scoresets WHERE urn = ?", (urn,)).fetchone()
+        return row is not None
+
+    def get(self, urn):
+        """
+        Getter for the metadata of a scoreset.
+
+        Parameters
+        ----------
+
+        urn
+            MaveDB urn identifier of a scoreset.
+
+        Returns
+        -------
+
+        scoreset
+            json object of the scoreset metadata.
+
+        Raises
+        ------
+        KeyError
+            If the scoreset is not in the catalog.
+        """
+
+        row = self.connection.execute("SELECT data FROM scoresets WHERE urn = ?", (urn,)).fetchone()
+        if row is None:
+            raise KeyError(urn)
+        return json.loads(row[0])
+
+    def get_experiment(self, urn):
+        """
+        Getter for the metadata of an experiment, see experiment_record.
+
+        Raises
+        ------
+        KeyError
+            If the experiment is not in the catalog.
+        """
+
+        row = self.connection.execute("SELECT data FROM experiments WHERE urn = ?", (urn,)).fetchone()
+        if row is None:
+            raise KeyError(urn)
+        return json.loads(row[0])
+
+    def get_many(self, urns, chunk_size=500):
+        """
+        Getter for the metadata of many scoresets.
+
+        Parameters
+        ----------
+
+        urns
+            List of MaveDB urn identifiers of scoresets.
+
+        chunk_size
+            Number of urns looked up per query.
+
+        Returns
+        -------
+
+        scoresets
+            List of json objects in the order of urns, scoresets that are not in the catalog are left out.
+        """
+
+        urns = list(urns)
+        found = {}
+        for start in range(0, len(urns), chunk_size):
+            chunk = urns[start : start + chunk_size]
+            query = f"SELECT urn, data FROM scoresets WHERE urn IN ({', '.join('?' * len(chunk))})"
+            for urn, data in self.connection.execute(query, chunk):
+                found[urn] = json.loads(data)
+        return [found[urn] for urn in urns if urn in found]
+
+    def urn_index(self):
+        """
+        Builds the UrnIndex of the experiment set -> experiments -> scoresets hierarchy.
+        """
+        return UrnIndex(
+            self.connection.execute(
+                "SELECT experiment_set_urn, experiment_urn, urn FROM scoresets ORDER BY position"
+            )
+        )
+
+    def urns(self):
+        """
+        Returns the urns of all scoresets in main.json order.
+        """
+        return [row[0] for row in self.connection.execute("SELECT urn FROM scoresets ORDER BY position")]
+
+    def iter_scoresets(self, keywords=None, organisms=None, experiment_types=None, limit=None, offset=0):
+        """
+        Yields the metadata of all scoresets that pass the given filters, in main.json order.
+
+        Parameters
+        ----------
+
+        keywords
+            List of keywords. If not None, only scoresets with any of the keywords are yielded.
+
+        organisms
+            List of organisms. If not None, only scoresets of any of the organisms are yielded.
+
+        experiment_types
+            List of experiment types. If not None, only scoresets whose first target gene has
+            any of the categories are yielded.
+
+        limit
+            Maximum number of scoresets yielded, None for all.
+
+        offset
+            Number of matching scoresets skipped.
+
+        Returns
+        -------
+
+        scoresets
+            A generator of json objects.
+        """
+
+        conditions = []
+        params = []
+        if keywords is not None:
+            keywords = list(keywords)
+            placeholders = ", ".join("?" * len(keywords))
+            conditions.append(f"urn IN (SELECT urn FROM keywords WHERE keyword IN ({placeholders}))")
+            params.extend(keywords)
+        if organisms is not None:
+            organisms = list(organisms)
+            conditions.append(f"organism IN ({', '.join('?' * len(organisms))})")
+            params.extend(organisms)
+        if experiment_types is not None:
+            experiment_types = list(experiment_types)
+            conditions.append(f"category IN ({', '.join('?' * len(experiment_types))})")
+            params.extend(experiment_types)
+
+        query = "SELECT data FROM scoresets"
+        if len(conditions) > 0:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY position"
+        if limit is not None or offset > 0:
+            query += " LIMIT ? OFFSET ?"
+            params.extend([-1 if limit is None else limit, offset])
+        for row in self.connection.execute(query, params):
+            yield json.loads(row[0])
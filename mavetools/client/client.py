@@ -1,108 +1,113 @@
+import errno
+import gzip
+import hashlib
+import io
 import json
 import logging
-import requests
-import sys
 import os
-
-from mavetools.models.scoreset import ScoreSet
+import pickle
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from mavetools.client import json_stream
+from mavetools.client.archive import open_clone
+from mavetools.client.batch import ItemResult, RequestCoalescer, TokenBucket, idempotency_key
+from mavetools.client.catalog import Catalog
+from mavetools.client.concurrency import iter_bounded
+from mavetools.client.exceptions import MaveDBError
+# FUNCTION_TYPES used to be defined here and is re-exported for existing imports
+from mavetools.client.function_type import FUNCTION_TYPES  # noqa: F401
+from mavetools.client.function_type import FunctionTypeCache, extract_function_type
+from mavetools.client.manifest import CloneManifest, write_atomic
+from mavetools.client.multipart import StreamingMultipartEncoder, close_files
+from mavetools.client.pagination import iter_pages
+from mavetools.client.predicates import Selection, check_predicate, search_predicate
+from mavetools.client.query import CatalogQueryIndex, QueryIndex
+from mavetools.client.score_cache import ScoreArrayCache, parse_score_table
+from mavetools.client.score_store import PackedScoreStore
+from mavetools.client.session import MaveSession
+from mavetools.client.snapshot import clone_fingerprint, load_snapshot, save_snapshot
+from mavetools.client.sync import MainJsonTree, scoreset_version
+from mavetools.client.urn_index import UrnIndex
+from mavetools.models.scoreset import LazyScoreSet, ScoreSet
 from mavetools.models.ml_tools import MlExperiment
 
 
-FUNCTION_TYPES = set(['Activity', 'Binding', 'Expression', 'OrganismalFitness', 'Stability'])
+def parse_scoreset_chunk(scoreset_list, selection, retrieve_json_only, function_type_cache, lazy=False):
+    """
+    Filters, classifies and deserializes scoresets, the loop of ClientTemplate.parse_json_scoreset_list.
+    The scoresets are filtered by a predicates.Selection, which counts the rejected ones. With lazy,
+    the scoresets are deserialized as LazyScoreSet objects.
 
-def extract_function_type(scoreset):
-    function_type = None
-    sd = scoreset['shortDescription']
-    methodText = scoreset['methodText']
-    abstract = scoreset['abstractText']
-    if abstract is None or abstract == '':
-        try:
-            abstract = scoreset['primaryPublicationIdentifiers'][0]['abstract']
-            if abstract is None:
-                abstract = ''
-        except IndexError:
-            abstract = ''
-        second_abstract = ''
-    else:
-        try:
-            second_abstract = scoreset['primaryPublicationIdentifiers'][0]['abstract']
-            if second_abstract is None:
-                second_abstract = ''
-        except IndexError:
-            second_abstract = ''
-
-    prio_binding_keywords = ['transcription ability', 'protein-protein interaction']
-    prio_fitness_keywords = []
-    prio_act_keywords = ['readout of activity', 'fluorescence of Aequorea victoria GFP', 'loss-of-function', 'Functional scores', 'functional scores']
-    prio_exp_keywords = ['variant abundance', 'protein abundance']
-    prio_stabi_keywords = []
-
-    binding_keywords = ['binding', 'Binding', 'Y2H assay']
-    fitness_keywords = ['fitness', 'Fitness', 'pathogenicity', 'saturation prime editing', 'Growth', 'growth', 'toxicity assay', 'TileSeq', 'viral replication', 'complementation', 'based on survival']
-    act_keywords = ['activity', 'Activity']
-    exp_keywords = ['expression', 'Expression', ]
-    stabi_keywords = ['stability', 'Stability', 'folding free energy', 'dG value', 'Protein folding']
-
-    keyword_tuples = [
-        ('OrganismalFitness', fitness_keywords, prio_fitness_keywords),
-        ('Binding', binding_keywords, prio_binding_keywords),
-        ('Activity', act_keywords, prio_act_keywords),
-        ('Expression', exp_keywords, prio_exp_keywords),
-        ('Stability', stabi_keywords, prio_stabi_keywords)
-    ]
-
-    for ft, keywords, prio_keywords in keyword_tuples:
-        for keyword in prio_keywords:
-            if sd.count(keyword) > 0:
-                function_type = ft
-            elif methodText.count(keyword) > 0:
-                function_type = ft
-            if function_type is not None:
-                break
-        if function_type is not None:
-            break
-
-    if function_type is None:
-        for ft, keywords, prio_keywords in keyword_tuples:
-            for keyword in prio_keywords:
-                if abstract.count(keyword) > 0:
-                    function_type = ft
-                    break
-                elif second_abstract.count(keyword) > 0:
-                    function_type = ft
-                    break
-            if function_type is not None:
-                break
-
-    if function_type is None:
-        for ft, keywords, prio_keywords in keyword_tuples:
-            for keyword in keywords:
-                if sd.count(keyword) > 0:
-                    function_type = ft
-                elif methodText.count(keyword) > 0:
-                    function_type = ft
-                if function_type is not None:
-                    break
-            if function_type is not None:
-                break
-
-    if function_type is None:
-        for ft, keywords, prio_keywords in keyword_tuples:
-            for keyword in keywords:
-                if abstract.count(keyword) > 0:
-                    function_type = ft
-                    break
-                elif second_abstract.count(keyword) > 0:
-                    function_type = ft
-                    break
-            if function_type is not None:
-                break
+    Returns
+    -------
+
+    experiment_dict
+        A dictionary mapping experiment urns to their corresponding MLExperiment objects,
+        or scoreset urns to their json objects if retrieve_json_only is True.
+    """
+
+    scoreset_class = LazyScoreSet if lazy else ScoreSet
+    experiment_dict = {}
+    for scoreset in selection.filter(scoreset_list):
+        urn = scoreset["urn"]
+
+        if retrieve_json_only:
+            experiment_dict[urn] = scoreset
+            continue
+
+        if function_type_cache is not None:
+            ft = function_type_cache.classify(scoreset)
+        else:
+            ft = extract_function_type(scoreset)
+
+        scoreset_obj = scoreset_class.deserialize(scoreset)
+
+        experiment_urn = scoreset_obj.urn
+
+        if experiment_urn not in experiment_dict:
+            experiment_dict[experiment_urn] = MlExperiment(
+                experiment_urn, {}, scoreset_obj, urn=experiment_urn, function_type = ft
+            )
+
+        experiment_dict[experiment_urn].scoreset_dict[urn] = scoreset_obj
+
+    return experiment_dict
+
+
+def _parse_scoreset_chunk_in_worker(scoreset_list, predicate, timed, retrieve_json_only, function_type_entries, lazy):
+    # runs in a worker process, which gets the cached function types of its chunk (None without
+    # a cache) and returns them updated, together with the Selection holding the counts of the chunk
+    selection = Selection(predicate, timed=timed)
+    if function_type_entries is None:
+        experiment_dict = parse_scoreset_chunk(scoreset_list, selection, retrieve_json_only, None, lazy=lazy)
+        return experiment_dict, selection, None, 0, 0
+
+    function_type_cache = FunctionTypeCache(None)
+    function_type_cache.entries = function_type_entries
+    experiment_dict = parse_scoreset_chunk(
+        scoreset_list, selection, retrieve_json_only, function_type_cache, lazy=lazy
+    )
+    if not function_type_cache.changed:
+        function_type_entries = None
+    return experiment_dict, selection, function_type_entries, function_type_cache.hits, function_type_cache.misses
+
+
+def _is_picklable(obj):
+    try:
+        pickle.dumps(obj)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    return True
+
+
+def _decode_score_table(score_table_name, f):
+    # reads a score table from a binary file object, gzip-compressed if the name ends with .gz
+    data = f.read()
+    if score_table_name.endswith(".gz"):
+        data = gzip.decompress(data)
+    return io.TextIOWrapper(io.BytesIO(data), encoding="utf-8").read()
 
-    
-    if function_type is not None:
-        return function_type
-    else:
-        return 'Activity'
 
 class ClientTemplate:
     """
@@ -117,6 +122,11 @@ class ClientTemplate:
         retrieve_json_only=False,
         experiment_types=None,
         verbose=False,
+        function_type_cache=None,
+        max_workers=None,
+        lazy=False,
+        predicate=None,
+        timed=False,
     ):
         """
         Parses a list of scoreset metadatas in json format.
@@ -140,6 +150,31 @@ class ClientTemplate:
         experiment_types
             List of experiment types. If not None, filters all scoresets that experiment type is not any of the given experiment types.
 
+        function_type_cache
+            A FunctionTypeCache. If not None, function types are looked up in it and only scoresets
+            that are new or whose texts changed are classified.
+
+        max_workers
+            If greater than 1, the scoresets are split into chunks that are filtered, classified and
+            deserialized by a pool of max_workers processes. The result is the same as without workers.
+            The predicate is sent to the workers, a predicate that cannot be pickled (e.g. a
+            Match of a lambda) is evaluated without workers.
+
+        lazy
+            When True, scoresets are deserialized as LazyScoreSet objects, which read their
+            attributes from the json object on first access. This is faster and uses less memory
+            when only a few attributes of each scoreset are used.
+
+        predicate
+            A predicates.Predicate the scoresets have to match in addition to the other filters,
+            for example NumVariants(minimum=100) & License("CC0").
+
+        timed
+            When True, the time spent in each filter is measured.
+
+        The filters are compiled into a predicates.Selection, which is kept as self.selection and
+        reports how many scoresets each filter rejected (self.selection.report()).
+
         Returns
         -------
 
@@ -150,72 +185,134 @@ class ClientTemplate:
         if verbose:
             print(f"Call of parse_json_scoreset_list: {experiment_types=}")
 
-        if keywords is not None:
-            keywords = set(keywords)
-
-        if organisms is not None:
-            organisms = set(organisms)
+        selection = Selection(
+            search_predicate(
+                keywords=keywords, organisms=organisms, experiment_types=experiment_types, predicate=predicate
+            ),
+            timed=timed,
+        )
+        self.selection = selection
 
-        if experiment_types is not None:
-            experiment_types = set(experiment_types)
+        if max_workers is not None and max_workers > 1 and not _is_picklable(selection.predicate):
+            logging.warning(
+                f"{selection.predicate!r} cannot be pickled for the worker processes, parsing without workers"
+            )
+            max_workers = None
 
-        experiment_dict = {}
-        filter_0 = 0
-        filter_1 = 0
-        filter_2 = 0
-        filter_3 = 0
-        filter_4 = 0
-        for scoreset in scoreset_list:
-            if keywords is not None:
-                keyword_match = False
-                for keyword in scoreset["keywords"]:
-                    if keyword["text"] in keywords:
-                        keyword_match = True
-                if not keyword_match:
-                    filter_0 += 1
-                    continue
+        if max_workers is None or max_workers <= 1:
+            experiment_dict = parse_scoreset_chunk(
+                scoreset_list, selection, retrieve_json_only, function_type_cache, lazy=lazy
+            )
+        else:
+            experiment_dict = self._parse_json_scoreset_list_in_processes(
+                scoreset_list,
+                selection,
+                retrieve_json_only,
+                function_type_cache,
+                max_workers,
+                lazy,
+            )
 
-            if organisms is not None:
-                if scoreset["target"]["reference_maps"][0]["genome"]["organism_name"] not in organisms:
-                    filter_1 += 1
-                    continue
+        if verbose:
+            selection.print_report()
+            if function_type_cache is not None:
+                print(f"Function types: {function_type_cache.hits=} {function_type_cache.misses=}")
 
-            if len(scoreset["targetGenes"]) == 0:
-                filter_2 += 1
-                continue
+        return experiment_dict
 
-            if experiment_types is not None:
-                if scoreset["targetGenes"][0]["category"] not in experiment_types:
-                    # print(scoreset['targetGenes'][0]['category'])
-                    filter_3 += 1
-                    continue
+    def _parse_json_scoreset_list_in_processes(
+        self,
+        scoreset_list,
+        selection,
+        retrieve_json_only,
+        function_type_cache,
+        max_workers,
+        lazy,
+    ):
+        scoreset_list = list(scoreset_list)
+        # a few chunks per worker, so that uneven chunks do not leave workers idle
+        chunk_size = max(1, -(-len(scoreset_list) // (max_workers * 4)))
+        chunks = [scoreset_list[start : start + chunk_size] for start in range(0, len(scoreset_list), chunk_size)]
+
+        def function_type_entries(chunk):
+            if function_type_cache is None:
+                return None
+            return {
+                scoreset["urn"]: function_type_cache.entries[scoreset["urn"]]
+                for scoreset in chunk
+                if scoreset["urn"] in function_type_cache.entries
+            }
 
-            urn = scoreset["urn"]
+        experiment_dict = {}
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(
+                    _parse_scoreset_chunk_in_worker,
+                    chunk,
+                    selection.predicate,
+                    selection.timed,
+                    retrieve_json_only,
+                    function_type_entries(chunk),
+                    lazy,
+                )
+                for chunk in chunks
+            ]
+            # merged in chunk order, so the result is ordered like the serial one
+            for future in futures:
+                chunk_dict, chunk_selection, entries, hits, misses = future.result()
+                for key, value in chunk_dict.items():
+                    if retrieve_json_only or key not in experiment_dict:
+                        experiment_dict[key] = value
+                    else:
+                        experiment_dict[key].scoreset_dict.update(value.scoreset_dict)
+                selection.merge(chunk_selection)
+                if function_type_cache is not None:
+                    function_type_cache.hits += hits
+                    function_type_cache.misses += misses
+                    if entries is not None:
+                        function_type_cache.entries.update(entries)
+                        function_type_cache.changed = True
+        return experiment_dict
 
-            if retrieve_json_only:
-                experiment_dict[urn] = scoreset
-                filter_4 += 1
-                continue
 
-            ft = extract_function_type(scoreset)
+class SharedClientHandle:
+    """
+    A picklable reference to a LocalClient prepared by LocalClient.share, which worker
+    processes turn into their own read-only client with attach.
+    """
 
-            scoreset_obj = ScoreSet.deserialize(scoreset)
+    def __init__(self, client_class, local_instance_path, work_path, use_catalog):
+        self.client_class = client_class
+        self.local_instance_path = local_instance_path
+        self.work_path = work_path
+        self.use_catalog = use_catalog
 
-            experiment_urn = scoreset_obj.urn
+    def attach(self):
+        """
+        Opens the shared clone read-only in the current process, see LocalClient.attach.
+        """
+        return self.client_class.attach(self)
 
-            if experiment_urn not in experiment_dict:
-                experiment_dict[experiment_urn] = MlExperiment(
-                    experiment_urn, {}, scoreset_obj, urn=experiment_urn, function_type = ft
-                )
 
-            experiment_dict[experiment_urn].scoreset_dict[urn] = scoreset_obj
+def user_work_path(local_instance_path):
+    """
+    Returns the folder in the user cache ($XDG_CACHE_HOME, by default ~/.cache) that the files
+    derived from a clone are written to when the clone folder is not writable.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    absolute_path = os.path.abspath(local_instance_path)
+    digest = hashlib.sha256(absolute_path.encode()).hexdigest()[:16]
+    return f"{cache_home}/mavetools/{os.path.basename(absolute_path)}-{digest}"
 
-        if verbose:
-            print(
-                f"Filtered: {filter_0=} {filter_1=} {filter_2=} {filter_3=} {filter_4=}"
-            )
 
-        return experiment_dict
+def _is_write_error(error):
+    """
+    Checks whether an error means that a folder or database cannot be written to.
+    """
+    if isinstance(error, sqlite3.OperationalError):
+        message = str(error)
+        return "readonly database" in message or "unable to open database file" in message
+    return isinstance(error, OSError) and error.errno in (errno.EACCES, errno.EPERM, errno.EROFS)
 
 
 class LocalClient(ClientTemplate):
@@ -223,21 +320,277 @@ class LocalClient(ClientTemplate):
     A client class that imitates the original client class to use a local clone of the MaveDB.
     """
 
-    def __init__(self, local_instance_path):
+    def __init__(self, local_instance_path, use_catalog=True, work_path=None):
         """
         Initializes the client instance.
+        Only the existence of the clone is checked here. main.json and the catalog are opened on
+        first use, and the work_path folder is created when the first derived file is written.
 
         Parameters
         ----------
 
         local_instance_path
-            path the locally stored MaveDB.
+            path the locally stored MaveDB, a directory or an archive of it (.zip, .tar, .tar.gz,
+            .tar.zst). Archives are read in place, nothing is extracted. A FileNotFoundError is
+            raised if it does not exist.
+
+        use_catalog
+            When True, metadata is read from a persistent SQLite catalog (catalog.sqlite in the
+            clone directory) that is built once from main.json and rebuilt when main.json changes.
+            Otherwise main.json is parsed completely.
+
+        work_path
+            Folder for the files derived from the clone (catalog, caches, snapshots). Defaults to
+            the clone directory, for archives to {local_instance_path}.d next to the archive.
+            If it is not writable, e.g. for a read-only or shared clone, the files are written to
+            user_work_path(local_instance_path) instead. Files that are already there, e.g. a
+            current catalog, are still read from work_path.
+
+        If the clone has a packed score store (scores.pack, see build_score_store), score tables
+        are read from it instead of the csv/ folder, unless they changed since it was built.
+        For compressed tars the store is built on the first score table access, since their
+        members can only be read by decompressing the archive up to them.
         """
 
+        if not os.path.exists(local_instance_path):
+            raise FileNotFoundError(f"No local MaveDB clone at {local_instance_path}")
         self.local_instance_path = local_instance_path
+        if work_path is None:
+            work_path = local_instance_path if os.path.isdir(local_instance_path) else f"{local_instance_path}.d"
         self.meta_data_folder = f"{local_instance_path}/main.json"
-        self.main_meta_data = self.load_meta_data(self.meta_data_folder)
         self.scoreset_data_folder = f"{local_instance_path}/csv/"
+        self.use_catalog = use_catalog
+        self.read_only = False
+        self._clone = None
+        self._main_meta_data = None
+        self._catalog = None
+        self._score_store = None
+        self._urn_index = None
+        self._query_index = None
+        self._function_type_cache = None
+        self._score_store_packed = False
+        self._set_work_path(work_path)
+
+    def _set_work_path(self, work_path):
+        self.work_path = work_path
+        self.score_cache = ScoreArrayCache(f"{work_path}/csv_cache")
+        self.score_store_path = f"{work_path}/scores.pack"
+        self.function_type_cache_path = f"{work_path}/function_types.json"
+        if self._function_type_cache is not None:
+            self._function_type_cache.path = self.function_type_cache_path
+
+    def _write_to_work_path(self, write):
+        """
+        Calls write, a function that writes derived files to work_path, and returns its result.
+        If work_path is not writable, work_path moves to user_work_path and write is called again.
+        """
+        try:
+            return write()
+        except (OSError, sqlite3.OperationalError) as error:
+            fallback = user_work_path(self.local_instance_path)
+            if not _is_write_error(error) or self.work_path == fallback:
+                raise
+            logging.warning(f"Cannot write to {self.work_path} ({error}), using {fallback} instead")
+            self._set_work_path(fallback)
+            return write()
+
+    @property
+    def clone(self):
+        """
+        The DirectoryClone, ZipClone or TarClone the files of the clone are read from,
+        opened on first access.
+        """
+        if self._clone is None:
+            self._clone = self._write_to_work_path(
+                lambda: open_clone(self.local_instance_path, index_path=f"{self.work_path}/archive_index.json")
+            )
+        return self._clone
+
+    @property
+    def main_meta_data(self):
+        """
+        json object of main.json, loaded on first access.
+        """
+        if self._main_meta_data is None:
+            f = self.clone.open_text("main.json")
+            self._main_meta_data = json.load(f)
+            f.close()
+        return self._main_meta_data
+
+    @property
+    def catalog(self):
+        """
+        The Catalog of the clone, opened (and built if necessary) on first access.
+        """
+        if self._catalog is None:
+            if self.read_only:
+                self._catalog = Catalog(f"{self.work_path}/catalog.sqlite", read_only=True)
+            else:
+                self._catalog = self._write_to_work_path(lambda: Catalog.for_clone(self.work_path, clone=self.clone))
+        return self._catalog
+
+    @property
+    def urn_index(self):
+        """
+        The UrnIndex of the clone, built on first access.
+        """
+        if self._urn_index is None:
+            if self.use_catalog:
+                self._urn_index = self.catalog.urn_index()
+            else:
+                self._urn_index = UrnIndex(
+                    (experiment_set["urn"], experiment["urn"], scoreset["urn"])
+                    for experiment_set in self.main_meta_data["experimentSets"]
+                    for experiment in experiment_set["experiments"]
+                    for scoreset in experiment["scoreSets"]
+                )
+        return self._urn_index
+
+    @property
+    def query_index(self):
+        """
+        The query index of the clone, held in memory. With the catalog it is loaded from the
+        query tables of the catalog, which are added on first access. A read-only client never
+        writes them: it queries the tables through the shared catalog (CatalogQueryIndex) and
+        builds the index from the scoresets only if the catalog has none, like a client whose
+        catalog is in a read-only clone folder. Without the catalog the index is built from
+        main.json on first access.
+        """
+        if self._query_index is None:
+            if self.use_catalog and not self.read_only:
+                self._build_query_tables()
+            if self.use_catalog and CatalogQueryIndex.is_built(self.catalog):
+                if self.read_only:
+                    self._query_index = CatalogQueryIndex(self.catalog)
+                else:
+                    self._query_index = QueryIndex.from_catalog(self.catalog)
+            elif self.use_catalog:
+                self._query_index = QueryIndex(self.catalog.iter_scoresets())
+            else:
+                self._query_index = QueryIndex(
+                    scoreset
+                    for experiment_set in self.main_meta_data["experimentSets"]
+                    for experiment in experiment_set["experiments"]
+                    for scoreset in experiment["scoreSets"]
+                )
+        return self._query_index
+
+    def _build_query_tables(self):
+        try:
+            CatalogQueryIndex.for_catalog(self.catalog)
+        except sqlite3.OperationalError as error:
+            if not _is_write_error(error):
+                raise
+            # a current catalog found in a read-only clone folder is used as it is
+            logging.warning(f"Cannot add the query tables to {self.catalog.path} ({error})")
+
+    def query(self, query):
+        """
+        Selects scoresets with the inverted indexes of the clone.
+
+        Parameters
+        ----------
+
+        query
+            A query built from Term and NumVariantsQuery combined with & and |, for example
+            (Term("keyword", "DMS") | Term("uniprot", "P38398")) & NumVariantsQuery(minimum=100).
+            Predicates from predicates are rejected with a TypeError.
+
+        Returns
+        -------
+
+        urns
+            List of the matching scoreset urns in clone order, to be passed to get_experiment_dict.
+        """
+        return self.query_index.select(query)
+
+    @property
+    def score_store(self):
+        """
+        The PackedScoreStore of the clone (scores.pack), None if the clone has none or it cannot
+        be opened, e.g. because it was written by another version. See build_score_store.
+        """
+        if self._score_store is None and os.path.exists(self.score_store_path):
+            try:
+                self._score_store = PackedScoreStore(self.score_store_path)
+            except ValueError as error:
+                logging.warning(f"Ignoring the score store {self.score_store_path}: {error}")
+        return self._score_store
+
+    @property
+    def function_type_cache(self):
+        """
+        The FunctionTypeCache of the clone (function_types.json), loaded on first access.
+        """
+        if self._function_type_cache is None:
+            self._function_type_cache = FunctionTypeCache(self.function_type_cache_path)
+        return self._function_type_cache
+
+    def parse_json_scoreset_list(self, scoreset_list, **kwargs):
+        """
+        Like ClientTemplate.parse_json_scoreset_list, with function types classified through the
+        function type cache of the clone, which is saved afterwards unless the client is read-only.
+        """
+
+        kwargs.setdefault("function_type_cache", self.function_type_cache)
+        experiment_dict = super().parse_json_scoreset_list(scoreset_list, **kwargs)
+        if not self.read_only:
+            self._write_to_work_path(self.function_type_cache.save)
+        return experiment_dict
+
+    def share(self, score_store=True):
+        """
+        Prepares the clone for worker processes and returns a handle to pass to them.
+
+        The catalog, its query index tables and, if score_store is True, the packed score store
+        are built once here.
+        Workers open both read-only through memory mappings (see attach), so their pages are
+        shared between all processes and the memory of a worker does not grow with the number
+        of workers. The handle is small and can be pickled, for example as an argument of
+        multiprocessing.Pool tasks.
+
+        Parameters
+        ----------
+
+        score_store
+            When True, the packed score store (scores.pack) is built if the clone has none.
+
+        Returns
+        -------
+
+        handle
+            A SharedClientHandle, call its attach method in the worker.
+        """
+
+        if self.use_catalog:
+            self._build_query_tables()
+        if score_store and self.score_store is None:
+            self.build_score_store()
+        return SharedClientHandle(type(self), self.local_instance_path, self.work_path, self.use_catalog)
+
+    @classmethod
+    def attach(cls, handle):
+        """
+        Opens a clone prepared by share in a worker process. The client only reads: the catalog
+        is opened read-only and never rebuilt, score tables are read from the memory-mapped
+        score store, and no caches, indexes or snapshots are written.
+
+        Parameters
+        ----------
+
+        handle
+            The SharedClientHandle returned by share.
+
+        Returns
+        -------
+
+        client
+            A read-only LocalClient.
+        """
+
+        client = cls(handle.local_instance_path, use_catalog=handle.use_catalog, work_path=handle.work_path)
+        client.read_only = True
+        return client
 
     def get_meta_file_path(self, urn):
         """
@@ -295,6 +648,8 @@ class LocalClient(ClientTemplate):
         meta_data
             json object of the metadata.
         """
+        if self.use_catalog:
+            return self.catalog.get(urn)
         return self.load_meta_data(self.get_meta_file_path(urn))
 
     def search_database(
@@ -303,6 +658,12 @@ class LocalClient(ClientTemplate):
         organisms=None,
         experiment_types=["protein_coding"],
         verbose=False,
+        streaming=False,
+        snapshot=False,
+        lazy=False,
+        predicate=None,
+        max_workers=None,
+        report=False,
     ):
         """
         Searches all scoresets in MaveDB and applies some filters.
@@ -318,6 +679,31 @@ class LocalClient(ClientTemplate):
         experiment_types
             List of experiment types. If not None, filters all scoresets that experiment type is not any of the given experiment types.
 
+        streaming
+            When True, main.json is parsed incrementally and the scoresets are filtered while it is read,
+            so that at most one experiment set is held in memory. The catalog is not used.
+
+        snapshot
+            When True, the result is stored as a binary snapshot in the snapshots/ folder of the clone
+            and later calls with the same filters load it instead of deserializing the scoresets again.
+            A snapshot is discarded as soon as the clone changes, see snapshot.clone_fingerprint.
+            A read-only client only loads existing snapshots.
+
+        lazy
+            When True, scoresets are deserialized as LazyScoreSet objects, see parse_json_scoreset_list.
+
+        predicate
+            A predicates.Predicate the scoresets have to match in addition to the other filters.
+            Snapshots are only used if the predicate has a key (see predicates.Predicate.key).
+
+        max_workers
+            Number of worker processes the scoresets are parsed with, see parse_json_scoreset_list.
+
+        report
+            When True (or verbose), self.selection counts the rejections of all filters afterwards.
+            Otherwise the catalog applies keywords, organisms and experiment types in the database
+            and the scoresets it leaves out are not counted.
+
         Returns
         -------
 
@@ -325,15 +711,52 @@ class LocalClient(ClientTemplate):
             A dictionary mapping experiment urns to their corresponding MLExperiment objects.
         """
 
-        experiment_sets = self.main_meta_data["experimentSets"]
-        scoreset_list = []
-        for experiment_set in experiment_sets:
-            for experiment in experiment_set["experiments"]:
-                for scoreSet in experiment["scoreSets"]:
-                    scoreset_list.append(scoreSet)
+        if predicate is not None:
+            check_predicate(predicate)
+        if snapshot and predicate is not None and predicate.key() is None:
+            logging.warning(f"{predicate!r} has no key, the search is not stored as a snapshot")
+            snapshot = False
+
+        if snapshot:
+            snapshot_key = (
+                None if keywords is None else sorted(keywords),
+                None if organisms is None else sorted(organisms),
+                None if experiment_types is None else sorted(experiment_types),
+                lazy,
+                None if predicate is None else predicate.key(),
+            )
+            snapshot_path = self.get_snapshot_path(snapshot_key)
+            fingerprint = clone_fingerprint(self.local_instance_path, clone=self.clone)
+            experiment_dict = load_snapshot(snapshot_path, fingerprint, key=snapshot_key)
+            if experiment_dict is not None:
+                if verbose:
+                    print(f"Loaded snapshot {snapshot_path}: {len(experiment_dict)=}")
+                return experiment_dict
+
+        if streaming:
+            if verbose:
+                print(f"Searching MaveDB: streaming {self.meta_data_folder}")
+            scoreset_list = self._stream_scoresets()
+        elif self.use_catalog:
+            if verbose:
+                print(f"Searching MaveDB: {len(self.catalog)=}")
+            if report or verbose:
+                # every scoreset is passed to the selection, so that it counts all rejections
+                scoreset_list = self.catalog.iter_scoresets()
+            else:
+                scoreset_list = self.catalog.iter_scoresets(
+                    keywords=keywords, organisms=organisms, experiment_types=experiment_types
+                )
+        else:
+            experiment_sets = self.main_meta_data["experimentSets"]
+            scoreset_list = []
+            for experiment_set in experiment_sets:
+                for experiment in experiment_set["experiments"]:
+                    for scoreSet in experiment["scoreSets"]:
+                        scoreset_list.append(scoreSet)
 
-        if verbose:
-            print(f"Searching MaveDB: {len(experiment_sets)=} {len(scoreset_list)=}")
+            if verbose:
+                print(f"Searching MaveDB: {len(experiment_sets)=} {len(scoreset_list)=}")
 
         experiment_dict = self.parse_json_scoreset_list(
             scoreset_list,
@@ -341,13 +764,38 @@ class LocalClient(ClientTemplate):
             organisms=organisms,
             experiment_types=experiment_types,
             verbose=verbose,
+            lazy=lazy,
+            predicate=predicate,
+            max_workers=max_workers,
         )
 
         if verbose:
             print(f"{len(experiment_dict)=}")
 
+        if snapshot and not self.read_only:
+            self._write_to_work_path(
+                lambda: save_snapshot(
+                    self.get_snapshot_path(snapshot_key), experiment_dict, fingerprint, key=snapshot_key
+                )
+            )
+
         return experiment_dict
 
+    def _stream_scoresets(self):
+        f = self.clone.open_text("main.json")
+        try:
+            for _, _, scoreset in json_stream.iter_scoresets(f):
+                yield scoreset
+        finally:
+            f.close()
+
+    def get_snapshot_path(self, key):
+        """
+        Getter for the path of the search_database snapshot of a set of filters.
+        """
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()[:16]
+        return f"{self.work_path}/snapshots/search-{digest}.pickle"
+
     def get_experiment_dict(self, urns):
         """
         Generates a experiment_dict containing MLExperiment objects for a list of given urns.
@@ -356,7 +804,9 @@ class LocalClient(ClientTemplate):
         ----------
 
         urns
-            A list of MaveDB urn identifiers.
+            A list of MaveDB urn identifiers of experiment sets, experiments or scoresets.
+            Experiment sets and experiments are expanded into their scoresets with the urn index.
+            Urns that are not in the clone are skipped with a warning.
 
         Returns
         -------
@@ -365,24 +815,26 @@ class LocalClient(ClientTemplate):
             A dictionary mapping experiment urns to their corresponding MLExperiment objects.
         """
 
-        scoreset_list = []
-        for urn in urns:
-            try:
-                scoreset_list.append(self.get_meta_data(urn))
-            except:
-                n = 1
-                while True:
-                    try:
-                        scoreset_urn = f"{urn}-{n}"
-                        scoreset_list.append(self.get_meta_data(scoreset_urn))
-                    except:
-                        break
-                    n += 1
+        scoreset_urns, missing = self.urn_index.expand(urns)
+        if len(missing) > 0:
+            logging.warning(f"{len(missing)} urns are not in {self.local_instance_path}: {missing}")
+
+        if self.use_catalog:
+            scoreset_list = self.catalog.get_many(scoreset_urns)
+        else:
+            scoresets = {
+                scoreset["urn"]: scoreset
+                for experiment_set in self.main_meta_data["experimentSets"]
+                for experiment in experiment_set["experiments"]
+                for scoreset in experiment["scoreSets"]
+            }
+            scoreset_list = [scoresets[urn] for urn in scoreset_urns]
         return self.parse_json_scoreset_list(scoreset_list)
 
     def retrieve_score_table(self, urn):
         """
-        Retrieves the score table for an urn.
+        Retrieves the score table for an urn. Reads gzip-compressed tables ({urn}.scores.csv.gz)
+        if there is no uncompressed table.
 
         Parameters
         ----------
@@ -397,17 +849,170 @@ class LocalClient(ClientTemplate):
             Scoreset table as a string.
         """
 
-        fixed_urn = urn.replace(":", "-")
-
-        score_table_file = f"{self.scoreset_data_folder}/{fixed_urn}.scores.csv"
-        f = open(score_table_file, "r")
-        text = f.read()
+        self._pack_score_tables(urn)
+        if self.in_score_store(urn):
+            return self.score_store.get_text(urn)
+        return self._read_score_table_file(urn)
+
+    def _pack_score_tables(self, urn):
+        # Reading the members of a compressed tar one by one decompresses the archive up to
+        # each of them, which is quadratic in the number of tables. On the first table missing
+        # from the score store, all tables are packed in a single pass instead.
+        if self._score_store_packed or self.read_only or self.clone.random_access:
+            return
+        if not self.in_score_store(urn):
+            self._score_store_packed = True
+            self.build_score_store()
+
+    def in_score_store(self, urn):
+        """
+        Checks whether the score table of a scoreset can be read from the packed score store,
+        i.e. the store exists and the table was not changed since the store was built.
+        """
+        if self.score_store is None or urn not in self.score_store:
+            return False
+        try:
+            source = self.clone.signature(self.get_score_table_name(urn))
+        except (OSError, KeyError):
+            return False
+        return self.score_store.is_fresh(urn, source)
+
+    def _read_score_table_file(self, urn):
+        score_table_name = self.get_score_table_name(urn)
+        f = self.clone.open(score_table_name)
+        text = _decode_score_table(score_table_name, f)
         f.close()
         return text
 
+    def get_score_table_name(self, urn):
+        """
+        Getter for the name of the score table of a scoreset relative to the clone root,
+        the compressed table if there is no uncompressed one.
+        """
+
+        fixed_urn = urn.replace(":", "-")
+
+        score_table_name = f"csv/{fixed_urn}.scores.csv"
+        if not self.clone.exists(score_table_name) and self.clone.exists(f"{score_table_name}.gz"):
+            return f"{score_table_name}.gz"
+        return score_table_name
+
+    def get_score_table_path(self, urn):
+        """
+        Getter for the path of the score table of a scoreset, the compressed table if there is
+        no uncompressed one. For archived clones this is the path of the member inside the archive.
+        """
+        return f"{self.local_instance_path}/{self.get_score_table_name(urn)}"
+
+    def retrieve_score_arrays(self, urn):
+        """
+        Retrieves the hgvs_pro, hgvs_nt and score columns of the score table for an urn as arrays.
+        The arrays are read from the columnar cache next to the csv/ folder, the score table is only
+        parsed (and cached) if it is not cached yet or changed since.
+
+        Parameters
+        ----------
+
+        urn
+            MaveDB urn identifier of a scoreset.
+
+        Returns
+        -------
+
+        arrays
+            A dictionary mapping hgvs_pro and hgvs_nt to string arrays and score to a float array.
+        """
+
+        self._pack_score_tables(urn)
+        if self.in_score_store(urn):
+            return self.score_store.get_arrays(urn)
+        source_mtime = self.clone.mtime(self.get_score_table_name(urn))
+        if self.read_only and not self.score_cache.is_fresh(urn, source_mtime=source_mtime):
+            # a read-only client does not write the cache
+            return parse_score_table(self.retrieve_score_table(urn))
+        return self._write_to_work_path(
+            lambda: self.score_cache.get(
+                urn,
+                self.get_score_table_path(urn),
+                lambda: self.retrieve_score_table(urn),
+                source_mtime=source_mtime,
+            )
+        )
+
+    def iter_score_table_urns(self):
+        """
+        Yields the urns of all score tables in the csv/ folder.
+        """
+        for filename in self.clone.list("csv"):
+            for extension in (".scores.csv", ".scores.csv.gz"):
+                if filename.endswith(extension):
+                    yield filename[: -len(extension)].replace("-", ":", 2)
+                    break
+
+    def build_score_store(self):
+        """
+        Packs all score tables of the csv/ folder into a single memory-mapped store (scores.pack),
+        which is used by retrieve_score_table and retrieve_score_arrays from then on. Tables that
+        are rewritten later, e.g. by Client.sync, are read from the csv/ folder again until the
+        store is rebuilt.
+
+        Returns
+        -------
+
+        score_store
+            The new PackedScoreStore.
+        """
+
+        if self._score_store is not None:
+            self._score_store.close()
+        names = {self.get_score_table_name(urn): urn for urn in self.iter_score_table_urns()}
+
+        def build():
+            # the tables are read in the order they are stored, for compressed tars in one pass
+            tables = (
+                (names[name], _decode_score_table(name, f), self.clone.signature(name))
+                for name, f in self.clone.iter_files(names)
+            )
+            return PackedScoreStore.build(self.score_store_path, tables)
+
+        self._score_store = self._write_to_work_path(build)
+        return self._score_store
+
+    def build_cache(self, verbose=False):
+        """
+        Fills the columnar cache for all score tables of the clone.
+
+        Parameters
+        ----------
+
+        verbose
+            When True, prints progress.
+
+        Returns
+        -------
+
+        built
+            Number of score tables that had to be parsed.
+        """
+
+        built = 0
+        tables = 0
+        for urn in self.iter_score_table_urns():
+            tables += 1
+            score_table_name = self.get_score_table_name(urn)
+            if self.score_cache.is_fresh(urn, source_mtime=self.clone.mtime(score_table_name)):
+                continue
+            self.retrieve_score_arrays(urn)
+            built += 1
+            if verbose and built % 100 == 0:
+                print(f"Cached {built} score tables")
+        if verbose:
+            print(f"Cached {built} score tables, {tables - built} were up to date")
+        return built
+
 
 class Client(ClientTemplate):
-    def __init__(self, base_url="https://www.mavedb.org/api/", auth_token=""):
+    def __init__(self, base_url="https://www.mavedb.org/api/", auth_token="", session=None, cache=None):
         """
         Instantiates the Client object and sets the values for base_url and
         auth_token
@@ -418,23 +1023,57 @@ class Client(ClientTemplate):
             default: 'http://127.0.0.1:8000/api/'
         auth_token: authorizes POST requests via the API and MaveDB
             default: ''
+        session: MaveSession used for all HTTP requests, configures connection pooling,
+            retries and timeouts
+            default: a MaveSession with default settings
+        cache: ResponseCache for the scoreset listing, model GETs and score tables
+            default: None, nothing is cached
         """
         self.base_url = base_url
-        if auth_token:
-            self.auth_token = auth_token
+        self.auth_token = auth_token
+        if session is None:
+            session = MaveSession()
+        self.session = session
+        self.cache = cache
+        self.in_flight = RequestCoalescer()
 
     class AuthTokenMissingException(Exception):
         pass
 
-    def clone(self, local_instance_path):
+    def clone(self, local_instance_path, max_workers=8, max_in_flight=None, verify=True, compress=False):
         """
         Downloads the whole MaveDB and creates a local clone.
 
+        Score tables are downloaded concurrently and written to disk as soon as they arrive,
+        metadata files are written in the order of the scoreset listing.
+
+        The clone directory keeps a manifest.json that records urn, size, hash and status of
+        every written file. When a clone is resumed, files that are recorded as complete
+        and are still intact are skipped, so only missing or failed files are downloaded.
+
         Parameters
         ----------
 
         local_instance_path
             Path to where the clone should be stored.
+
+        max_workers
+            Number of concurrent score table downloads.
+
+        max_in_flight
+            Maximum number of scheduled but unfinished downloads. Defaults to twice max_workers.
+
+        verify
+            When True, the hashes of already present files are checked before they are skipped,
+            otherwise only their sizes are compared.
+
+        compress
+            When True, score tables are stored gzip-compressed as {urn}.csv.gz.
+
+        Raises
+        ------
+        MaveDBError
+            If any score table could not be downloaded. All other tables are still written.
         """
 
         if not os.path.exists(local_instance_path):
@@ -446,19 +1085,160 @@ class Client(ClientTemplate):
         if not os.path.exists(scoreset_data_folder):
             os.mkdir(scoreset_data_folder)
 
-        entry_dict = self.search_database(retrieve_json_only=True)
-        for urn in entry_dict:
-            meta_file = f"{meta_data_folder}/{urn}.json"
+        entry_dict = self.search_database(retrieve_json_only=True, experiment_types=None)
+        manifest = CloneManifest(local_instance_path)
+        extension = "csv.gz" if compress else "csv"
 
-            f = open(meta_file, "w")
-            json.dump(entry_dict[urn], f)
-            f.close()
+        def write_meta_data():
+            for urn in entry_dict:
+                meta_file = f"meta_data/{urn}.json"
+                data = json.dumps(entry_dict[urn]).encode()
+                sha256 = hashlib.sha256(data).hexdigest()
+                if not manifest.is_complete(meta_file, sha256=sha256, verify=verify):
+                    size, sha256 = write_atomic(f"{local_instance_path}/{meta_file}", data)
+                    manifest.mark_complete(meta_file, urn, "meta_data", size, sha256)
 
-            score_table_file = f"{scoreset_data_folder}/{urn}.csv"
+                if not manifest.is_complete(f"scoreset_data/{urn}.{extension}", verify=verify):
+                    yield urn
 
-            f = open(score_table_file, "w")
-            f.write(self.retrieve_score_table(urn))
-            f.close()
+        def download_score_table(urn):
+            score_table_file = f"scoreset_data/{urn}.{extension}"
+            try:
+                size, sha256 = self.download_score_table(
+                    urn, f"{local_instance_path}/{score_table_file}", compress=compress
+                )
+            except Exception as e:
+                manifest.mark_failed(score_table_file, urn, "score_table", e)
+                raise
+            manifest.mark_complete(score_table_file, urn, "score_table", size, sha256)
+
+        failed = []
+        with manifest:
+            for urn, future in iter_bounded(
+                download_score_table,
+                write_meta_data(),
+                max_workers=max_workers,
+                max_in_flight=max_in_flight,
+            ):
+                error = future.exception()
+                if error is not None:
+                    logging.error(f"Downloading the score table of {urn} failed: {error}")
+                    failed.append(urn)
+
+        if len(failed) > 0:
+            raise MaveDBError(f"{len(failed)} score tables could not be downloaded: {failed}")
+
+    def sync(self, local_instance_path, max_workers=8, max_in_flight=None, compress=False):
+        """
+        Updates a local clone in the layout read by LocalClient (main.json and csv/) in place.
+
+        The version fields of every scoreset (modificationDate, currentVersion,
+        supersedingScoreSet) are compared to the versions recorded in the manifest of the
+        clone. Only new or changed scoresets are downloaded; their metadata is replaced
+        in, or inserted into, main.json.
+
+        Parameters
+        ----------
+
+        local_instance_path
+            Path to the local clone. Is created if it does not exist.
+
+        max_workers
+            Number of concurrent score table downloads.
+
+        max_in_flight
+            Maximum number of scheduled but unfinished downloads. Defaults to twice max_workers.
+
+        compress
+            When True, score tables are stored gzip-compressed as csv/{urn}.scores.csv.gz.
+
+        Returns
+        -------
+
+        changes
+            A dictionary with lists of the "added", "updated" and "failed" scoreset urns.
+        """
+
+        scoreset_data_folder = f"{local_instance_path}/csv"
+        if not os.path.exists(scoreset_data_folder):
+            os.makedirs(scoreset_data_folder)
+        main_json_file = f"{local_instance_path}/main.json"
+
+        tree = MainJsonTree.load(main_json_file)
+        manifest = CloneManifest(local_instance_path)
+        extension = "scores.csv.gz" if compress else "scores.csv"
+        entry_dict = self.search_database(retrieve_json_only=True, experiment_types=None)
+
+        def changed_scoresets():
+            for urn, scoreset in entry_dict.items():
+                score_table_file = f"csv/{urn.replace(':', '-')}.{extension}"
+                version = scoreset_version(scoreset)
+                local_scoreset = tree.get(urn)
+                record = manifest.get(score_table_file)
+                if local_scoreset is None:
+                    up_to_date = False
+                elif record is not None:
+                    # Clones that were synced before know the version of their score tables
+                    up_to_date = record.get("version") == version and manifest.is_complete(
+                        score_table_file, verify=False
+                    )
+                else:
+                    up_to_date = scoreset_version(local_scoreset) == version and os.path.exists(
+                        f"{local_instance_path}/{score_table_file}"
+                    )
+                if not up_to_date:
+                    yield urn
+
+        def download_score_table(urn):
+            score_table_file = f"csv/{urn.replace(':', '-')}.{extension}"
+            try:
+                size, sha256 = self.download_score_table(
+                    urn, f"{local_instance_path}/{score_table_file}", compress=compress
+                )
+            except Exception as e:
+                manifest.mark_failed(score_table_file, urn, "score_table", e)
+                raise
+            manifest.mark_complete(
+                score_table_file, urn, "score_table", size, sha256,
+                version=scoreset_version(entry_dict[urn]),
+            )
+
+        downloaded = set()
+        failed = set()
+        with manifest:
+            for urn, future in iter_bounded(
+                download_score_table,
+                changed_scoresets(),
+                max_workers=max_workers,
+                max_in_flight=max_in_flight,
+            ):
+                error = future.exception()
+                if error is not None:
+                    logging.error(f"Downloading the score table of {urn} failed: {error}")
+                    failed.add(urn)
+                else:
+                    downloaded.add(urn)
+
+            # downloads finish in any order, the scoresets are inserted in the order of the listing
+            # so that main.json does not depend on the timing of the downloads
+            changes = {"added": [], "updated": [], "failed": [urn for urn in entry_dict if urn in failed]}
+            for urn in entry_dict:
+                if urn not in downloaded:
+                    continue
+                if tree.get(urn) is None:
+                    changes["added"].append(urn)
+                else:
+                    changes["updated"].append(urn)
+                tree.put(entry_dict[urn])
+
+            if len(downloaded) > 0:
+                tree.save(main_json_file)
+
+        logging.info(
+            f"Synced {local_instance_path}: {len(changes['added'])} added, "
+            f"{len(changes['updated'])} updated, {len(changes['failed'])} failed"
+        )
+        return changes
 
     def search_database(
         self,
@@ -466,9 +1246,16 @@ class Client(ClientTemplate):
         organisms=None,
         retrieve_json_only=False,
         experiment_types=["protein_coding"],
+        page_size=100,
+        lazy=False,
+        predicate=None,
+        max_workers=None,
     ):
         """
         Searches all scoresets in MaveDB and applies some filters.
+        The filters are sent to the server as query parameters and the listing is
+        paged through, see iter_scoresets.
+
         Parameters
         ----------
 
@@ -478,9 +1265,26 @@ class Client(ClientTemplate):
         organisms
             List of organisms. If not None, filters all scoresets that organism is not any of the given organisms.
 
+        retrieve_json_only
+            When True, the function does not create the ML datastructures and returns a dictionary mapping scoreset urns to their json objects.
+
         experiment_types
             List of experiment types. If not None, filters all scoresets that experiment type is not any of the given experiment types.
 
+        page_size
+            Number of scoresets requested per page.
+
+        lazy
+            When True, scoresets are deserialized as LazyScoreSet objects, see parse_json_scoreset_list.
+
+        predicate
+            A predicates.Predicate the scoresets have to match in addition to the other filters.
+            It is evaluated on the client, the rejection counts of all filters are reported by
+            self.selection afterwards.
+
+        max_workers
+            Number of worker processes the scoresets are parsed with, see parse_json_scoreset_list.
+
         Returns
         -------
 
@@ -488,25 +1292,63 @@ class Client(ClientTemplate):
             A dictionary mapping experiment urns to their corresponding MLExperiment objects.
         """
 
-        search_page_url = f"{self.base_url}/scoresets"
-        try:
-            r = requests.get(search_page_url)
-            r.raise_for_status()
-        except requests.exceptions.HTTPError as e:
-            logging.error(r.json())
-            raise SystemExit(e)
-
-        scoreset_list = r.json()
+        scoresets = self.iter_scoresets(
+            keywords=keywords,
+            organisms=organisms,
+            experiment_types=experiment_types,
+            page_size=page_size,
+        )
 
+        # Servers that do not support the filter parameters answer with the unfiltered listing,
+        # so the filters are applied here as well
         experiment_dict = self.parse_json_scoreset_list(
-            scoreset_list,
+            scoresets,
             keywords=keywords,
             organisms=organisms,
             retrieve_json_only=retrieve_json_only,
+            experiment_types=experiment_types,
+            lazy=lazy,
+            predicate=predicate,
+            max_workers=max_workers,
         )
 
         return experiment_dict
 
+    def iter_scoresets(self, keywords=None, organisms=None, experiment_types=None, page_size=100):
+        """
+        Pages through the scoreset listing of MaveDB with server-side filters.
+        Scoresets are yielded as the pages arrive, so memory usage is proportional to the page size.
+
+        Parameters
+        ----------
+
+        keywords
+            List of keywords, sent as keywords query parameters.
+
+        organisms
+            List of organisms, sent as organisms query parameters.
+
+        experiment_types
+            List of experiment types, sent as categories query parameters.
+
+        page_size
+            Number of scoresets requested per page.
+
+        Returns
+        -------
+
+        scoresets
+            A generator of scoreset metadata in json format.
+        """
+
+        search_page_url = f"{self.base_url}/scoresets"
+        params = {
+            "keywords": keywords,
+            "organisms": organisms,
+            "categories": experiment_types,
+        }
+        return iter_pages(self.get_content, search_page_url, params=params, page_size=page_size)
+
     def retrieve_score_table(self, urn):
         """
         Retrieves the score table for an urn.
@@ -524,15 +1366,61 @@ class Client(ClientTemplate):
             Scoreset table as a string.
         """
 
+        return self.get_content(self.get_score_table_url(urn)).decode("utf-8")
+
+    def get_content(self, url):
+        """
+        Performs a GET request, through the response cache if the client has one.
+
+        Parameters
+        ----------
+
+        url
+            Requested url.
+
+        Returns
+        -------
+
+        content
+            The body of the response as bytes.
+        """
+        if self.cache is not None:
+            return self.cache.fetch(self.session, url)
+        return self.session.get(url).content
+
+    def get_score_table_url(self, urn):
+        """
+        Getter for the url of the score table of a scoreset.
+        """
         base_parent = self.base_url.replace("api/", "")
-        score_table_url = f"{base_parent}scoreset/{urn}/scores/"
-        try:
-            r = requests.get(score_table_url)
-            r.raise_for_status()
-        except requests.exceptions.HTTPError as e:
-            logging.error(r.json())
-            raise SystemExit(e)
-        return r.text
+        return f"{base_parent}scoreset/{urn}/scores/"
+
+    def download_score_table(self, urn, filepath, compress=False):
+        """
+        Streams the score table for an urn directly to a file, without holding it in memory.
+
+        Parameters
+        ----------
+
+        urn
+            MaveDB urn identifier of a scoreset.
+
+        filepath
+            Path to the written file.
+
+        compress
+            When True, the file is written gzip-compressed.
+
+        Returns
+        -------
+
+        size
+            Number of bytes written to disk.
+
+        hexdigest
+            sha256 hex digest of the written file.
+        """
+        return self.session.download(self.get_score_table_url(urn), filepath, compress=compress)
 
     def get_model_instance(self, model_class, instance_id):
         """
@@ -558,26 +1446,80 @@ class Client(ClientTemplate):
         ------
         ValueError
             If any mandatory fields are missing.
+        MaveDBError
+            If the request failed after all retries.
         """
         model_url = f"{self.base_url}{model_class.api_url()}"
         instance_url = f"{model_url}{instance_id}/"
-        try:
-            r = requests.get(instance_url)
-            r.raise_for_status()
-        except requests.exceptions.HTTPError as e:
-            logging.error(r.json())
-            raise SystemExit(e)
-        return model_class.deserialize(r.json())
+        return model_class.deserialize(json.loads(self.get_content(instance_url)))
+
+    def get_model_instances(self, model_class, instance_ids, max_workers=8):
+        """
+        Gets many instances of a model class concurrently.
+
+        Duplicate ids are fetched once, and ids that are already being fetched by another
+        call of this client are not requested a second time.
+
+        Parameters
+        ----------
+        model_class : ModelClass
+            The model class we want to which we want to cast the responses.
+            (e.g., Experiment or Scoreset)
+        instance_ids : list
+            The ids of the objects we are retrieving.
+        max_workers : int
+            Number of concurrent requests.
 
-    def post_model_instance(self, model_instance):
+        Returns
+        -------
+        results
+            A list of ItemResult objects in the order of instance_ids. Each carries either the
+            model instance as value or the exception that occurred as error.
+        """
+
+        unique_ids = list(dict.fromkeys(instance_ids))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                instance_id: self.in_flight.submit(
+                    executor,
+                    (model_class.api_url(), instance_id),
+                    self.get_model_instance,
+                    model_class,
+                    instance_id,
+                )
+                for instance_id in unique_ids
+            }
+            wait(futures.values())
+
+        results = []
+        for instance_id in instance_ids:
+            future = futures[instance_id]
+            error = future.exception()
+            if error is not None:
+                logging.error(f"Getting {instance_id} failed: {error}")
+                results.append(ItemResult(instance_id, error=error))
+            else:
+                results.append(ItemResult(instance_id, value=future.result()))
+        return results
+
+    def post_model_instance(self, model_instance, idempotency_key=None, compress=False, progress=None):
         """
         Using a POST, hit an API endpoint to post a resource.
-        Performs HTTP POST request.
+        Performs HTTP POST request. Attached files are streamed in chunks and closed
+        after the upload.
 
         Parameters
         ----------
         model_instance
             instance of model that will be POSTed
+        idempotency_key
+            If given, it is sent as Idempotency-Key header and the request is retried
+            like a GET request
+        compress
+            When True, attached files are gzip-compressed while they are uploaded
+        progress
+            Function called with the number of bytes sent so far and the total number of
+            bytes (None when compressing) during the upload
 
         Returns
         -------
@@ -589,33 +1531,116 @@ class Client(ClientTemplate):
         ------
         AuthTokenMissingException
             If the auth_token is missing
+        MaveDBError
+            If the request failed
         """
 
         # save object type of model_instance
         model_class = type(model_instance)
         model_url = f"{self.base_url}{model_class.api_url()}/"
-        payload, files = model_instance.post_payload()
 
         # check for existance of self.auth_token, raise error if does not exist
+        # before post_payload opens the attached files
         if not self.auth_token:
             error_message = "Need to include an auth token for POST requests!"
             logging.error(error_message)
-            raise AuthTokenMissingException(error_message)
+            raise self.AuthTokenMissingException(error_message)
 
-        try:  # to post data
-            r = requests.post(
-                model_url,
-                data={"request": json.dumps(payload)},
-                files=files,
-                headers={"Authorization": (self.auth_token)},
-            )
-            r.raise_for_status()
-        except requests.exceptions.HTTPError as e:
-            logging.error(r.text)
-            sys.exit(1)
+        payload, files = model_instance.post_payload()
+        r = self._post(
+            model_url, payload, files, idempotency_key=idempotency_key, compress=compress, progress=progress
+        )
 
         # No errors or exceptions at this point, log successful upload
         logging.info(f"Successfully uploaded {model_instance}!")
 
         # return the HTTP response
         return r
+
+    def _post(self, model_url, payload, files, idempotency_key=None, compress=False, progress=None):
+        # The body is streamed from the files, which are closed once the upload is done
+        with StreamingMultipartEncoder(
+            {"request": json.dumps(payload)}, files, compress=compress, progress=progress
+        ) as body:
+            headers = {"Authorization": (self.auth_token), "Content-Type": body.content_type}
+            if idempotency_key is not None:
+                headers["Idempotency-Key"] = idempotency_key
+
+            return self.session.post(
+                model_url,
+                data=body,
+                headers=headers,
+                idempotent=idempotency_key is not None,
+            )
+
+    def post_model_instances(self, model_instances, max_workers=4, rate=None, burst=1, compress=False, retry=False):
+        """
+        Posts many model instances concurrently. A failing upload does not stop the others.
+
+        Uploads are not retried by default, since a POST that reached the server before the
+        connection failed would create the model twice. With retry=True, every upload carries
+        an Idempotency-Key derived from its url, payload and file contents and is retried like
+        a GET request; this is only safe with a server that honours the key.
+
+        Parameters
+        ----------
+        model_instances
+            instances of models that will be POSTed, e.g. NewExperiment objects
+        max_workers
+            Number of concurrent uploads.
+        rate
+            Maximum number of uploads started per second, None for no limit.
+        burst
+            Number of uploads that may be started at once before the rate limit applies.
+        compress
+            When True, attached files are gzip-compressed while they are uploaded.
+        retry
+            When True, failed uploads are retried with an Idempotency-Key header.
+
+        Returns
+        -------
+        results
+            A list of ItemResult objects in the order of model_instances. Each carries either
+            the HTTP response as value or the exception that occurred as error.
+
+        Raises
+        ------
+        AuthTokenMissingException
+            If the auth_token is missing
+        """
+
+        if not self.auth_token:
+            error_message = "Need to include an auth token for POST requests!"
+            logging.error(error_message)
+            raise self.AuthTokenMissingException(error_message)
+
+        bucket = TokenBucket(rate, burst=burst) if rate is not None else None
+
+        def post(model_instance):
+            model_url = f"{self.base_url}{type(model_instance).api_url()}/"
+            payload, files = model_instance.post_payload()
+            try:
+                key = idempotency_key(model_url, payload, files) if retry else None
+                if bucket is not None:
+                    bucket.acquire()
+            except BaseException:
+                # _post closes the files, but it is not reached
+                close_files(files)
+                raise
+            r = self._post(model_url, payload, files, idempotency_key=key, compress=compress)
+            logging.info(f"Successfully uploaded {model_instance}!")
+            return r
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(post, model_instance) for model_instance in model_instances]
+            wait(futures)
+
+        results = []
+        for model_instance, future in zip(model_instances, futures):
+            error = future.exception()
+            if error is not None:
+                logging.error(f"Uploading {model_instance} failed: {error}")
+                results.append(ItemResult(model_instance, error=error))
+            else:
+                results.append(ItemResult(model_instance, value=future.result()))
+        return results
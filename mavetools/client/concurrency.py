@@ -0,0 +1,51 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def iter_bounded(func, items, max_workers=8, max_in_flight=None):
+    """
+    Applies a function to items in a thread pool, keeping only a bounded number of
+    calls in flight at a time.
+
+    items is consumed lazily, so it can be a generator that does ordered work
+    (like writing metadata) before it hands out the next item.
+
+    Parameters
+    ----------
+
+    func
+        Function that is called with a single item.
+
+    items
+        Iterable of items.
+
+    max_workers
+        Number of worker threads.
+
+    max_in_flight
+        Maximum number of submitted but not yet yielded calls. Defaults to twice the
+        number of workers.
+
+    Returns
+    -------
+
+    results
+        A generator of (item, future) tuples in order of completion. Exceptions raised by
+        func are stored in the future.
+    """
+
+    if max_in_flight is None:
+        max_in_flight = 2 * max_workers
+    max_in_flight = max(max_in_flight, 1)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        for item in items:
+            pending[executor.submit(func, item)] = item
+            if len(pending) >= max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future
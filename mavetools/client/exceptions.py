@@ -0,0 +1,42 @@
+class MaveDBError(Exception):
+    """
+    Base class for all errors raised while talking to a MaveDB instance.
+    """
+
+    pass
+
+
+class MaveDBConnectionError(MaveDBError):
+    """
+    The server could not be reached, or the connection broke mid-request.
+    """
+
+    pass
+
+
+class MaveDBTimeoutError(MaveDBConnectionError):
+    """
+    The server did not answer within the configured timeout.
+    """
+
+    pass
+
+
+class MaveDBHTTPError(MaveDBError):
+    """
+    The server answered with an error status code.
+    """
+
+    def __init__(self, message, status_code=None, url=None, body=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.url = url
+        self.body = body
+
+
+class MaveDBOfflineError(MaveDBError):
+    """
+    A request could not be answered from the cache while the client is in offline mode.
+    """
+
+    pass
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+
+from mavetools.client.manifest import write_atomic
+
+
+FUNCTION_TYPES = set(['Activity', 'Binding', 'Expression', 'OrganismalFitness', 'Stability'])
+
+# (function type, keywords, priority keywords), earlier function types win
+KEYWORD_TUPLES = [
+    ('OrganismalFitness',
+     ['fitness', 'Fitness', 'pathogenicity', 'saturation prime editing', 'Growth', 'growth', 'toxicity assay', 'TileSeq', 'viral replication', 'complementation', 'based on survival'],
+     []),
+    ('Binding',
+     ['binding', 'Binding', 'Y2H assay'],
+     ['transcription ability', 'protein-protein interaction']),
+    ('Activity',
+     ['activity', 'Activity'],
+     ['readout of activity', 'fluorescence of Aequorea victoria GFP', 'loss-of-function', 'Functional scores', 'functional scores']),
+    ('Expression',
+     ['expression', 'Expression', ],
+     ['variant abundance', 'protein abundance']),
+    ('Stability',
+     ['stability', 'Stability', 'folding free energy', 'dG value', 'Protein folding'],
+     []),
+]
+
+
+def _tier_keywords(keyword_tuples, position):
+    keywords = []
+    for keyword_tuple in keyword_tuples:
+        for keyword in keyword_tuple[position]:
+            keywords.append((keyword, keyword_tuple[0]))
+    return keywords
+
+
+# Priority keywords and the other keywords, each in the order in which they are tried
+KEYWORD_TIERS = [_tier_keywords(KEYWORD_TUPLES, 2), _tier_keywords(KEYWORD_TUPLES, 1)]
+
+
+def extract_function_type(scoreset):
+    """
+    Classifies a scoreset into one of the FUNCTION_TYPES by keywords in its texts.
+
+    Priority keywords in the short description or method text are considered first, then
+    priority keywords in the abstracts, then the other keywords in the short description or
+    method text and finally the other keywords in the abstracts. Within each step, the earliest
+    function type of KEYWORD_TUPLES that has a matching keyword wins. Scoresets without any
+    keyword are classified as 'Activity'.
+
+    Parameters
+    ----------
+
+    scoreset
+        json object of the scoreset metadata.
+
+    Returns
+    -------
+
+    function_type
+        The function type as a string.
+    """
+
+    sd = scoreset['shortDescription']
+    methodText = scoreset['methodText']
+    abstract = scoreset['abstractText']
+    if abstract is None or abstract == '':
+        try:
+            abstract = scoreset['primaryPublicationIdentifiers'][0]['abstract']
+            if abstract is None:
+                abstract = ''
+        except IndexError:
+            abstract = ''
+        second_abstract = ''
+    else:
+        try:
+            second_abstract = scoreset['primaryPublicationIdentifiers'][0]['abstract']
+            if second_abstract is None:
+                second_abstract = ''
+        except IndexError:
+            second_abstract = ''
+
+    # No keyword contains a NUL character, so joining the texts creates no new matches and
+    # every keyword is searched once per group of texts
+    texts = (f"{sd}\0{methodText}", f"{abstract}\0{second_abstract}")
+    for keywords in KEYWORD_TIERS:
+        for text in texts:
+            for keyword, ft in keywords:
+                if keyword in text:
+                    return ft
+    return 'Activity'
+
+
+def classifier_version():
+    """
+    Returns a hash of the keyword table, which changes whenever the classification rules change.
+    """
+    return hashlib.sha256(json.dumps(KEYWORD_TUPLES).encode()).hexdigest()[:16]
+
+
+def text_hash(scoreset):
+    """
+    Returns a hash of the texts extract_function_type reads: the short description, the method
+    text, the abstract and the abstract of the primary publication.
+    """
+
+    try:
+        publication_abstract = scoreset['primaryPublicationIdentifiers'][0]['abstract']
+    except (IndexError, KeyError, TypeError):
+        publication_abstract = None
+    texts = [scoreset.get('shortDescription'), scoreset.get('methodText'), scoreset.get('abstractText'), publication_abstract]
+    return hashlib.sha256(json.dumps(texts).encode()).hexdigest()
+
+
+class FunctionTypeCache:
+    """
+    A persistent cache of extract_function_type results, keyed by scoreset urn and the hash of
+    the texts the classification is based on. Entries of scoresets whose texts changed are
+    classified again, and the whole cache is dropped when the keyword table changes.
+    """
+
+    def __init__(self, path):
+        """
+        Opens the cache, a missing or outdated file gives an empty cache.
+
+        Parameters
+        ----------
+
+        path
+            Path to the json file of the cache, None for a cache that is only held in memory.
+        """
+
+        self.path = path
+        self.version = classifier_version()
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.changed = False
+        if path is not None and os.path.exists(path):
+            f = open(path, "r")
+            try:
+                content = json.load(f)
+            except ValueError:
+                content = {}
+            f.close()
+            if content.get("version") == self.version:
+                self.entries = content["entries"]
+
+    def classify(self, scoreset):
+        """
+        Returns the function type of a scoreset, from the cache if its texts are unchanged.
+        """
+
+        urn = scoreset["urn"]
+        digest = text_hash(scoreset)
+        entry = self.entries.get(urn)
+        if entry is not None and entry["text_hash"] == digest:
+            self.hits += 1
+            return entry["function_type"]
+        self.misses += 1
+        function_type = extract_function_type(scoreset)
+        self.entries[urn] = {"text_hash": digest, "function_type": function_type}
+        self.changed = True
+        return function_type
+
+    def save(self):
+        """
+        Writes the cache to disk if it changed.
+        """
+        if not self.changed or self.path is None:
+            return
+        content = {"version": self.version, "entries": self.entries}
+        write_atomic(self.path, json.dumps(content).encode())
+        self.changed = False
+
+    def report(self):
+        """
+        Returns the cached labels for auditing.
+
+        Returns
+        -------
+
+        labels
+            A dictionary mapping every function type to the sorted list of urns classified as it.
+        """
+
+        labels = {}
+        for urn, entry in sorted(self.entries.items()):
+            labels.setdefault(entry["function_type"], []).append(urn)
+        return labels
+
+    def write_report(self, filepath):
+        """
+        Writes the cached labels as a tab-separated table with urn, function type and text hash.
+        """
+
+        f = open(filepath, "w")
+        f.write("urn\tfunction_type\ttext_hash\n")
+        for urn, entry in sorted(self.entries.items()):
+            f.write(f"{urn}\t{entry['function_type']}\t{entry['text_hash']}\n")
+        f.close()
@@ -0,0 +1,209 @@
+import json
+
+
+WHITESPACE = " \t\n\r"
+
+
+class _Reader:
+    """
+    Buffered text reader that keeps only the unconsumed part of the file in memory.
+    """
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size=None):
+        """
+        Reads more data, returns False at the end of the file.
+        """
+        if self.eof:
+            return False
+        chunk = self.f.read(size or self.chunk_size)
+        if chunk == "":
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def next_char(self):
+        """
+        Returns the next character and consumes it, None at the end of the file.
+        """
+        if self.pos >= len(self.buffer) and not self.fill():
+            return None
+        char = self.buffer[self.pos]
+        self.pos += 1
+        return char
+
+    def skip(self, chars):
+        """
+        Consumes characters from chars and returns the first other character without
+        consuming it, None at the end of the file.
+        """
+        while True:
+            while self.pos < len(self.buffer):
+                if self.buffer[self.pos] not in chars:
+                    return self.buffer[self.pos]
+                self.pos += 1
+            if not self.fill():
+                return None
+
+    def decode_value(self, decoder):
+        """
+        Decodes the json value at the current position, reading more data as needed.
+        """
+        read_size = self.chunk_size
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # The value is probably cut off at the end of the buffer
+                if not self.fill(read_size):
+                    raise
+                read_size *= 2
+                continue
+            self.pos = end
+            return value
+
+
+def _seek_top_level_array(reader, key):
+    """
+    Consumes the file up to the opening bracket of the array stored under a top-level key.
+    """
+
+    if reader.skip(WHITESPACE) != "{":
+        raise ValueError("Expected a json object")
+    reader.next_char()
+
+    depth = 1
+    expect_key = True
+    while True:
+        char = reader.next_char()
+        if char is None:
+            raise ValueError(f"Key {key} not found")
+        if char == '"':
+            # Read the complete string, keys at depth 1 are compared
+            chars = []
+            while True:
+                char = reader.next_char()
+                if char is None:
+                    raise ValueError("Unterminated string")
+                if char == "\\":
+                    chars.append(char + reader.next_char())
+                    continue
+                if char == '"':
+                    break
+                chars.append(char)
+            if depth == 1 and expect_key:
+                expect_key = False
+                if json.loads('"' + "".join(chars) + '"') == key:
+                    if reader.skip(WHITESPACE) != ":":
+                        raise ValueError("Expected ':'")
+                    reader.next_char()
+                    if reader.skip(WHITESPACE) != "[":
+                        raise ValueError(f"Expected an array for key {key}")
+                    reader.next_char()
+                    return
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                raise ValueError(f"Key {key} not found")
+        elif char == "," and depth == 1:
+            expect_key = True
+
+
+def iter_array(f, key, chunk_size=1 << 20):
+    """
+    Yields the items of an array stored under a top-level key of a json document, one at a
+    time. Only the item that is currently decoded is held in memory.
+
+    Parameters
+    ----------
+
+    f
+        A text file object.
+
+    key
+        The top-level key of the array.
+
+    chunk_size
+        Number of characters read at once.
+
+    Returns
+    -------
+
+    items
+        A generator of json objects.
+    """
+
+    reader = _Reader(f, chunk_size)
+    decoder = json.JSONDecoder()
+    _seek_top_level_array(reader, key)
+    while True:
+        char = reader.skip(WHITESPACE + ",")
+        if char is None:
+            raise ValueError("Unterminated array")
+        if char == "]":
+            return
+        yield reader.decode_value(decoder)
+
+
+def iter_experiment_sets(filepath, chunk_size=1 << 20):
+    """
+    Yields the experiment sets of a main.json file one at a time.
+
+    Parameters
+    ----------
+
+    filepath
+        Path to a main.json file or a main.json file object opened in text mode.
+
+    chunk_size
+        Number of characters read at once.
+
+    Returns
+    -------
+
+    experiment_sets
+        A generator of experiment set json objects.
+    """
+
+    if not isinstance(filepath, str):
+        yield from iter_array(filepath, "experimentSets", chunk_size=chunk_size)
+        return
+    with open(filepath, "r") as f:
+        yield from iter_array(f, "experimentSets", chunk_size=chunk_size)
+
+
+def iter_scoresets(filepath, chunk_size=1 << 20):
+    """
+    Walks experimentSets -> experiments -> scoreSets of a main.json file while reading it,
+    so that at most one experiment set is held in memory.
+
+    Parameters
+    ----------
+
+    filepath
+        Path to a main.json file or a main.json file object opened in text mode.
+
+    chunk_size
+        Number of characters read at once.
+
+    Returns
+    -------
+
+    scoresets
+        A generator of (experiment_set_urn, experiment_urn, scoreset) tuples.
+    """
+
+    for experiment_set in iter_experiment_sets(filepath, chunk_size=chunk_size):
+        for experiment in experiment_set["experiments"]:
+            for scoreset in experiment["scoreSets"]:
+                yield experiment_set["urn"], experiment["urn"], scoreset
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import threading
+
+
+MANIFEST_VERSION = 1
+
+COMPLETE = "complete"
+FAILED = "failed"
+
+
+def sha256_file(filepath, chunk_size=1 << 20):
+    """
+    Computes the sha256 hex digest of a file.
+
+    Parameters
+    ----------
+
+    filepath
+        Path to the file.
+
+    chunk_size
+        Number of bytes read at once.
+
+    Returns
+    -------
+
+    hexdigest
+        The hex digest as a string.
+    """
+
+    h = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def write_atomic(filepath, data):
+    """
+    Writes bytes to a file so that the file is either complete or untouched, even if the
+    process is killed while writing. Missing parent folders are created.
+
+    Parameters
+    ----------
+
+    filepath
+        Path to the file.
+
+    data
+        Bytes to write.
+
+    Returns
+    -------
+
+    size
+        Number of bytes written.
+
+    hexdigest
+        sha256 hex digest of the data.
+    """
+
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+    tmp_path = f"{filepath}.part"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, filepath)
+    return len(data), hashlib.sha256(data).hexdigest()
+
+
+class CloneManifest:
+    """
+    Records the state of every artifact of a local MaveDB clone, so that an interrupted
+    clone can be resumed.
+
+    Artifacts are keyed by their path relative to the clone directory and store the urn,
+    the kind of artifact, its byte size, its sha256 hash and a completion status.
+    """
+
+    def __init__(self, local_instance_path, filename="manifest.json", checkpoint_interval=100):
+        """
+        Loads the manifest of a clone directory, or starts an empty one.
+
+        Parameters
+        ----------
+
+        local_instance_path
+            Path to the clone directory.
+
+        filename
+            Name of the manifest file inside the clone directory.
+
+        checkpoint_interval
+            The manifest is written to disk after this many updates.
+        """
+
+        self.local_instance_path = local_instance_path
+        self.path = f"{local_instance_path}/{filename}"
+        self.checkpoint_interval = checkpoint_interval
+        self.lock = threading.RLock()
+        self.unsaved = 0
+        self.artifacts = {}
+        if os.path.exists(self.path):
+            f = open(self.path, "r")
+            content = json.load(f)
+            f.close()
+            if content.get("version") == MANIFEST_VERSION:
+                self.artifacts = content["artifacts"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.save()
+
+    def get(self, relpath):
+        """
+        Getter for the record of an artifact, None if there is none.
+        """
+        with self.lock:
+            return self.artifacts.get(relpath)
+
+    def is_complete(self, relpath, sha256=None, verify=True):
+        """
+        Checks whether an artifact was completely written and is still intact on disk.
+
+        Parameters
+        ----------
+
+        relpath
+            Path of the artifact relative to the clone directory.
+
+        sha256
+            If given, the recorded hash must also equal this hash.
+
+        verify
+            When True, the hash of the file on disk is recomputed, otherwise only its size
+            is compared.
+
+        Returns
+        -------
+
+        complete
+            True if the artifact can be skipped.
+        """
+
+        record = self.get(relpath)
+        if record is None or record["status"] != COMPLETE:
+            return False
+        if sha256 is not None and record["sha256"] != sha256:
+            return False
+        filepath = f"{self.local_instance_path}/{relpath}"
+        try:
+            if os.path.getsize(filepath) != record["size"]:
+                return False
+        except OSError:
+            return False
+        if verify:
+            return sha256_file(filepath) == record["sha256"]
+        return True
+
+    def mark_complete(self, relpath, urn, kind, size, sha256, **extra):
+        """
+        Records a successfully written artifact. Additional keyword arguments are stored
+        with the record.
+        """
+        record = {"urn": urn, "kind": kind, "size": size, "sha256": sha256, "status": COMPLETE}
+        record.update(extra)
+        self._update(relpath, record)
+
+    def mark_failed(self, relpath, urn, kind, error):
+        """
+        Records an artifact that could not be written.
+        """
+        self._update(
+            relpath,
+            {"urn": urn, "kind": kind, "size": None, "sha256": None, "status": FAILED, "error": str(error)},
+        )
+
+    def failed(self):
+        """
+        Returns the paths of all artifacts that are marked as failed.
+        """
+        with self.lock:
+            return [relpath for relpath, record in self.artifacts.items() if record["status"] == FAILED]
+
+    def hexdigest(self):
+        """
+        Returns a hash over all artifact records, which changes whenever the clone changes.
+        """
+        with self.lock:
+            content = json.dumps(self.artifacts, sort_keys=True)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def save(self):
+        """
+        Writes the manifest to disk.
+        """
+        with self.lock:
+            content = json.dumps({"version": MANIFEST_VERSION, "artifacts": self.artifacts})
+            write_atomic(self.path, content.encode())
+            self.unsaved = 0
+
+    def _update(self, relpath, record):
+        with self.lock:
+            self.artifacts[relpath] = record
+            self.unsaved += 1
+            if self.unsaved >= self.checkpoint_interval:
+                self.save()
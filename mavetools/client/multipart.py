@@ -0,0 +1,131 @@
+import os
+import uuid
+import zlib
+
+
+def close_files(files):
+    """
+    Closes the file handles of a files dictionary as returned by the post_payload methods of the models.
+    """
+    for filename, fileobj, content_type in files.values():
+        fileobj.close()
+
+
+class StreamingMultipartEncoder:
+    """
+    A multipart/form-data request body that reads the attached files in chunks while it is
+    sent, instead of building the whole body in memory.
+
+    Files can be gzip-compressed on the fly. The encoder can be iterated more than once
+    (for retried requests) and closes all file handles when it is closed.
+    """
+
+    def __init__(self, fields, files, chunk_size=1 << 16, compress=False, progress=None):
+        """
+        Initializes the encoder.
+
+        Parameters
+        ----------
+
+        fields
+            Dictionary mapping form field names to string values.
+
+        files
+            Dictionary mapping form field names to (filename, file object, content type)
+            tuples, as returned by the post_payload methods of the models.
+
+        chunk_size
+            Number of bytes read from a file at once.
+
+        compress
+            When True, files are gzip-compressed while they are sent and get a .gz suffix.
+
+        progress
+            Function that is called with the number of bytes sent so far and the total number
+            of bytes (None if compress is True) after every chunk.
+        """
+
+        self.fields = fields
+        self.files = files
+        self.chunk_size = chunk_size
+        self.compress = compress
+        self.progress = progress
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Closes all file handles.
+        """
+        close_files(self.files)
+
+    def _field_header(self, name):
+        return (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+        ).encode()
+
+    def _file_header(self, name, filename, content_type):
+        if self.compress:
+            filename = f"{filename}.gz"
+            content_type = "application/gzip"
+        return (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode()
+
+    def _footer(self):
+        return f"--{self.boundary}--\r\n".encode()
+
+    @property
+    def len(self):
+        """
+        Total size of the body in bytes, None if files are compressed.
+        """
+
+        if self.compress:
+            return None
+        total = len(self._footer())
+        for name, value in self.fields.items():
+            total += len(self._field_header(name)) + len(value.encode()) + 2
+        for name, (filename, fileobj, content_type) in self.files.items():
+            size = os.fstat(fileobj.fileno()).st_size
+            total += len(self._file_header(name, filename, content_type)) + size + 2
+        return total
+
+    def __iter__(self):
+        total = self.len
+        sent = 0
+
+        def report(chunk):
+            nonlocal sent
+            sent += len(chunk)
+            if self.progress is not None:
+                self.progress(sent, total)
+            return chunk
+
+        for name, value in self.fields.items():
+            yield report(self._field_header(name) + value.encode() + b"\r\n")
+
+        for name, (filename, fileobj, content_type) in self.files.items():
+            fileobj.seek(0)
+            yield report(self._file_header(name, filename, content_type))
+            compressor = zlib.compressobj(wbits=31) if self.compress else None
+            for chunk in iter(lambda: fileobj.read(self.chunk_size), b""):
+                if compressor is not None:
+                    chunk = compressor.compress(chunk)
+                    if not chunk:
+                        continue
+                yield report(chunk)
+            if compressor is not None:
+                yield report(compressor.flush())
+            yield report(b"\r\n")
+
+        yield report(self._footer())
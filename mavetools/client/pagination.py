@@ -0,0 +1,86 @@
+import json
+from urllib.parse import urlencode
+
+
+def build_query_url(url, params):
+    """
+    Appends query parameters to an url. List values become repeated parameters, None values
+    are left out.
+
+    Parameters
+    ----------
+
+    url
+        Base url.
+
+    params
+        Dictionary of query parameters.
+
+    Returns
+    -------
+
+    url
+        The url with the query string.
+    """
+
+    params = {key: value for key, value in params.items() if value is not None}
+    if len(params) == 0:
+        return url
+    separator = "&" if "?" in url else "?"
+    return f"{url}{separator}{urlencode(params, doseq=True)}"
+
+
+def iter_pages(fetch, url, params=None, page_size=100):
+    """
+    Pages through a listing endpoint using limit/offset query parameters and yields the
+    items as the pages arrive.
+
+    Servers that ignore the paging parameters and answer with the complete listing are
+    detected, in that case the listing is yielded once.
+
+    Parameters
+    ----------
+
+    fetch
+        Function that performs a GET request for an url and returns the body as bytes.
+
+    url
+        Url of the listing endpoint.
+
+    params
+        Dictionary of additional query parameters, like filters.
+
+    page_size
+        Number of items requested per page.
+
+    Returns
+    -------
+
+    items
+        A generator of the json objects of the listing.
+    """
+
+    if params is None:
+        params = {}
+    offset = 0
+    first_of_previous_page = None
+    while True:
+        page_params = dict(params)
+        page_params["limit"] = page_size
+        page_params["offset"] = offset
+        page = json.loads(fetch(build_query_url(url, page_params)))
+
+        if len(page) == 0:
+            return
+        # A server that does not page answers with everything, or with the same page again
+        if len(page) > page_size:
+            yield from page
+            return
+        if first_of_previous_page is not None and page[0] == first_of_previous_page:
+            return
+        first_of_previous_page = page[0]
+
+        yield from page
+        if len(page) < page_size:
+            return
+        offset += len(page)
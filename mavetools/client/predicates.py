@@ -0,0 +1,649 @@
+"""
+Composable filters on scoreset metadata.
+
+Predicates are combined with & (AND), | (OR) and ~ (NOT), for example
+
+    Keywords("DMS") & NumVariants(minimum=100) & ~License("CC BY-NC-SA 4.0")
+
+A Selection compiles a predicate into one python function, in which the expressions of all
+predicates are inlined and the conjuncts are tested in order of increasing cost, and counts
+how many scoresets each conjunct rejected.
+"""
+import hashlib
+import marshal
+import time
+import types
+
+from mavetools.client.catalog import scoreset_organism
+
+
+def publication_year(scoreset):
+    """
+    Returns the publication year of the first primary publication of a scoreset that has one,
+    otherwise the year of its publishedDate, None if neither is known.
+    """
+
+    for publication in scoreset.get("primaryPublicationIdentifiers") or []:
+        if isinstance(publication, dict) and publication.get("publicationYear") is not None:
+            return int(publication["publicationYear"])
+    published_date = scoreset.get("publishedDate")
+    if published_date:
+        try:
+            return int(published_date[:4])
+        except ValueError:
+            pass
+    return None
+
+
+def has_keyword(scoreset, keywords):
+    """
+    Returns True if a scoreset has any of the keywords, a set.
+    """
+
+    for keyword in scoreset.get("keywords") or ():
+        if keyword["text"] in keywords:
+            return True
+    return False
+
+
+def license_short_name(scoreset):
+    """
+    Returns the short name of the license of a scoreset, None if it has none.
+    """
+
+    license = scoreset.get("license")
+    if not isinstance(license, dict):
+        return None
+    return license.get("shortName", license.get("short_name"))
+
+
+def field_value(scoreset, path):
+    """
+    Returns the value at a path of keys and list indices in a scoreset, None if it is missing.
+    """
+
+    value = scoreset
+    for key in path:
+        try:
+            value = value[key]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return value
+
+
+class _Namespace:
+    """
+    The global variables of a compiled function, constants are bound to generated names.
+    """
+
+    def __init__(self):
+        self.variables = {
+            "perf_counter": time.perf_counter,
+            "scoreset_organism": scoreset_organism,
+            "has_keyword": has_keyword,
+            "publication_year": publication_year,
+            "license_short_name": license_short_name,
+            "field_value": field_value,
+        }
+
+    def bind(self, value):
+        name = f"_c{len(self.variables)}"
+        self.variables[name] = value
+        return name
+
+
+def check_predicate(predicate):
+    """
+    Raises a TypeError if predicate is not a Predicate, for example a query from query.
+    """
+    if not isinstance(predicate, Predicate):
+        raise TypeError(
+            f"Expected a predicates.Predicate, got {predicate!r}: queries built from query.Term and "
+            "query.NumVariantsQuery select scoresets through LocalClient.query, predicates filter search_database"
+        )
+
+
+class Predicate:
+    """
+    Base class of the predicates.
+
+    Every predicate has a cost, an estimate of its evaluation time relative to the others,
+    and an expression, the python source of its test of the variable scoreset.
+
+    Predicates are equal if they have the same type and arguments (see arguments). key
+    identifies a predicate across processes, for example in the key of a snapshot.
+    """
+
+    cost = 1
+
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.arguments() == other.arguments()
+
+    def __hash__(self):
+        return hash((type(self).__name__, self.arguments()))
+
+    def arguments(self):
+        """
+        Returns the arguments of the predicate as a tuple, nested predicates included as objects.
+        """
+        return ()
+
+    def key(self):
+        """
+        Returns a tuple of strings and numbers that identifies the predicate by its type and
+        arguments and is the same in every process, None if the predicate has no such key
+        (see Match).
+        """
+        key = [type(self).__name__]
+        for argument in self.arguments():
+            if isinstance(argument, Predicate):
+                argument = argument.key()
+                if argument is None:
+                    return None
+            key.append(argument)
+        return tuple(key)
+
+    def __call__(self, scoreset):
+        """
+        Tests a single scoreset, see Selection for filtering many.
+        """
+        if "_function" not in self.__dict__:
+            namespace = _Namespace()
+            source = f"def test(scoreset):\n    return bool({self.expression(namespace)})\n"
+            exec(source, namespace.variables)
+            self._function = namespace.variables["test"]
+        return self._function(scoreset)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop("_function", None)
+        return state
+
+    def expression(self, namespace):
+        """
+        Returns the python source of the test, an expression that is only used for its truth value.
+        """
+        raise NotImplementedError
+
+
+class Keywords(Predicate):
+    """
+    Matches scoresets that have any of the keywords.
+    """
+
+    cost = 4
+
+    def __init__(self, *keywords):
+        self.keywords = keywords
+
+    def arguments(self):
+        return self.keywords
+
+    def __repr__(self):
+        return f"Keywords({', '.join(repr(keyword) for keyword in self.keywords)})"
+
+    def expression(self, namespace):
+        return f"has_keyword(scoreset, {namespace.bind(frozenset(self.keywords))})"
+
+
+class Organisms(Predicate):
+    """
+    Matches scoresets whose target organism is any of the organisms.
+    """
+
+    cost = 3
+
+    def __init__(self, *organisms):
+        self.organisms = organisms
+
+    def arguments(self):
+        return self.organisms
+
+    def __repr__(self):
+        return f"Organisms({', '.join(repr(organism) for organism in self.organisms)})"
+
+    def expression(self, namespace):
+        return f"scoreset_organism(scoreset) in {namespace.bind(frozenset(self.organisms))}"
+
+
+class HasTargetGenes(Predicate):
+    """
+    Matches scoresets with at least one target gene.
+    """
+
+    cost = 1
+
+    def __repr__(self):
+        return "HasTargetGenes()"
+
+    def expression(self, namespace):
+        return 'scoreset.get("targetGenes")'
+
+
+class Categories(Predicate):
+    """
+    Matches scoresets whose first target gene has any of the categories (experiment types),
+    for example Categories("protein_coding").
+    """
+
+    cost = 2
+
+    def __init__(self, *categories):
+        self.categories = categories
+
+    def arguments(self):
+        return self.categories
+
+    def __repr__(self):
+        return f"Categories({', '.join(repr(category) for category in self.categories)})"
+
+    def expression(self, namespace):
+        categories = namespace.bind(frozenset(self.categories))
+        return f'(scoreset.get("targetGenes") and scoreset["targetGenes"][0].get("category") in {categories})'
+
+
+def _range_expression(value, minimum, maximum, namespace):
+    tests = [f"{value} is not None"]
+    if minimum is not None:
+        tests.append(f"{value} >= {namespace.bind(minimum)}")
+    if maximum is not None:
+        tests.append(f"{value} <= {namespace.bind(maximum)}")
+    return f"({' and '.join(tests)})"
+
+
+class NumVariants(Predicate):
+    """
+    Matches scoresets whose numVariants lies in [minimum, maximum], either bound may be None.
+    """
+
+    cost = 1
+
+    def __init__(self, minimum=None, maximum=None):
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def arguments(self):
+        return (self.minimum, self.maximum)
+
+    def __repr__(self):
+        return f"NumVariants({self.minimum!r}, {self.maximum!r})"
+
+    def expression(self, namespace):
+        return _range_expression('scoreset.get("numVariants")', self.minimum, self.maximum, namespace)
+
+
+class PublicationYear(Predicate):
+    """
+    Matches scoresets whose publication year (see publication_year) lies in [minimum, maximum],
+    either bound may be None.
+    """
+
+    cost = 4
+
+    def __init__(self, minimum=None, maximum=None):
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def arguments(self):
+        return (self.minimum, self.maximum)
+
+    def __repr__(self):
+        return f"PublicationYear({self.minimum!r}, {self.maximum!r})"
+
+    def expression(self, namespace):
+        # the year is computed once, so the range test is wrapped in a lambda
+        test = _range_expression("year", self.minimum, self.maximum, namespace)
+        return f"(lambda year: {test})(publication_year(scoreset))"
+
+
+class License(Predicate):
+    """
+    Matches scoresets with any of the licenses, given by their short names, for example License("CC0").
+    """
+
+    cost = 2
+
+    def __init__(self, *short_names):
+        self.short_names = short_names
+
+    def arguments(self):
+        return self.short_names
+
+    def __repr__(self):
+        return f"License({', '.join(repr(short_name) for short_name in self.short_names)})"
+
+    def expression(self, namespace):
+        return f"license_short_name(scoreset) in {namespace.bind(frozenset(self.short_names))}"
+
+
+class Field(Predicate):
+    """
+    Matches scoresets that have any of the values in a metadata field. The field is a key or a
+    path of keys and list indices, for example Field("title", ...) or
+    Field(("targetGenes", 0, "name"), "BRCA1"). Values are compared exactly.
+    """
+
+    cost = 2
+
+    def __init__(self, path, *values):
+        self.path = (path,) if isinstance(path, str) else tuple(path)
+        self.values = values
+
+    def arguments(self):
+        return (self.path, self.values)
+
+    def __repr__(self):
+        path = self.path[0] if len(self.path) == 1 else self.path
+        return f"Field({path!r}, {', '.join(repr(value) for value in self.values)})"
+
+    def expression(self, namespace):
+        values = namespace.bind(frozenset(self.values))
+        if len(self.path) == 1:
+            return f"scoreset.get({self.path[0]!r}) in {values}"
+        return f"field_value(scoreset, {namespace.bind(self.path)}) in {values}"
+
+
+class Match(Predicate):
+    """
+    Matches scoresets for which a function returns True. The function has to be defined at
+    module level for selections that are used by worker processes.
+
+    Matches are equal if their functions are the same object. Only a Match of a module level
+    function has a key, made of the module, the qualified name and a hash of the code of the
+    function; lambdas, nested functions, closures and other callables have none.
+    """
+
+    def __init__(self, function, name=None, cost=10):
+        self.function = function
+        self.name = function.__name__ if name is None else name
+        self.cost = cost
+
+    def arguments(self):
+        return (self.function, self.name, self.cost)
+
+    def key(self):
+        function = self.function
+        if not isinstance(function, types.FunctionType) or "<" in function.__qualname__ or function.__closure__:
+            return None
+        digest = hashlib.sha256(marshal.dumps(function.__code__)).hexdigest()[:16]
+        return ("Match", f"{function.__module__}.{function.__qualname__}", digest, self.name, self.cost)
+
+    def __repr__(self):
+        return f"Match({self.name})"
+
+    def expression(self, namespace):
+        return f"{namespace.bind(self.function)}(scoreset)"
+
+
+class And(Predicate):
+    """
+    Matches scoresets that match all predicates, which are tested in order of increasing cost.
+    """
+
+    def __init__(self, *predicates):
+        flat = []
+        for predicate in predicates:
+            check_predicate(predicate)
+            flat.extend(predicate.predicates if isinstance(predicate, And) else [predicate])
+        self.predicates = sorted(flat, key=lambda predicate: predicate.cost)
+
+    @property
+    def cost(self):
+        return sum(predicate.cost for predicate in self.predicates)
+
+    def arguments(self):
+        return tuple(self.predicates)
+
+    def __repr__(self):
+        return f"({' & '.join(repr(predicate) for predicate in self.predicates)})"
+
+    def expression(self, namespace):
+        if len(self.predicates) == 0:
+            return "True"
+        return f"({' and '.join(predicate.expression(namespace) for predicate in self.predicates)})"
+
+
+class Or(Predicate):
+    """
+    Matches scoresets that match any of the predicates, which are tested in order of increasing cost.
+    """
+
+    def __init__(self, *predicates):
+        flat = []
+        for predicate in predicates:
+            check_predicate(predicate)
+            flat.extend(predicate.predicates if isinstance(predicate, Or) else [predicate])
+        self.predicates = sorted(flat, key=lambda predicate: predicate.cost)
+
+    @property
+    def cost(self):
+        return sum(predicate.cost for predicate in self.predicates)
+
+    def arguments(self):
+        return tuple(self.predicates)
+
+    def __repr__(self):
+        return f"({' | '.join(repr(predicate) for predicate in self.predicates)})"
+
+    def expression(self, namespace):
+        if len(self.predicates) == 0:
+            return "False"
+        return f"({' or '.join(predicate.expression(namespace) for predicate in self.predicates)})"
+
+
+class Not(Predicate):
+    def __init__(self, predicate):
+        check_predicate(predicate)
+        self.predicate = predicate
+
+    @property
+    def cost(self):
+        return self.predicate.cost
+
+    def arguments(self):
+        return (self.predicate,)
+
+    def __repr__(self):
+        return f"~{self.predicate!r}"
+
+    def expression(self, namespace):
+        return f"(not {self.predicate.expression(namespace)})"
+
+
+def search_predicate(keywords=None, organisms=None, experiment_types=None, predicate=None):
+    """
+    Combines the filters of search_database into one predicate.
+
+    Parameters
+    ----------
+
+    keywords
+        List of keywords, None for no keyword filter.
+
+    organisms
+        List of organisms, None for no organism filter.
+
+    experiment_types
+        List of target categories, None for no category filter.
+
+    predicate
+        An additional Predicate or None.
+
+    Returns
+    -------
+
+    predicate
+        An And of HasTargetGenes, the given filters and predicate.
+
+    Raises
+    ------
+
+    TypeError
+        If predicate is not a Predicate.
+    """
+
+    predicates = [HasTargetGenes()]
+    if keywords is not None:
+        predicates.append(Keywords(*keywords))
+    if organisms is not None:
+        predicates.append(Organisms(*organisms))
+    if experiment_types is not None:
+        predicates.append(Categories(*experiment_types))
+    if predicate is not None:
+        predicates.append(predicate)
+    return And(*predicates)
+
+
+class Selection:
+    """
+    A predicate compiled into one function that filters scoresets and counts, for each
+    conjunct of the predicate, how many scoresets it rejected.
+
+    The conjuncts are tested in order of increasing cost and a scoreset is counted as
+    rejected by the first conjunct it fails. With timed, the time spent in each conjunct is
+    measured as well.
+    """
+
+    def __init__(self, predicate, timed=False):
+        """
+        Compiles the predicate.
+
+        Parameters
+        ----------
+
+        predicate
+            A Predicate.
+
+        timed
+            When True, the time spent in each conjunct is measured.
+        """
+
+        self.predicate = predicate
+        self.timed = timed
+        self.conjuncts = predicate.predicates if isinstance(predicate, And) else [predicate]
+        self.rejections = [0] * len(self.conjuncts)
+        self.seconds = [0.0] * len(self.conjuncts)
+        self._accepted = [0]
+        self._compile()
+
+    @property
+    def accepted(self):
+        """
+        The number of scoresets that matched the predicate.
+        """
+        return self._accepted[0]
+
+    def _compile(self):
+        # reject(scoreset) returns the position of the first conjunct the scoreset fails, -1 if
+        # it passes all, select(scoresets) is the same test unrolled into a loop over the scoresets
+        namespace = _Namespace()
+        rejections = namespace.bind(self.rejections)
+        accepted = namespace.bind(self._accepted)
+        seconds = namespace.bind(self.seconds)
+
+        def body(indent, on_reject):
+            lines = []
+            if self.timed:
+                lines.append("start = perf_counter()")
+            for position, conjunct in enumerate(self.conjuncts):
+                expression = conjunct.expression(namespace)
+                if self.timed:
+                    lines.append(f"passed = {expression}")
+                    lines.append("now = perf_counter()")
+                    lines.append(f"{seconds}[{position}] += now - start")
+                    lines.append("start = now")
+                    lines.append("if not passed:")
+                else:
+                    lines.append(f"if not {expression}:")
+                lines.extend(f"    {line}" for line in on_reject(position))
+            return [f"{' ' * indent}{line}" for line in lines]
+
+        reject_body = body(4, lambda position: [f"return {position}"])
+        select_body = body(8, lambda position: [f"{rejections}[{position}] += 1", "continue"])
+        source = "\n".join(
+            ["def reject(scoreset):"]
+            + reject_body
+            + ["    return -1", "def select(scoresets):", "    for scoreset in scoresets:"]
+            + select_body
+            + [f"        {accepted}[0] += 1", "        yield scoreset", ""]
+        )
+        exec(source, namespace.variables)
+        self._reject = namespace.variables["reject"]
+        self._select = namespace.variables["select"]
+
+    def __call__(self, scoreset):
+        """
+        Tests a scoreset and counts the result.
+        """
+
+        position = self._reject(scoreset)
+        if position < 0:
+            self._accepted[0] += 1
+            return True
+        self.rejections[position] += 1
+        return False
+
+    def filter(self, scoresets):
+        """
+        Yields the scoresets that match the predicate.
+        """
+        return self._select(scoresets)
+
+    def merge(self, other):
+        """
+        Adds the counts and times of another Selection of the same predicate, for example one
+        that was used in a worker process.
+        """
+
+        # the lists are bound in the compiled functions, so they are updated in place
+        for position in range(len(self.conjuncts)):
+            self.rejections[position] += other.rejections[position]
+            self.seconds[position] += other.seconds[position]
+        self._accepted[0] += other.accepted
+
+    def report(self):
+        """
+        Returns the statistics of the conjuncts.
+
+        Returns
+        -------
+
+        report
+            List of (predicate, number of rejected scoresets, seconds or None) tuples in the
+            order in which the conjuncts are tested.
+        """
+
+        return [
+            (conjunct, rejections, seconds if self.timed else None)
+            for conjunct, rejections, seconds in zip(self.conjuncts, self.rejections, self.seconds)
+        ]
+
+    def print_report(self):
+        print(f"Accepted: {self.accepted}")
+        for conjunct, rejections, seconds in self.report():
+            timing = "" if seconds is None else f" in {seconds * 1000:.2f} ms"
+            print(f"Rejected by {conjunct!r}: {rejections}{timing}")
+
+    def __getstate__(self):
+        # the compiled functions are not picklable, they are compiled again on unpickling
+        return {
+            "predicate": self.predicate,
+            "timed": self.timed,
+            "rejections": self.rejections,
+            "seconds": self.seconds,
+            "_accepted": self._accepted,
+        }
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.conjuncts = self.predicate.predicates if isinstance(self.predicate, And) else [self.predicate]
+        self._compile()
@@ -0,0 +1,433 @@
+import bisect
+import json
+
+from mavetools.client.catalog import scoreset_organism
+
+
+QUERY_INDEX_VERSION = 1
+
+ACCESSION_FIELDS = {"UniProt": "uniprot", "Ensembl": "ensembl", "RefSeq": "refseq"}
+FIELDS = ("keyword", "organism", "category", "target", "doi", "pubmed") + tuple(ACCESSION_FIELDS.values())
+PUBLICATION_KEYS = ("primaryPublicationIdentifiers", "secondaryPublicationIdentifiers", "pubmed_ids")
+DOI_KEYS = ("doiIdentifiers", "doi_ids")
+
+
+def _identifiers(entries):
+    for entry in entries or []:
+        if isinstance(entry, dict):
+            yield entry
+        else:
+            yield {"identifier": entry}
+
+
+def scoreset_terms(scoreset):
+    """
+    Extracts the indexed terms of a scoreset.
+
+    Parameters
+    ----------
+
+    scoreset
+        json object of the scoreset metadata.
+
+    Returns
+    -------
+
+    terms
+        A dictionary mapping the field names (keyword, organism, category, target, uniprot,
+        ensembl, refseq, doi, pubmed) to sets of values.
+    """
+
+    terms = {}
+
+    def add(field, value):
+        if value is not None and value != "":
+            terms.setdefault(field, set()).add(value)
+
+    for keyword in scoreset.get("keywords") or []:
+        add("keyword", keyword["text"] if isinstance(keyword, dict) else keyword)
+    add("organism", scoreset_organism(scoreset))
+    for target_gene in scoreset.get("targetGenes") or []:
+        add("category", target_gene.get("category"))
+        add("target", target_gene.get("name"))
+        for identifier_struct in target_gene.get("externalIdentifiers") or []:
+            identifier = identifier_struct.get("identifier") or {}
+            field = ACCESSION_FIELDS.get(identifier.get("dbName"))
+            if field is not None:
+                add(field, identifier.get("identifier"))
+
+    for key in PUBLICATION_KEYS:
+        for publication in _identifiers(scoreset.get(key)):
+            if publication.get("doi"):
+                add("doi", publication["doi"])
+            db_name = publication.get("dbName")
+            if db_name is None or db_name == "PubMed":
+                add("pubmed", publication.get("identifier"))
+            elif db_name == "DOI":
+                add("doi", publication.get("identifier"))
+    for key in DOI_KEYS:
+        for doi in _identifiers(scoreset.get(key)):
+            add("doi", doi.get("identifier"))
+    return terms
+
+
+def check_query(query):
+    """
+    Raises a TypeError if query is not a Query, for example a predicate from predicates.
+    """
+    if not isinstance(query, Query):
+        raise TypeError(
+            f"Expected a query.Query, got {query!r}: predicates.Predicate objects filter search_database, "
+            "queries built from Term and NumVariantsQuery select scoresets through LocalClient.query"
+        )
+
+
+class Query:
+    """
+    Base class of the query nodes. Queries are combined with & (AND) and | (OR).
+    """
+
+    def __and__(self, other):
+        return AndQuery(self, other)
+
+    def __or__(self, other):
+        return OrQuery(self, other)
+
+    def evaluate(self, index):
+        """
+        Returns the set of the matching scoresets, as urns for a QueryIndex and as positions
+        for a CatalogQueryIndex.
+        """
+        raise NotImplementedError
+
+
+class Term(Query):
+    """
+    Matches scoresets that have any of the values in a field, for example
+    Term("organism", "Homo sapiens", "Mus musculus"). Values are compared exactly.
+    """
+
+    def __init__(self, field, *values):
+        self.field = field
+        self.values = values
+
+    def __repr__(self):
+        return f"Term({self.field!r}, {', '.join(repr(value) for value in self.values)})"
+
+    def evaluate(self, index):
+        if self.field not in FIELDS:
+            raise ValueError(f"Unknown query field: {self.field}")
+        return index.lookup(self.field, self.values)
+
+
+class NumVariantsQuery(Query):
+    """
+    Matches scoresets whose numVariants lies in [minimum, maximum], either bound may be None.
+    """
+
+    def __init__(self, minimum=None, maximum=None):
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def __repr__(self):
+        return f"NumVariantsQuery({self.minimum!r}, {self.maximum!r})"
+
+    def evaluate(self, index):
+        return index.num_variants_between(self.minimum, self.maximum)
+
+
+class AndQuery(Query):
+    def __init__(self, *queries):
+        for query in queries:
+            check_query(query)
+        self.queries = queries
+
+    def __repr__(self):
+        return f"({' & '.join(repr(query) for query in self.queries)})"
+
+    def evaluate(self, index):
+        # intersect starting with the smallest set
+        sets = sorted((query.evaluate(index) for query in self.queries), key=len)
+        result = sets[0]
+        for other in sets[1:]:
+            if len(result) == 0:
+                break
+            result = result & other
+        return result
+
+
+class OrQuery(Query):
+    def __init__(self, *queries):
+        for query in queries:
+            check_query(query)
+        self.queries = queries
+
+    def __repr__(self):
+        return f"({' | '.join(repr(query) for query in self.queries)})"
+
+    def evaluate(self, index):
+        return frozenset().union(*(query.evaluate(index) for query in self.queries))
+
+
+class QueryIndex:
+    """
+    Inverted indexes over the scoresets of a local clone.
+
+    For every field (see scoreset_terms) the index maps each value to the set of scoreset urns
+    that have it, numVariants is kept as a sorted list for range queries. Queries are answered
+    with set operations only, the scoreset metadata is not touched.
+    """
+
+    def __init__(self, scoresets=(), source=None):
+        """
+        Builds the index.
+
+        Parameters
+        ----------
+
+        scoresets
+            Iterable of scoreset json objects in clone order.
+
+        source
+            Signature of the source the index was built from, see archive.source_signature.
+        """
+
+        self.source = source
+        self.positions = {}
+        postings = {field: {} for field in FIELDS}
+        num_variants = []
+        for scoreset in scoresets:
+            urn = scoreset["urn"]
+            self.positions[urn] = len(self.positions)
+            for field, values in scoreset_terms(scoreset).items():
+                for value in values:
+                    postings[field].setdefault(value, set()).add(urn)
+            if scoreset.get("numVariants") is not None:
+                num_variants.append((scoreset["numVariants"], self.positions[urn], urn))
+        self._freeze(postings, num_variants)
+
+    def _freeze(self, postings, num_variants):
+        # postings map field -> value -> set of urns, num_variants is a list of
+        # (numVariants, position, urn) tuples
+        self.postings = {
+            field: {value: frozenset(urns) for value, urns in values.items()} for field, values in postings.items()
+        }
+        num_variants.sort()
+        self.num_variants = [entry[0] for entry in num_variants]
+        self.num_variants_urns = [entry[2] for entry in num_variants]
+
+    def __len__(self):
+        return len(self.positions)
+
+    def values(self, field):
+        """
+        Returns the indexed values of a field.
+        """
+        return list(self.postings[field])
+
+    def lookup(self, field, values):
+        """
+        Returns the set of urns of the scoresets that have any of the values in a field.
+        """
+        postings = self.postings[field]
+        if len(values) == 1:
+            return postings.get(values[0], frozenset())
+        return frozenset().union(*(postings.get(value, frozenset()) for value in values))
+
+    def num_variants_between(self, minimum, maximum):
+        """
+        Returns the set of urns of the scoresets whose numVariants lies in [minimum, maximum],
+        either bound may be None.
+        """
+        start = 0 if minimum is None else bisect.bisect_left(self.num_variants, minimum)
+        end = len(self.num_variants) if maximum is None else bisect.bisect_right(self.num_variants, maximum)
+        return frozenset(self.num_variants_urns[start:end])
+
+    def select(self, query):
+        """
+        Evaluates a query.
+
+        Parameters
+        ----------
+
+        query
+            A Query, for example Term("keyword", "DMS") & NumVariantsQuery(minimum=100).
+
+        Returns
+        -------
+
+        urns
+            List of the matching scoreset urns in clone order.
+
+        Raises
+        ------
+
+        TypeError
+            If query is not a Query.
+        """
+        check_query(query)
+        return sorted(query.evaluate(self), key=self.positions.__getitem__)
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        """
+        Loads the index from the query tables of a catalog (see CatalogQueryIndex.build),
+        without parsing the scoreset metadata.
+        """
+
+        index = cls(source=catalog.meta("source"))
+        connection = catalog.connection
+        urns = {}
+        num_variants = []
+        for urn, position, scoreset_num_variants in connection.execute(
+            "SELECT urn, position, num_variants FROM scoresets ORDER BY position"
+        ):
+            urns[position] = urn
+            index.positions[urn] = len(index.positions)
+            if scoreset_num_variants is not None:
+                num_variants.append((scoreset_num_variants, index.positions[urn], urn))
+        postings = {field: {} for field in FIELDS}
+        for field, value, position in connection.execute("SELECT field, value, position FROM query_terms"):
+            postings[field].setdefault(value, set()).add(urns[position])
+        index._freeze(postings, num_variants)
+        return index
+
+
+class CatalogQueryIndex:
+    """
+    The inverted indexes of QueryIndex stored as tables of the catalog (query_terms).
+
+    The tables are written once by build, they are dropped together with the catalog when it
+    is rebuilt from a changed main.json. A process that queries often loads them into a
+    QueryIndex (QueryIndex.from_catalog); read-only workers and servers query them directly,
+    so they share the memory-mapped pages of the catalog instead of each holding a copy.
+    """
+
+    def __init__(self, catalog):
+        """
+        Opens the index of a catalog that has the query tables, see build.
+        """
+        self.catalog = catalog
+
+    @staticmethod
+    def is_built(catalog):
+        """
+        Checks whether a catalog has the tables of the current index version.
+        """
+        return catalog.meta("query_index") == str(QUERY_INDEX_VERSION)
+
+    @classmethod
+    def build(cls, catalog, chunk_size=1000):
+        """
+        Writes the query tables into a catalog, replacing existing ones.
+
+        Parameters
+        ----------
+
+        catalog
+            A Catalog that is not read-only.
+
+        chunk_size
+            Number of scoresets read at once.
+
+        Returns
+        -------
+
+        index
+            The CatalogQueryIndex of the catalog.
+        """
+
+        if catalog.read_only:
+            raise ValueError(f"{catalog.path} is read-only, its query index cannot be built")
+        connection = catalog.connection
+        connection.executescript(
+            """
+            DROP TABLE IF EXISTS query_terms;
+            CREATE TABLE query_terms (field TEXT, value TEXT, position INTEGER);
+            """
+        )
+        cursor = connection.execute("SELECT position, data FROM scoresets")
+        rows = cursor.fetchmany(chunk_size)
+        while len(rows) > 0:
+            connection.executemany(
+                "INSERT INTO query_terms VALUES (?, ?, ?)",
+                [
+                    (field, value, position)
+                    for position, data in rows
+                    for field, values in scoreset_terms(json.loads(data)).items()
+                    for value in values
+                ],
+            )
+            rows = cursor.fetchmany(chunk_size)
+        connection.executescript(
+            """
+            CREATE INDEX query_terms_value ON query_terms (field, value);
+            CREATE INDEX IF NOT EXISTS scoresets_num_variants ON scoresets (num_variants);
+            """
+        )
+        connection.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", ("query_index", str(QUERY_INDEX_VERSION)))
+        connection.commit()
+        return cls(catalog)
+
+    @classmethod
+    def for_catalog(cls, catalog):
+        """
+        Opens the index of a catalog, building its tables first if they are missing.
+        """
+        if cls.is_built(catalog):
+            return cls(catalog)
+        return cls.build(catalog)
+
+    def __len__(self):
+        return len(self.catalog)
+
+    def values(self, field):
+        """
+        Returns the indexed values of a field.
+        """
+        rows = self.catalog.connection.execute("SELECT DISTINCT value FROM query_terms WHERE field = ?", (field,))
+        return [row[0] for row in rows]
+
+    def lookup(self, field, values):
+        """
+        Returns the set of positions of the scoresets that have any of the values in a field.
+        """
+        query = f"SELECT position FROM query_terms WHERE field = ? AND value IN ({', '.join('?' * len(values))})"
+        return frozenset(row[0] for row in self.catalog.connection.execute(query, (field, *values)))
+
+    def num_variants_between(self, minimum, maximum):
+        """
+        Returns the set of positions of the scoresets whose numVariants lies in
+        [minimum, maximum], either bound may be None.
+        """
+        query = "SELECT position FROM scoresets WHERE num_variants IS NOT NULL"
+        params = []
+        if minimum is not None:
+            query += " AND num_variants >= ?"
+            params.append(minimum)
+        if maximum is not None:
+            query += " AND num_variants <= ?"
+            params.append(maximum)
+        return frozenset(row[0] for row in self.catalog.connection.execute(query, params))
+
+    def select(self, query, chunk_size=500):
+        """
+        Evaluates a query, see QueryIndex.select.
+
+        Returns
+        -------
+
+        urns
+            List of the matching scoreset urns in clone order.
+        """
+
+        check_query(query)
+        positions = sorted(query.evaluate(self))
+        urns = []
+        for start in range(0, len(positions), chunk_size):
+            chunk = positions[start : start + chunk_size]
+            rows = self.catalog.connection.execute(
+                f"SELECT urn FROM scoresets WHERE position IN ({', '.join('?' * len(chunk))}) ORDER BY position", chunk
+            )
+            urns.extend(row[0] for row in rows)
+        return urns
@@ -0,0 +1,154 @@
+import os
+
+import numpy as np
+
+
+SCORE_COLUMNS = ("hgvs_pro", "hgvs_nt", "score")
+
+
+def parse_score_table(text):
+    """
+    Parses the hgvs_pro, hgvs_nt and score columns of a MaveDB score table into arrays.
+    Like ScoreSetData, an exp.score column is preferred over a score column.
+
+    Parameters
+    ----------
+
+    text
+        Content of a MaveDB score table.
+
+    Returns
+    -------
+
+    arrays
+        A dictionary mapping hgvs_pro and hgvs_nt to string arrays and score to a float array,
+        NA scores become NaN.
+    """
+
+    hgvs_pro_pos = 3
+    hgvs_nt_pos = 1
+    score_pos = None
+    hgvs_pros = []
+    hgvs_nts = []
+    scores = []
+    for line in text.split("\n"):
+        if line == "" or line[0] == "#":
+            continue
+        words = line.split(",")
+        if words[0] == "accession":
+            exp_score_pos = None
+            for pos, word in enumerate(words):
+                if word == "hgvs_pro":
+                    hgvs_pro_pos = pos
+                if word == "score":
+                    score_pos = pos
+                if word == "hgvs_nt":
+                    hgvs_nt_pos = pos
+                if word == "exp.score":
+                    exp_score_pos = pos
+            if exp_score_pos is not None:
+                score_pos = exp_score_pos
+            continue
+        hgvs_pros.append(words[hgvs_pro_pos])
+        hgvs_nts.append(words[hgvs_nt_pos])
+        score = words[score_pos]
+        scores.append(float("nan") if score == "NA" else float(score))
+
+    return {
+        "hgvs_pro": np.array(hgvs_pros, dtype=str),
+        "hgvs_nt": np.array(hgvs_nts, dtype=str),
+        "score": np.array(scores, dtype=np.float64),
+    }
+
+
+class ScoreArrayCache:
+    """
+    A columnar sidecar cache of score tables: every table is stored as an .npz file with
+    its hgvs_pro, hgvs_nt and score columns, so it only has to be parsed once.
+    """
+
+    def __init__(self, directory):
+        """
+        Initializes the cache, the directory is created on first write.
+
+        Parameters
+        ----------
+
+        directory
+            Path to the cache directory.
+        """
+        self.directory = directory
+
+    def get_path(self, urn):
+        """
+        Getter for the path of the cached arrays of a scoreset.
+        """
+        return f"{self.directory}/{urn.replace(':', '-')}.npz"
+
+    def is_fresh(self, urn, source_path=None, source_mtime=None):
+        """
+        Checks whether the cached arrays exist and are newer than the score table, given by
+        its path or its modification time.
+        """
+        try:
+            if source_mtime is None:
+                source_mtime = os.path.getmtime(source_path)
+            return os.path.getmtime(self.get_path(urn)) >= source_mtime
+        except OSError:
+            return False
+
+    def load(self, urn):
+        """
+        Loads the cached arrays of a scoreset.
+
+        Returns
+        -------
+
+        arrays
+            A dictionary mapping the column names to arrays.
+        """
+        with np.load(self.get_path(urn), allow_pickle=False) as npz:
+            return {column: npz[column] for column in SCORE_COLUMNS}
+
+    def store(self, urn, arrays):
+        """
+        Writes the arrays of a scoreset to the cache.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.get_path(urn)}.part"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, self.get_path(urn))
+
+    def get(self, urn, source_path, read_text, source_mtime=None):
+        """
+        Returns the arrays of a scoreset, parsing and caching the score table if the cache
+        is missing or outdated.
+
+        Parameters
+        ----------
+
+        urn
+            MaveDB urn identifier of a scoreset.
+
+        source_path
+            Path to the score table file, used to detect outdated cache entries.
+
+        read_text
+            Function without arguments that returns the content of the score table.
+
+        source_mtime
+            Modification time of the score table, used instead of source_path if given.
+
+        Returns
+        -------
+
+        arrays
+            A dictionary mapping the column names to arrays.
+        """
+
+        if self.is_fresh(urn, source_path, source_mtime=source_mtime):
+            return self.load(urn)
+        arrays = parse_score_table(read_text())
+        self.store(urn, arrays)
+        return arrays
@@ -0,0 +1,184 @@
+import json
+import mmap
+import os
+import time
+import uuid
+
+import numpy as np
+
+from mavetools.client.manifest import write_atomic
+from mavetools.client.score_cache import SCORE_COLUMNS, parse_score_table
+
+
+STORE_VERSION = 2
+ALIGNMENT = 64
+OPEN_ATTEMPTS = 5
+
+
+class PackedScoreStore:
+    """
+    All score tables of a clone packed into a single memory-mapped file.
+
+    For every scoreset the store holds the raw score table and its hgvs_pro, hgvs_nt and
+    score columns as arrays. An index (scores.pack.json) maps every urn to the
+    (offset, length, dtype) of its segments and to the signature of the file the table was
+    read from, so that tables changed since the store was built can be detected (is_fresh).
+    Arrays are returned as zero-copy views into the mapping, so many reader processes share
+    the same pages.
+
+    The pack starts with a generation id, which is also stored in the index. A reader that
+    opens the store while it is rebuilt and gets the index of one build with the pack of
+    another notices the mismatch and opens both again.
+    """
+
+    def __init__(self, path):
+        """
+        Opens a packed store.
+
+        Parameters
+        ----------
+
+        path
+            Path to the pack file, the index is expected at {path}.json.
+
+        Raises
+        ------
+        ValueError
+            If the store has an unsupported version, or the pack and the index still belong to
+            different builds after OPEN_ATTEMPTS attempts.
+        """
+
+        self.path = path
+        for attempt in range(OPEN_ATTEMPTS):
+            f = open(f"{path}.json", "r")
+            content = json.load(f)
+            f.close()
+            if content.get("version") != STORE_VERSION:
+                raise ValueError(f"{path} has an unsupported version: {content.get('version')}")
+            self.index = content["index"]
+
+            self.file = open(path, "rb")
+            if self.file.read(ALIGNMENT).rstrip(b"\0").decode() == content["generation"]:
+                break
+            # build replaces the pack first and the index second, so the new index follows soon
+            self.file.close()
+            time.sleep(0.01 * 2**attempt)
+        else:
+            raise ValueError(f"{path} does not match its index {path}.json")
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        """
+        Closes the mapping. If arrays returned by get_arrays are still alive, the mapping is
+        released once the last of them is garbage collected.
+        """
+        try:
+            self.buffer.close()
+        except BufferError:
+            pass
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __contains__(self, urn):
+        return urn in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def urns(self):
+        """
+        Returns the urns of all stored scoresets.
+        """
+        return list(self.index)
+
+    def is_fresh(self, urn, source):
+        """
+        Checks whether a scoreset is in the store and was packed from the file with the given
+        signature (see archive.source_signature).
+        """
+        entry = self.index.get(urn)
+        return entry is not None and entry.get("source") == source
+
+    def get_text(self, urn):
+        """
+        Returns the raw score table of a scoreset as a string.
+
+        Raises
+        ------
+        KeyError
+            If the scoreset is not in the store.
+        """
+        offset, length = self.index[urn]["csv"]
+        return bytes(self.buffer[offset : offset + length]).decode("utf-8")
+
+    def get_arrays(self, urn):
+        """
+        Returns the hgvs_pro, hgvs_nt and score columns of a scoreset as read-only arrays
+        backed by the mapping.
+
+        Raises
+        ------
+        KeyError
+            If the scoreset is not in the store.
+        """
+
+        entry = self.index[urn]
+        arrays = {}
+        for column in SCORE_COLUMNS:
+            offset, count, dtype = entry[column]
+            arrays[column] = np.frombuffer(self.buffer, dtype=np.dtype(dtype), count=count, offset=offset)
+        return arrays
+
+    @classmethod
+    def build(cls, path, tables):
+        """
+        Packs score tables into a new store, replacing an existing one.
+
+        Parameters
+        ----------
+
+        path
+            Path to the pack file.
+
+        tables
+            Iterable of (urn, score table text) or (urn, score table text, source signature)
+            tuples.
+
+        Returns
+        -------
+
+        store
+            The opened PackedScoreStore.
+        """
+
+        index = {}
+        generation = uuid.uuid4().hex
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.part"
+        with open(tmp_path, "wb") as f:
+            f.write(generation.encode().ljust(ALIGNMENT, b"\0"))
+
+            def append(data):
+                padding = -f.tell() % ALIGNMENT
+                f.write(b"\0" * padding)
+                offset = f.tell()
+                f.write(data)
+                return offset
+
+            for urn, text, *source in tables:
+                data = text.encode("utf-8")
+                entry = {"csv": [append(data), len(data)], "source": source[0] if source else None}
+                for column, array in parse_score_table(text).items():
+                    array = np.ascontiguousarray(array)
+                    entry[column] = [append(array.tobytes()), len(array), array.dtype.str]
+                index[urn] = entry
+
+        os.replace(tmp_path, path)
+        content = {"version": STORE_VERSION, "generation": generation, "index": index}
+        write_atomic(f"{path}.json", json.dumps(content).encode())
+        return cls(path)
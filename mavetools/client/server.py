@@ -0,0 +1,284 @@
+"""
+Serves a local clone of MaveDB over HTTP with the endpoints Client uses, so that
+Client(base_url="http://host:port/api/") works against a mirror.
+
+    python -m mavetools.client.server [path to local clone] --port 8000
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from mavetools.client.catalog import Catalog
+
+
+GZIP_MIN_SIZE = 1024
+
+
+class ResponseLRU:
+    """
+    An in-memory least recently used cache of response bodies, bounded by their total size.
+    """
+
+    def __init__(self, max_bytes=64 << 20):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        size = len(entry["body"]) + len(entry.get("gzip") or b"")
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old["body"]) + len(old.get("gzip") or b"")
+            self.entries[key] = entry
+            self.size += size
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted["body"]) + len(evicted.get("gzip") or b"")
+
+
+def _response(status, body, content_type="application/json"):
+    if not isinstance(body, bytes):
+        body = json.dumps(body).encode()
+    return {
+        "status": status,
+        "content_type": content_type,
+        "body": body,
+        "gzip": gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_SIZE else None,
+        "etag": f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+    }
+
+
+class MaveDBServer:
+    """
+    A threaded HTTP server in front of a LocalClient.
+
+    Endpoints (the api/ prefix is optional):
+
+    - api/scoresets?keywords=&organisms=&categories=&limit=&offset= lists scoresets
+    - api/scoresets/{urn}/ returns the metadata of a scoreset
+    - api/experiments/{urn}/ returns the metadata of an experiment
+    - scoreset/{urn}/scores/ (and api/scoresets/{urn}/scores) returns the score table
+
+    Responses carry an ETag and are gzip-compressed for clients that accept it.
+    Recently served responses are kept in a ResponseLRU.
+    """
+
+    def __init__(self, client, host="127.0.0.1", port=8000, cache_bytes=64 << 20):
+        """
+        Creates the server, it is started by serve_forever or start.
+
+        Parameters
+        ----------
+
+        client
+            The LocalClient that is served.
+
+        host
+            Address the server binds to.
+
+        port
+            Port the server listens on, 0 for a free port.
+
+        cache_bytes
+            Maximum total size of the cached responses.
+        """
+
+        self.client = client
+        self.cache = ResponseLRU(cache_bytes)
+        # the catalog is built (if necessary) here, the request threads each read it through
+        # their own read-only connection, see catalog
+        self.catalog_path = client.catalog.path
+        self.local = threading.local()
+        self.thread = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self):
+        """
+        The url to pass to Client as base_url.
+        """
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/api/"
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def start(self):
+        """
+        Serves in a background thread.
+        """
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    @property
+    def catalog(self):
+        """
+        The read-only Catalog of the current request thread, opened on first access. SQLite
+        serializes the use of a connection, so threads do not share one.
+        """
+        catalog = getattr(self.local, "catalog", None)
+        if catalog is None:
+            catalog = Catalog(self.catalog_path, read_only=True)
+            self.local.catalog = catalog
+        return catalog
+
+    def respond(self, path, query):
+        """
+        Computes the response to a GET request, through the cache.
+
+        Parameters
+        ----------
+
+        path
+            Path of the request without the query string.
+
+        query
+            The query string.
+
+        Returns
+        -------
+
+        response
+            A dictionary with status, content_type, body and etag.
+        """
+
+        key = (path, query)
+        response = self.cache.get(key)
+        if response is None:
+            response = self.route(path, parse_qs(query))
+            if response["status"] == 200:
+                self.cache.put(key, response)
+        return response
+
+    def route(self, path, params):
+        parts = [unquote(part) for part in path.split("/") if part != ""]
+        if len(parts) > 0 and parts[0] == "api":
+            parts = parts[1:]
+
+        try:
+            if parts == ["scoresets"]:
+                return self.list_scoresets(params)
+            if len(parts) == 2 and parts[0] == "scoresets":
+                return _response(200, self.catalog.get(parts[1]))
+            if len(parts) == 2 and parts[0] == "experiments":
+                return _response(200, self.catalog.get_experiment(parts[1]))
+            if len(parts) == 3 and parts[0] in ("scoreset", "scoresets") and parts[2] == "scores":
+                text = self.client.retrieve_score_table(parts[1])
+                return _response(200, text.encode("utf-8"), content_type="text/csv; charset=utf-8")
+        except (KeyError, FileNotFoundError):
+            pass
+        return _response(404, {"detail": "Not found"})
+
+    def list_scoresets(self, params):
+        try:
+            limit = int(params["limit"][0]) if "limit" in params else None
+            offset = int(params["offset"][0]) if "offset" in params else 0
+        except ValueError:
+            return _response(400, {"detail": "limit and offset must be integers"})
+        scoresets = list(
+            self.catalog.iter_scoresets(
+                keywords=params.get("keywords"),
+                organisms=params.get("organisms"),
+                experiment_types=params.get("categories"),
+                limit=limit,
+                offset=offset,
+            )
+        )
+        return _response(200, scoresets)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                response = server.respond(url.path, url.query)
+                body = response["body"]
+                headers = {"Content-Type": response["content_type"], "ETag": response["etag"]}
+
+                if response["status"] == 200 and self.headers.get("If-None-Match") == response["etag"]:
+                    self.send_response(304)
+                    for key, value in headers.items():
+                        self.send_header(key, value)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                accept_encoding = self.headers.get("Accept-Encoding") or ""
+                if "gzip" in accept_encoding and response["gzip"] is not None:
+                    body = response["gzip"]
+                    headers["Content-Encoding"] = "gzip"
+                headers["Vary"] = "Accept-Encoding"
+
+                self.send_response(response["status"])
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serves a local clone of MaveDB over HTTP.")
+    parser.add_argument("local_instance_path", help="path to the local clone (directory or archive)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--cache-mb", type=int, default=64, help="size of the in-memory response cache")
+    args = parser.parse_args()
+
+    from mavetools.client.client import LocalClient
+
+    server = MaveDBServer(
+        LocalClient(args.local_instance_path), host=args.host, port=args.port, cache_bytes=args.cache_mb << 20
+    )
+    print(f"Serving {args.local_instance_path} at {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
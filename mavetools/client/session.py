@@ -0,0 +1,350 @@
+import email.utils
+import gzip
+import hashlib
+import logging
+import os
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from mavetools.client.exceptions import (
+    MaveDBConnectionError,
+    MaveDBHTTPError,
+    MaveDBTimeoutError,
+)
+
+
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+
+
+def parse_retry_after(value):
+    """
+    Parses the value of a Retry-After header.
+
+    Parameters
+    ----------
+
+    value
+        Header value, either a number of seconds or an HTTP date.
+
+    Returns
+    -------
+
+    seconds
+        Number of seconds to wait, or None if the value could not be parsed.
+    """
+
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date is None:
+        return None
+    return max(0.0, date.timestamp() - time.time())
+
+
+class MaveSession:
+    """
+    A pooled HTTP session shared by all requests of a client.
+
+    Connections are kept alive and reused, failed requests are retried with a bounded
+    exponential backoff and all errors are raised as MaveDBError subclasses.
+    """
+
+    def __init__(
+        self,
+        pool_connections=10,
+        pool_maxsize=32,
+        max_retries=5,
+        backoff_factor=0.5,
+        backoff_max=60.0,
+        timeout=(10, 120),
+        retry_statuses=RETRY_STATUSES,
+        headers=None,
+        sleep=time.sleep,
+    ):
+        """
+        Initializes the session.
+
+        Parameters
+        ----------
+
+        pool_connections
+            Number of host pools to cache.
+
+        pool_maxsize
+            Maximum number of keep-alive connections per host.
+
+        max_retries
+            Maximum number of retries of a single request, not counting the first attempt.
+
+        backoff_factor
+            The n-th retry waits backoff_factor * 2**n seconds.
+
+        backoff_max
+            Upper bound for a single wait, also applied to Retry-After headers.
+
+        timeout
+            Default (connect, read) timeout in seconds for every request.
+
+        retry_statuses
+            Status codes that trigger a retry.
+
+        headers
+            Headers sent with every request.
+
+        sleep
+            Function used to wait between attempts.
+        """
+
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.retry_statuses = frozenset(retry_statuses)
+        self.sleep = sleep
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if headers is not None:
+            self.session.headers.update(headers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Closes all pooled connections.
+        """
+        self.session.close()
+
+    def backoff_delay(self, attempt, response=None):
+        """
+        Computes how long to wait before the next attempt.
+
+        Parameters
+        ----------
+
+        attempt
+            Number of the retry that is about to happen, starting at 0.
+
+        response
+            The failed response, if there is one. Its Retry-After header takes precedence.
+
+        Returns
+        -------
+
+        seconds
+            Time to wait in seconds.
+        """
+
+        delay = self.backoff_factor * (2 ** attempt)
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                delay = retry_after
+        return min(delay, self.backoff_max)
+
+    def request(self, method, url, idempotent=None, raise_for_status=True, **kwargs):
+        """
+        Performs an HTTP request with retries.
+
+        Parameters
+        ----------
+
+        method
+            HTTP method.
+
+        url
+            Requested url.
+
+        idempotent
+            Whether the request may be sent more than once. Defaults to True for GET, HEAD,
+            OPTIONS, PUT and DELETE.
+
+        raise_for_status
+            When True, error status codes are raised as MaveDBHTTPError.
+
+        kwargs
+            Passed on to requests.Session.request.
+
+        Returns
+        -------
+
+        response
+            The requests.Response object.
+        """
+
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        kwargs.setdefault("timeout", self.timeout)
+        retries = self.max_retries if idempotent else 0
+
+        attempt = 0
+        while True:
+            _rewind_files(kwargs.get("files"))
+            try:
+                r = self.session.request(method, url, **kwargs)
+            except requests.exceptions.Timeout as e:
+                if attempt >= retries:
+                    raise MaveDBTimeoutError(f"{method} {url} timed out: {e}") from e
+                error = e
+                r = None
+            except requests.exceptions.ConnectionError as e:
+                if attempt >= retries:
+                    raise MaveDBConnectionError(f"{method} {url} failed: {e}") from e
+                error = e
+                r = None
+            else:
+                if r.status_code not in self.retry_statuses or attempt >= retries:
+                    break
+                error = f"status {r.status_code}"
+                r.close()
+
+            delay = self.backoff_delay(attempt, r)
+            logging.warning(
+                f"{method} {url} failed ({error}), retry {attempt + 1}/{retries} in {delay:.1f}s"
+            )
+            self.sleep(delay)
+            attempt += 1
+
+        if raise_for_status and r.status_code >= 400:
+            body = r.text
+            logging.error(body)
+            raise MaveDBHTTPError(
+                f"{method} {url} returned {r.status_code}",
+                status_code=r.status_code,
+                url=url,
+                body=body,
+            )
+        return r
+
+    def get(self, url, **kwargs):
+        """
+        Performs a GET request, see request.
+        """
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        """
+        Performs a POST request, see request.
+        """
+        return self.request("POST", url, **kwargs)
+
+    def download(self, url, filepath, compress=False, chunk_size=1 << 16, **kwargs):
+        """
+        Streams a response body to a file without holding it in memory.
+
+        Compressed transfer encoding is requested, the body is written in chunks to a
+        temporary file that replaces filepath once the download is complete. Downloads that
+        break off mid-stream are restarted up to max_retries times.
+
+        Parameters
+        ----------
+
+        url
+            Requested url.
+
+        filepath
+            Path to the written file.
+
+        compress
+            When True, the file is written gzip-compressed.
+
+        chunk_size
+            Number of bytes read from the connection at once.
+
+        kwargs
+            Passed on to request.
+
+        Returns
+        -------
+
+        size
+            Number of bytes written to disk.
+
+        hexdigest
+            sha256 hex digest of the bytes written to disk.
+        """
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        headers.setdefault("Accept-Encoding", "gzip")
+        tmp_path = f"{filepath}.part"
+
+        attempt = 0
+        while True:
+            r = self.request("GET", url, stream=True, headers=headers, **kwargs)
+            try:
+                with open(tmp_path, "wb") as raw:
+                    out = _HashingWriter(raw)
+                    if compress:
+                        with gzip.GzipFile(fileobj=out, mode="wb", mtime=0) as gz:
+                            for chunk in r.iter_content(chunk_size=chunk_size):
+                                gz.write(chunk)
+                    else:
+                        for chunk in r.iter_content(chunk_size=chunk_size):
+                            out.write(chunk)
+                break
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+                if attempt >= self.max_retries:
+                    raise MaveDBConnectionError(f"GET {url} broke off: {e}") from e
+                delay = self.backoff_delay(attempt)
+                logging.warning(
+                    f"GET {url} broke off ({e}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s"
+                )
+                self.sleep(delay)
+                attempt += 1
+            finally:
+                r.close()
+
+        os.replace(tmp_path, filepath)
+        return out.size, out.sha256.hexdigest()
+
+
+class _HashingWriter:
+    """
+    File wrapper that counts and hashes all bytes written through it.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+
+    def write(self, data):
+        self.size += len(data)
+        self.sha256.update(data)
+        return self.f.write(data)
+
+    def flush(self):
+        self.f.flush()
+
+
+def _rewind_files(files):
+    """
+    Seeks all file objects of a multipart files argument back to the start, so that a
+    retried request uploads the complete files again.
+    """
+
+    if not files:
+        return
+    values = files.values() if isinstance(files, dict) else [value for _, value in files]
+    for value in values:
+        fileobj = value[1] if isinstance(value, tuple) else value
+        if hasattr(fileobj, "seek"):
+            fileobj.seek(0)
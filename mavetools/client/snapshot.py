@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+import pickle
+
+from mavetools.client.archive import DirectoryClone
+from mavetools.client.function_type import classifier_version
+
+
+SNAPSHOT_VERSION = 1
+
+
+def clone_fingerprint(local_instance_path, clone=None):
+    """
+    Returns a string that changes whenever a local clone changes: the signature of its main.json,
+    together with the hash of its manifest if the clone has one (see Client.sync).
+
+    Parameters
+    ----------
+
+    local_instance_path
+        Path to the local clone.
+
+    clone
+        The DirectoryClone, ZipClone or TarClone the clone is read from,
+        by default the directory local_instance_path.
+    """
+
+    if clone is None:
+        clone = DirectoryClone(local_instance_path)
+    fingerprint = f"main.json:{clone.signature('main.json')}"
+    if clone.exists("manifest.json"):
+        f = clone.open_text("manifest.json")
+        artifacts = json.load(f)["artifacts"]
+        f.close()
+        # the same hash as CloneManifest.hexdigest
+        content = json.dumps(artifacts, sort_keys=True)
+        fingerprint = f"{fingerprint};manifest:{hashlib.sha256(content.encode()).hexdigest()}"
+    return fingerprint
+
+
+def save_snapshot(path, experiment_dict, fingerprint, key=None):
+    """
+    Writes a snapshot of an experiment_dict.
+
+    Parameters
+    ----------
+
+    path
+        Path to the snapshot file.
+
+    experiment_dict
+        The dictionary returned by search_database.
+
+    fingerprint
+        Fingerprint of the clone the experiment_dict was built from, see clone_fingerprint.
+
+    key
+        Any picklable value describing how the experiment_dict was built, for example the search filters.
+    """
+
+    # the experiment types of the stored MLExperiments depend on the classification rules
+    header = {"version": SNAPSHOT_VERSION, "classifier": classifier_version(), "fingerprint": fingerprint, "key": key}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.part"
+    with open(tmp_path, "wb") as f:
+        # the header is pickled separately, so that a stale snapshot is rejected without loading it
+        pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(experiment_dict, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path, fingerprint, key=None):
+    """
+    Loads a snapshot written by save_snapshot.
+
+    Returns
+    -------
+
+    experiment_dict
+        The stored experiment_dict, None if there is no snapshot, it has another version or
+        it was built from another clone state, with other classification rules or with another key.
+    """
+
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        try:
+            header = pickle.load(f)
+        except (pickle.UnpicklingError, EOFError, ValueError):
+            return None
+        if not isinstance(header, dict) or header.get("version") != SNAPSHOT_VERSION:
+            return None
+        if header.get("classifier") != classifier_version():
+            return None
+        if header.get("fingerprint") != fingerprint or header.get("key") != key:
+            return None
+        try:
+            return pickle.load(f)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
@@ -0,0 +1,145 @@
+import json
+import os
+
+from mavetools.client.manifest import write_atomic
+
+
+def scoreset_version(scoreset):
+    """
+    Returns the fields that identify a version of a scoreset. Two scoresets with the same urn
+    and the same version carry the same metadata and score table.
+
+    Parameters
+    ----------
+
+    scoreset
+        json object of a scoreset.
+
+    Returns
+    -------
+
+    version
+        A list of the modification date, current version and superseding scoreset.
+    """
+
+    current_version = scoreset.get("currentVersion", scoreset.get("current_version"))
+    superseding = scoreset.get("supersedingScoreSet")
+    if isinstance(superseding, dict):
+        superseding = superseding.get("urn")
+    return [scoreset.get("modificationDate"), current_version, superseding]
+
+
+def parent_urns(scoreset):
+    """
+    Determines the experiment and experiment set urns of a scoreset.
+
+    Uses the embedded experiment object when there is one, otherwise the urns are derived
+    from the scoreset urn (urn:mavedb:00000001-a-1 belongs to experiment urn:mavedb:00000001-a
+    of experiment set urn:mavedb:00000001).
+
+    Parameters
+    ----------
+
+    scoreset
+        json object of a scoreset.
+
+    Returns
+    -------
+
+    experiment_urn
+
+    experiment_set_urn
+    """
+
+    experiment = scoreset.get("experiment") or {}
+    experiment_urn = experiment.get("urn")
+    if experiment_urn is None:
+        experiment_urn = scoreset["urn"].rsplit("-", 1)[0]
+    experiment_set_urn = experiment.get("experimentSetUrn")
+    if experiment_set_urn is None:
+        experiment_set_urn = experiment_urn.rsplit("-", 1)[0]
+    return experiment_urn, experiment_set_urn
+
+
+class MainJsonTree:
+    """
+    The experimentSets -> experiments -> scoreSets tree of a main.json file, indexed by urn
+    so that scoresets can be replaced and inserted in place.
+    """
+
+    def __init__(self, main_meta_data):
+        """
+        Indexes a parsed main.json.
+
+        Parameters
+        ----------
+
+        main_meta_data
+            json object of a main.json file.
+        """
+
+        self.main_meta_data = main_meta_data
+        self.experiment_sets = {}
+        self.experiments = {}
+        self.scoresets = {}
+        for experiment_set in main_meta_data.setdefault("experimentSets", []):
+            self.experiment_sets[experiment_set["urn"]] = experiment_set
+            for experiment in experiment_set.setdefault("experiments", []):
+                self.experiments[experiment["urn"]] = experiment
+                for pos, scoreset in enumerate(experiment.setdefault("scoreSets", [])):
+                    self.scoresets[scoreset["urn"]] = (experiment, pos)
+
+    @classmethod
+    def load(cls, filepath):
+        """
+        Loads a main.json file, an empty tree if the file does not exist.
+        """
+        if not os.path.exists(filepath):
+            return cls({"experimentSets": []})
+        f = open(filepath, "r")
+        main_meta_data = json.load(f)
+        f.close()
+        return cls(main_meta_data)
+
+    def save(self, filepath):
+        """
+        Writes the tree atomically to a main.json file.
+        """
+        write_atomic(filepath, json.dumps(self.main_meta_data).encode())
+
+    def get(self, urn):
+        """
+        Getter for a scoreset, None if it is not in the tree.
+        """
+        if urn not in self.scoresets:
+            return None
+        experiment, pos = self.scoresets[urn]
+        return experiment["scoreSets"][pos]
+
+    def put(self, scoreset):
+        """
+        Replaces a scoreset with the same urn, or inserts it below its experiment. Missing
+        experiments and experiment sets are created.
+        """
+
+        urn = scoreset["urn"]
+        if urn in self.scoresets:
+            experiment, pos = self.scoresets[urn]
+            experiment["scoreSets"][pos] = scoreset
+            return
+
+        experiment_urn, experiment_set_urn = parent_urns(scoreset)
+        if experiment_set_urn not in self.experiment_sets:
+            experiment_set = {"urn": experiment_set_urn, "experiments": []}
+            self.main_meta_data["experimentSets"].append(experiment_set)
+            self.experiment_sets[experiment_set_urn] = experiment_set
+        if experiment_urn not in self.experiments:
+            experiment = dict(scoreset.get("experiment") or {})
+            experiment["urn"] = experiment_urn
+            experiment["scoreSets"] = []
+            self.experiment_sets[experiment_set_urn]["experiments"].append(experiment)
+            self.experiments[experiment_urn] = experiment
+
+        experiment = self.experiments[experiment_urn]
+        experiment["scoreSets"].append(scoreset)
+        self.scoresets[urn] = (experiment, len(experiment["scoreSets"]) - 1)
@@ -0,0 +1,96 @@
+class UrnIndex:
+    """
+    The experiment set -> experiments -> scoresets hierarchy of a clone as dictionaries, so
+    that experiment set and experiment urns can be expanded into their scoreset urns.
+    """
+
+    def __init__(self, rows):
+        """
+        Builds the index.
+
+        Parameters
+        ----------
+
+        rows
+            Iterable of (experiment_set_urn, experiment_urn, scoreset_urn) tuples in clone order.
+        """
+
+        self.experiment_sets = {}
+        self.experiments = {}
+        self.scoresets = {}
+        for experiment_set_urn, experiment_urn, scoreset_urn in rows:
+            experiments = self.experiment_sets.setdefault(experiment_set_urn, [])
+            if experiment_urn not in self.experiments:
+                experiments.append(experiment_urn)
+                self.experiments[experiment_urn] = []
+            self.experiments[experiment_urn].append(scoreset_urn)
+            self.scoresets[scoreset_urn] = experiment_urn
+
+    def __contains__(self, urn):
+        return urn in self.scoresets or urn in self.experiments or urn in self.experiment_sets
+
+    def expand_urn(self, urn):
+        """
+        Expands a single urn into scoreset urns.
+
+        Parameters
+        ----------
+
+        urn
+            MaveDB urn identifier of an experiment set, an experiment or a scoreset.
+
+        Returns
+        -------
+
+        scoreset_urns
+            List of the scoreset urns below the urn, the urn itself for scoresets.
+
+        Raises
+        ------
+        KeyError
+            If the urn is not in the clone.
+        """
+
+        if urn in self.scoresets:
+            return [urn]
+        if urn in self.experiments:
+            return list(self.experiments[urn])
+        if urn in self.experiment_sets:
+            return [
+                scoreset_urn
+                for experiment_urn in self.experiment_sets[urn]
+                for scoreset_urn in self.experiments[experiment_urn]
+            ]
+        raise KeyError(urn)
+
+    def expand(self, urns):
+        """
+        Expands a list of urns into scoreset urns.
+
+        Parameters
+        ----------
+
+        urns
+            List of MaveDB urn identifiers of experiment sets, experiments or scoresets.
+
+        Returns
+        -------
+
+        scoreset_urns
+            List of scoreset urns without duplicates, in the order of urns.
+
+        missing
+            List of the urns that are not in the clone.
+        """
+
+        scoreset_urns = {}
+        missing = []
+        for urn in urns:
+            try:
+                expanded = self.expand_urn(urn)
+            except KeyError:
+                missing.append(urn)
+                continue
+            for scoreset_urn in expanded:
+                scoreset_urns[scoreset_urn] = None
+        return list(scoreset_urns), missing
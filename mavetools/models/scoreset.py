@@ -192,6 +192,62 @@ class ScoreSet(APIObject, Dataset):
             score_pos = exp_score_pos
         return hgvs_pro_pos, hgvs_nt_pos, score_pos
 
+# Field names of ScoreSet mapped to their defaults, attr.NOTHING for required fields
+SCORESET_FIELDS = {field.name: field.default for field in attr.fields(ScoreSet)}
+
+class LazyScoreSet(ScoreSet):
+    """
+    A ScoreSet that keeps the json dictionary it was created from and reads an attribute
+    from it on first access, instead of building all attributes up front.
+
+    The attributes hold the same (not copied) values as in a deserialized ScoreSet, so
+    get_protein_sequence, get_full_sequence_info and get_score_table_positions behave the same.
+    Unlike ScoreSet.deserialize, the json dictionary is not checked for missing or unknown keys.
+    The attrs comparison checks the class, so a LazyScoreSet never equals a ScoreSet;
+    compare materialize() to the ScoreSet instead.
+    """
+
+    def __init__(self, json_dict):
+        self._json = json_dict
+
+    def deserialize(json_dict):
+        """
+        Takes a json dictionary and returns a LazyScoreSet of it.
+        """
+        return LazyScoreSet(json_dict)
+
+    def __getattr__(self, name):
+        # only called for attributes that are not materialized yet
+        if name[0] == '_' or name not in SCORESET_FIELDS:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        if name in self._json:
+            value = self._json[name]
+        elif SCORESET_FIELDS[name] is not attr.NOTHING:
+            value = SCORESET_FIELDS[name]
+        else:
+            raise AttributeError(f"Required field '{name}' is missing in the json of the scoreset")
+        self.__dict__[name] = value
+        return value
+
+    def to_json(self):
+        """
+        Returns the json dictionary the scoreset was created from.
+        """
+        return self._json
+
+    def materialize(self):
+        """
+        Returns a fully deserialized ScoreSet, with the attributes changed on this object.
+        """
+        json_dict = dict(self._json)
+        for name, value in self.__dict__.items():
+            if name in SCORESET_FIELDS:
+                json_dict[name] = value
+        scoreset = ScoreSet.deserialize(json_dict)
+        if 'corrected_seq' in self.__dict__:
+            scoreset.corrected_seq = self.corrected_seq
+        return scoreset
+
 class ProteinGymScoreset(ScoreSet):
     def __init__(self, target_name, uniprot, seq, scoresetdata, offset = 0):
         self.targetGenes = []
@@ -41,5 +41,6 @@ setup(
     ],
     python_requires=">=3.6",
     install_requires=requirements,
+    extras_require={"zstd": ["zstandard"]},
     test_suite="tests",
 )
@@ -0,0 +1,23 @@
+"""
+Imports mavetools.client.client for the tests.
+
+The models import sequence alignment functions from structman, which is not needed by the
+client. When structman is not installed, its module is replaced by a stub whose functions
+raise NotImplementedError.
+"""
+import sys
+import types
+
+try:
+    import structman.lib.globalAlignment  # noqa: F401
+except ImportError:
+
+    def _not_available(*args, **kwargs):
+        raise NotImplementedError("structman is not installed")
+
+    for name in ("structman", "structman.lib", "structman.lib.globalAlignment"):
+        sys.modules.setdefault(name, types.ModuleType(name))
+    sys.modules["structman.lib.globalAlignment"].init_bp_aligner_class = _not_available
+    sys.modules["structman.lib.globalAlignment"].call_biopython_alignment = _not_available
+
+from mavetools.client import client  # noqa: E402
@@ -0,0 +1,96 @@
+"""
+Builds small local MaveDB clones (main.json and csv/) for the client tests.
+"""
+import json
+import os
+
+
+def make_scoreset(urn, organism="Homo sapiens", category="protein_coding", keywords=(), num_variants=3, **fields):
+    scoreset = {
+        "urn": urn,
+        "title": f"Scoreset {urn}",
+        "shortDescription": "Deep mutational scan",
+        "methodText": "",
+        "abstractText": "",
+        "primaryPublicationIdentifiers": [],
+        "numVariants": num_variants,
+        "modificationDate": "2023-01-01",
+        "keywords": [{"text": keyword} for keyword in keywords],
+        "target": {"reference_maps": [{"genome": {"organism_name": organism}}]},
+        "targetGenes": [
+            {
+                "name": f"GENE{urn[-3:]}",
+                "category": category,
+                "externalIdentifiers": [],
+                "targetSequence": {"sequence": "MKV", "sequenceType": "protein"},
+            }
+        ],
+        "datasetColumns": {"scoreColumns": ["score"], "countColumns": []},
+    }
+    scoreset.update(fields)
+    return scoreset
+
+
+def make_api_scoreset(urn, organism="Homo sapiens", **fields):
+    """
+    A scoreset in the shape of the MaveDB API, with all fields ScoreSet.deserialize requires.
+    The organism is stored in the taxonomy of the target sequence.
+    """
+
+    scoreset = make_scoreset(urn, **fields)
+    del scoreset["target"]
+    for target_gene in scoreset["targetGenes"]:
+        if "targetSequence" in target_gene:
+            target_gene["targetSequence"]["taxonomy"] = {"organismName": organism}
+    for key, value in (
+        ("license", {"shortName": "CC0"}),
+        ("creationDate", "2023-01-01"),
+        ("publishedDate", "2023-01-01"),
+        ("createdBy", {"orcidId": "0000"}),
+        ("modifiedBy", {"orcidId": "0000"}),
+    ):
+        scoreset.setdefault(key, value)
+    return scoreset
+
+
+def make_main_json(scoresets):
+    experiment_sets = {}
+    for scoreset in scoresets:
+        experiment_urn = scoreset["urn"].rsplit("-", 1)[0]
+        experiment_set_urn = experiment_urn.rsplit("-", 1)[0]
+        experiment_set = experiment_sets.setdefault(experiment_set_urn, {"urn": experiment_set_urn, "experiments": {}})
+        experiment = experiment_set["experiments"].setdefault(experiment_urn, {"urn": experiment_urn, "scoreSets": []})
+        experiment["scoreSets"].append(scoreset)
+    return {
+        "title": "MaveDB",
+        "experimentSets": [
+            {"urn": urn, "experiments": list(experiment_set["experiments"].values())}
+            for urn, experiment_set in experiment_sets.items()
+        ],
+    }
+
+
+def score_table(urn, rows=3):
+    lines = ["accession,hgvs_nt,hgvs_splice,hgvs_pro,score"]
+    for n in range(rows):
+        lines.append(f"{urn}#{n + 1},c.{n + 1}A>G,NA,p.Met{n + 1}Val,{n * 0.5}")
+    return "\n".join(lines) + "\n"
+
+
+def make_clone(path, scoresets):
+    os.makedirs(f"{path}/csv", exist_ok=True)
+    with open(f"{path}/main.json", "w") as f:
+        json.dump(make_main_json(scoresets), f)
+    for scoreset in scoresets:
+        urn = scoreset["urn"]
+        with open(f"{path}/csv/{urn.replace(':', '-')}.scores.csv", "w") as f:
+            f.write(score_table(urn, scoreset["numVariants"]))
+
+
+DEFAULT_SCORESETS = [
+    make_scoreset("urn:mavedb:00000001-a-1", keywords=["DMS"]),
+    make_scoreset("urn:mavedb:00000001-a-2", organism="Mus musculus"),
+    make_scoreset("urn:mavedb:00000001-b-1", keywords=["DMS", "stability"], num_variants=5),
+    make_scoreset("urn:mavedb:00000002-a-1", category="other_noncoding"),
+    make_scoreset("urn:mavedb:00000003-a-1", organism="Saccharomyces cerevisiae", num_variants=8),
+]
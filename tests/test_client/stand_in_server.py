@@ -0,0 +1,112 @@
+"""
+A minimal local HTTP server that stands in for MaveDB in the client tests.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from mavetools.client.server import MaveDBServer
+from tests.test_client.client_module import client
+
+
+class StandInServer:
+    """
+    Serves scripted responses on a random local port.
+
+    routes maps a path (without query string) to a function that takes the request
+    handler and returns a (status, headers, body) tuple. Every request is recorded in
+    self.requests as a (method, path, headers, body) tuple.
+    """
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if self.headers.get("Transfer-Encoding") == "chunked":
+                    body = self._read_chunked()
+                else:
+                    body = self.rfile.read(length)
+                server.requests.append((self.command, self.path, dict(self.headers), body))
+                route = server.routes.get(self.path.split("?")[0])
+                if route is None:
+                    status, headers, payload = 404, {}, b"not found"
+                else:
+                    status, headers, payload = route(self)
+                if isinstance(payload, str):
+                    payload = payload.encode()
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _read_chunked(self):
+                body = b""
+                while True:
+                    size = int(self.rfile.readline().strip(), 16)
+                    if size == 0:
+                        self.rfile.readline()
+                        return body
+                    body += self.rfile.read(size)
+                    self.rfile.readline()
+
+            do_GET = _handle
+            do_POST = _handle
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def scripted(*responses):
+    """
+    Returns a route that answers with the given (status, headers, body) tuples in turn,
+    repeating the last one.
+    """
+
+    responses = list(responses)
+
+    def route(handler):
+        if len(responses) > 1:
+            return responses.pop(0)
+        return responses[0]
+
+    return route
+
+
+class ServedClone:
+    """
+    A MaveDBServer in front of a LocalClient of a local clone. start returns the base url and
+    can be called again after stop, e.g. after the clone changed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.local_client = None
+        self.server = None
+
+    def start(self):
+        self.local_client = client.LocalClient(self.path)
+        self.server = MaveDBServer(self.local_client, port=0).start()
+        return self.server.base_url
+
+    def stop(self):
+        self.server.shutdown()
+        self.local_client.catalog.close()
@@ -0,0 +1,115 @@
+import io
+import json
+import os
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+from mavetools.client.archive import DirectoryClone, TarClone, ZipClone, open_clone
+from mavetools.client.catalog import Catalog
+from tests.test_client.local_clone import DEFAULT_SCORESETS, make_clone, make_main_json, score_table
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class TestArchiveClones(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = self.tmp.name
+        self.clone_path = f"{self.path}/mavedb"
+        make_clone(self.clone_path, DEFAULT_SCORESETS)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def archives(self):
+        zip_path = f"{self.path}/mavedb.zip"
+        with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for root, _, filenames in os.walk(self.clone_path):
+                for filename in filenames:
+                    archive.write(f"{root}/{filename}", os.path.relpath(f"{root}/{filename}", self.path))
+        archives = {"zip": zip_path}
+        for extension, mode in ((".tar", "w"), (".tar.gz", "w:gz")):
+            with tarfile.open(f"{self.path}/mavedb{extension}", mode) as archive:
+                archive.add(self.clone_path, arcname="mavedb")
+            archives[extension] = f"{self.path}/mavedb{extension}"
+        if zstandard is not None:
+            buffer = io.BytesIO()
+            with tarfile.open(fileobj=buffer, mode="w") as archive:
+                archive.add(self.clone_path, arcname="mavedb")
+            with open(f"{self.path}/mavedb.tar.zst", "wb") as f:
+                f.write(zstandard.ZstdCompressor().compress(buffer.getvalue()))
+            archives[".tar.zst"] = f"{self.path}/mavedb.tar.zst"
+        return archives
+
+    def test_members_are_read_in_place(self):
+        expected_names = sorted(f"{scoreset['urn'].replace(':', '-')}.scores.csv" for scoreset in DEFAULT_SCORESETS)
+        urn = DEFAULT_SCORESETS[3]["urn"]
+        member = f"csv/{urn.replace(':', '-')}.scores.csv"
+        for kind, path in self.archives().items():
+            with self.subTest(kind=kind):
+                clone = open_clone(path)
+                self.assertNotIsInstance(clone, DirectoryClone)
+                self.assertEqual(clone.list("csv"), expected_names)
+                self.assertTrue(clone.exists("main.json"))
+                self.assertFalse(clone.exists("csv"))
+                f = clone.open_text(member)
+                self.assertEqual(f.read(), score_table(urn, DEFAULT_SCORESETS[3]["numVariants"]))
+                f.close()
+                f = clone.open_text("main.json")
+                self.assertEqual(json.load(f), make_main_json(DEFAULT_SCORESETS))
+                f.close()
+                clone.close()
+
+    def test_iter_files(self):
+        names = [f"csv/{scoreset['urn'].replace(':', '-')}.scores.csv" for scoreset in DEFAULT_SCORESETS]
+        expected = {
+            name: score_table(scoreset["urn"], scoreset["numVariants"]) for name, scoreset in zip(names, DEFAULT_SCORESETS)
+        }
+        for kind, path in dict(self.archives(), directory=self.clone_path).items():
+            with self.subTest(kind=kind):
+                clone = open_clone(path)
+                contents = {name: f.read().decode() for name, f in clone.iter_files(reversed(names[1:]))}
+                self.assertEqual(contents, {name: expected[name] for name in names[1:]})
+                clone.close()
+
+    def test_tar_iter_files_reads_the_archive_once(self):
+        clone = TarClone(self.archives()[".tar.gz"], compression="gz")
+        opened = []
+        open_stream = clone._open_stream
+
+        def counting_open_stream():
+            opened.append(1)
+            return open_stream()
+
+        clone._open_stream = counting_open_stream
+        names = [name for name in clone.members if name.startswith("csv/")]
+        self.assertEqual(len([name for name, _ in clone.iter_files(names)]), len(DEFAULT_SCORESETS))
+        self.assertEqual(len(opened), 1)
+
+    def test_tar_index_is_cached(self):
+        tar_path = self.archives()[".tar"]
+        index_path = f"{self.path}/archive_index.json"
+        members = TarClone(tar_path, index_path=index_path).members
+        self.assertTrue(os.path.exists(index_path))
+
+        clone = TarClone(tar_path, index_path=index_path)
+        clone.build_index = None
+        self.assertEqual(clone.members, members)
+
+    def test_catalog_from_zip(self):
+        clone = ZipClone(self.archives()["zip"])
+        work_path = f"{self.path}/mavedb.zip.d"
+        os.makedirs(work_path)
+        catalog = Catalog.for_clone(work_path, clone=clone)
+        self.assertEqual(catalog.urns(), [scoreset["urn"] for scoreset in DEFAULT_SCORESETS])
+        self.assertEqual(catalog.meta("source"), clone.signature("main.json"))
+        catalog.close()
+
+    def test_unsupported_path(self):
+        with self.assertRaises(ValueError):
+            open_clone(f"{self.path}/mavedb.rar")
@@ -0,0 +1,85 @@
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from mavetools.client.batch import ItemResult, RequestCoalescer, TokenBucket, idempotency_key
+
+
+class TestRequestCoalescer(unittest.TestCase):
+    def test_in_flight_calls_are_shared(self):
+        coalescer = RequestCoalescer()
+        release = threading.Event()
+        calls = []
+
+        def fetch(key):
+            calls.append(key)
+            release.wait(5)
+            return key.upper()
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            first = coalescer.submit(executor, "a", fetch, "a")
+            second = coalescer.submit(executor, "a", fetch, "a")
+            other = coalescer.submit(executor, "b", fetch, "b")
+            release.set()
+            self.assertIs(first, second)
+            self.assertEqual((first.result(), other.result()), ("A", "B"))
+
+        self.assertEqual(sorted(calls), ["a", "b"])
+        self.assertEqual(coalescer.in_flight, {})
+
+    def test_finished_calls_are_not_reused(self):
+        coalescer = RequestCoalescer()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            first = coalescer.submit(executor, "a", len, "a")
+            first.result()
+            second = coalescer.submit(executor, "a", len, "a")
+        self.assertIsNot(first, second)
+
+
+class TestItemResult(unittest.TestCase):
+    def test_ok(self):
+        self.assertTrue(ItemResult("a", value=1).ok)
+        self.assertFalse(ItemResult("a", error=ValueError()).ok)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_rate_limit(self):
+        now = [0.0]
+
+        def sleep(delay):
+            now[0] += delay
+
+        bucket = TokenBucket(2.0, burst=3, clock=lambda: now[0], sleep=sleep)
+        for _ in range(7):
+            bucket.acquire()
+        # 3 tokens from the burst, 4 more at 2 tokens per second
+        self.assertAlmostEqual(now[0], 2.0)
+
+
+class TestIdempotencyKey(unittest.TestCase):
+    def test_key_is_stable(self):
+        with tempfile.TemporaryFile() as f:
+            f.write(b"accession,score\n")
+            f.flush()
+            files = {"score_data": ("score_data.csv", f, "application/octet-stream")}
+            key = idempotency_key("scoresets/", {"title": "a", "keywords": ["x"]}, files)
+            self.assertEqual(key, idempotency_key("scoresets/", {"keywords": ["x"], "title": "a"}, files))
+            self.assertNotEqual(key, idempotency_key("scoresets/", {"title": "b", "keywords": ["x"]}, files))
+            self.assertNotEqual(key, idempotency_key("experiments/", {"title": "a", "keywords": ["x"]}, files))
+
+    def test_key_hashes_file_contents(self):
+        with tempfile.TemporaryFile() as f:
+            f.write(b"accession,score\n1,0.5\n")
+            f.seek(0)
+            files = {"score_data": ("score_data.csv", f, "application/octet-stream")}
+            key = idempotency_key("scoresets/", {}, files)
+            self.assertEqual(f.tell(), 0)
+            # same name and size, different content
+            f.seek(0)
+            f.write(b"accession,score\n1,0.7\n")
+            f.seek(0)
+            self.assertNotEqual(key, idempotency_key("scoresets/", {}, files))
+            self.assertNotEqual(
+                key, idempotency_key("scoresets/", {}, {"score_data": ("score_data.csv", b"", "text/csv")})
+            )
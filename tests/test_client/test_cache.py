@@ -0,0 +1,56 @@
+import tempfile
+import time
+import unittest
+
+from mavetools.client.cache import ResponseCache
+from mavetools.client.exceptions import MaveDBOfflineError
+from mavetools.client.session import MaveSession
+from tests.test_client.stand_in_server import StandInServer
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.session = MaveSession()
+
+    def tearDown(self):
+        self.session.close()
+        self.tmp.cleanup()
+
+    def test_revalidates_with_etag(self):
+        def route(handler):
+            if handler.headers.get("If-None-Match") == '"v1"':
+                return 304, {"ETag": '"v1"'}, b""
+            return 200, {"ETag": '"v1"'}, b"[1, 2, 3]"
+
+        cache = ResponseCache(self.tmp.name)
+        with StandInServer({"/scoresets": route}) as server:
+            url = f"{server.url}scoresets"
+            self.assertEqual(cache.fetch(self.session, url), b"[1, 2, 3]")
+            self.assertEqual(ResponseCache(self.tmp.name).fetch(self.session, url), b"[1, 2, 3]")
+        self.assertNotIn("If-None-Match", server.requests[0][2])
+        self.assertEqual(server.requests[1][2]["If-None-Match"], '"v1"')
+
+    def test_offline_mode(self):
+        with StandInServer({"/scoresets": lambda handler: (200, {}, b"[]")}) as server:
+            url = f"{server.url}scoresets"
+            ResponseCache(self.tmp.name).fetch(self.session, url)
+            offline = ResponseCache(self.tmp.name, offline=True)
+            self.assertEqual(offline.fetch(self.session, url), b"[]")
+            with self.assertRaises(MaveDBOfflineError):
+                offline.fetch(self.session, f"{server.url}experiments")
+        self.assertEqual(len(server.requests), 1)
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(self.tmp.name, max_bytes=25)
+        cache.store("a", b"a" * 10, {})
+        time.sleep(0.01)
+        cache.store("b", b"b" * 10, {})
+        time.sleep(0.01)
+        cache.read("a")
+        time.sleep(0.01)
+        cache.store("c", b"c" * 10, {})
+        self.assertIsNotNone(cache.read("a"))
+        self.assertIsNone(cache.read("b"))
+        self.assertIsNotNone(cache.read("c"))
+        self.assertEqual(ResponseCache(self.tmp.name).size(), 20)
@@ -0,0 +1,96 @@
+import json
+import multiprocessing
+import os
+import pickle
+import sqlite3
+import tempfile
+import unittest
+
+from mavetools.client.catalog import Catalog
+from tests.test_client.local_clone import DEFAULT_SCORESETS, make_clone, make_main_json
+
+
+INHERITED = {}
+
+
+def lookup_in_worker(urn):
+    return os.getpid(), INHERITED["catalog"].get(urn)["urn"]
+
+
+class TestCatalog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = self.tmp.name
+        make_clone(self.path, DEFAULT_SCORESETS)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def urns(self, scoresets):
+        return [scoreset["urn"] for scoreset in scoresets]
+
+    def test_lookup_by_urn(self):
+        catalog = Catalog.for_clone(self.path)
+        self.assertEqual(len(catalog), 5)
+        self.assertEqual(catalog.get("urn:mavedb:00000001-b-1"), DEFAULT_SCORESETS[2])
+        self.assertIn("urn:mavedb:00000002-a-1", catalog)
+        with self.assertRaises(KeyError):
+            catalog.get("urn:mavedb:00000009-a-1")
+        self.assertEqual(catalog.urns(), self.urns(DEFAULT_SCORESETS))
+        catalog.close()
+
+    def test_filters(self):
+        catalog = Catalog.for_clone(self.path)
+        self.assertEqual(
+            self.urns(catalog.iter_scoresets(keywords=["DMS"], organisms=["Homo sapiens"])),
+            ["urn:mavedb:00000001-a-1", "urn:mavedb:00000001-b-1"],
+        )
+        self.assertEqual(
+            self.urns(catalog.iter_scoresets(experiment_types=["other_noncoding"])),
+            ["urn:mavedb:00000002-a-1"],
+        )
+        catalog.close()
+
+    def test_is_reused_until_main_json_changes(self):
+        Catalog.for_clone(self.path).close()
+        built = os.path.getmtime(f"{self.path}/catalog.sqlite")
+        Catalog.for_clone(self.path).close()
+        self.assertEqual(os.path.getmtime(f"{self.path}/catalog.sqlite"), built)
+
+        with open(f"{self.path}/main.json", "w") as f:
+            json.dump(make_main_json(DEFAULT_SCORESETS[:2]), f)
+        catalog = Catalog.for_clone(self.path)
+        self.assertEqual(len(catalog), 2)
+        catalog.close()
+
+    def test_read_only(self):
+        Catalog.for_clone(self.path).close()
+        catalog = Catalog(f"{self.path}/catalog.sqlite", read_only=True)
+        self.assertEqual(len(catalog), 5)
+        with self.assertRaises(sqlite3.OperationalError):
+            catalog.connection.execute("DELETE FROM scoresets")
+        catalog.close()
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "needs fork")
+    def test_forked_workers_open_their_own_connection(self):
+        Catalog.for_clone(self.path).close()
+        catalog = Catalog(f"{self.path}/catalog.sqlite", read_only=True)
+        parent_connection = catalog.connection
+        urns = catalog.urns()
+        INHERITED["catalog"] = catalog
+        try:
+            with multiprocessing.get_context("fork").Pool(2) as pool:
+                results = pool.map(lookup_in_worker, urns)
+        finally:
+            del INHERITED["catalog"]
+        self.assertEqual([urn for _, urn in results], urns)
+        self.assertNotIn(os.getpid(), [pid for pid, _ in results])
+        self.assertIs(catalog.connection, parent_connection)
+        catalog.close()
+
+    def test_pickled_catalog_reopens(self):
+        Catalog.for_clone(self.path).close()
+        catalog = pickle.loads(pickle.dumps(Catalog(f"{self.path}/catalog.sqlite", read_only=True)))
+        self.assertTrue(catalog.read_only)
+        self.assertEqual(catalog.urns(), self.urns(DEFAULT_SCORESETS))
+        catalog.close()
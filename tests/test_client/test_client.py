@@ -0,0 +1,524 @@
+import builtins
+import contextlib
+import errno
+import json
+import os
+import shutil
+import sqlite3
+import tarfile
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from mavetools.client.exceptions import MaveDBError
+from mavetools.client.function_type import FunctionTypeCache
+from mavetools.client.manifest import CloneManifest
+from mavetools.client.predicates import Match, NumVariants
+from mavetools.client.query import CatalogQueryIndex, NumVariantsQuery, QueryIndex, Term
+from mavetools.client.session import MaveSession
+from tests.test_client.client_module import client
+from tests.test_client.local_clone import make_api_scoreset, make_clone, score_table
+from tests.test_client.stand_in_server import ServedClone, StandInServer, scripted
+
+API_SCORESETS = [
+    make_api_scoreset("urn:mavedb:00000001-a-1", keywords=["DMS"]),
+    make_api_scoreset("urn:mavedb:00000001-a-2", organism="Mus musculus"),
+    make_api_scoreset("urn:mavedb:00000001-b-1", keywords=["DMS", "stability"], num_variants=5),
+    make_api_scoreset("urn:mavedb:00000002-a-1", category="other_noncoding"),
+    make_api_scoreset("urn:mavedb:00000003-a-1", num_variants=8),
+]
+
+
+def main_json_urns(path):
+    f = open(f"{path}/main.json")
+    main_meta_data = json.load(f)
+    f.close()
+    return [
+        scoreset["urn"]
+        for experiment_set in main_meta_data["experimentSets"]
+        for experiment in experiment_set["experiments"]
+        for scoreset in experiment["scoreSets"]
+    ]
+
+
+def read_score_table(path, urn):
+    f = open(f"{path}/csv/{urn.replace(':', '-')}.scores.csv")
+    text = f.read()
+    f.close()
+    return text
+
+
+class TestSync(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.upstream = f"{self.tmp.name}/upstream"
+        self.local = f"{self.tmp.name}/local"
+        make_clone(self.upstream, API_SCORESETS)
+        self.served = ServedClone(self.upstream)
+        self.session = MaveSession(max_retries=0)
+        self.client = client.Client(base_url=self.served.start(), session=self.session)
+
+    def tearDown(self):
+        self.session.close()
+        self.served.stop()
+        self.tmp.cleanup()
+
+    def restart(self):
+        self.served.stop()
+        self.client.base_url = self.served.start()
+
+    def test_sync_adds_then_updates_changed_scoresets(self):
+        changes = self.client.sync(self.local, max_workers=3)
+        urns = [scoreset["urn"] for scoreset in API_SCORESETS]
+        self.assertEqual(changes, {"added": urns, "updated": [], "failed": []})
+        self.assertEqual(main_json_urns(self.local), urns)
+        for scoreset in API_SCORESETS:
+            self.assertEqual(read_score_table(self.local, scoreset["urn"]), score_table(scoreset["urn"], scoreset["numVariants"]))
+
+        # the upstream clone changes one scoreset and gets a new one
+        changed = dict(API_SCORESETS[2], modificationDate="2024-06-01", numVariants=7)
+        new = make_api_scoreset("urn:mavedb:00000001-a-3")
+        make_clone(self.upstream, [API_SCORESETS[0], API_SCORESETS[1], new, changed, API_SCORESETS[3], API_SCORESETS[4]])
+        self.restart()
+
+        changes = self.client.sync(self.local, max_workers=3)
+        self.assertEqual(changes, {"added": [new["urn"]], "updated": [changed["urn"]], "failed": []})
+        self.assertEqual(read_score_table(self.local, changed["urn"]), score_table(changed["urn"], 7))
+        self.assertEqual(main_json_urns(self.local), urns[:2] + [new["urn"]] + urns[2:])
+
+        self.assertEqual(self.client.sync(self.local), {"added": [], "updated": [], "failed": []})
+
+    def test_sync_failure_is_retried(self):
+        missing = "urn:mavedb:00000001-b-1"
+        os.remove(f"{self.upstream}/csv/{missing.replace(':', '-')}.scores.csv")
+
+        changes = self.client.sync(self.local)
+        self.assertEqual(changes["failed"], [missing])
+        self.assertNotIn(missing, main_json_urns(self.local))
+        self.assertEqual(CloneManifest(self.local).failed(), ["csv/urn-mavedb-00000001-b-1.scores.csv"])
+
+        make_clone(self.upstream, API_SCORESETS)
+        self.restart()
+        changes = self.client.sync(self.local)
+        self.assertEqual(changes, {"added": [missing], "updated": [], "failed": []})
+        self.assertEqual(main_json_urns(self.local), [scoreset["urn"] for scoreset in API_SCORESETS])
+
+    def test_clone(self):
+        self.client.clone(self.local, max_workers=2)
+        for scoreset in API_SCORESETS:
+            urn = scoreset["urn"]
+            f = open(f"{self.local}/meta_data/{urn}.json")
+            self.assertEqual(json.load(f), scoreset)
+            f.close()
+            f = open(f"{self.local}/scoreset_data/{urn}.csv")
+            self.assertEqual(f.read(), score_table(urn, scoreset["numVariants"]))
+            f.close()
+
+        os.remove(f"{self.upstream}/csv/urn-mavedb-00000003-a-1.scores.csv")
+        os.remove(f"{self.local}/scoreset_data/urn:mavedb:00000003-a-1.csv")
+        self.restart()
+        with self.assertRaises(MaveDBError):
+            self.client.clone(self.local)
+
+    def test_get_model_instances(self):
+        urns = ["urn:mavedb:00000001-a-1", "urn:mavedb:00000009-a-1", "urn:mavedb:00000001-a-1"]
+        results = self.client.get_model_instances(client.ScoreSet, urns)
+        self.assertEqual([result.ok for result in results], [True, False, True])
+        self.assertEqual(results[0].value.urn, urns[0])
+        self.assertIs(results[0].value, results[2].value)
+
+
+class TestSyncOrder(unittest.TestCase):
+    def test_main_json_follows_the_listing_not_the_downloads(self):
+        scoresets = API_SCORESETS[:3]
+
+        def score_route(urn, delay):
+            def route(handler):
+                time.sleep(delay)
+                return 200, {}, score_table(urn)
+
+            return route
+
+        # the client joins base_url and the endpoint with a slash
+        routes = {"/api//scoresets": lambda handler: (200, {}, json.dumps(scoresets))}
+        for position, scoreset in enumerate(scoresets):
+            # the first score table arrives last
+            delay = 0.3 if position == 0 else 0
+            routes[f"/scoreset/{scoreset['urn']}/scores/"] = score_route(scoreset["urn"], delay)
+
+        with tempfile.TemporaryDirectory() as path, StandInServer(routes) as server:
+            c = client.Client(base_url=f"{server.url}api/", session=MaveSession(max_retries=0))
+            changes = c.sync(path, max_workers=3)
+            urns = [scoreset["urn"] for scoreset in scoresets]
+            self.assertEqual(changes["added"], urns)
+            self.assertEqual(main_json_urns(path), urns)
+
+
+class Upload:
+    """
+    A model with the interface post_model_instances uses.
+    """
+
+    def __init__(self, title):
+        self.title = title
+
+    def api_url():
+        return "uploads"
+
+    def post_payload(self):
+        return {"title": self.title}, {}
+
+
+class FileUpload(Upload):
+    """
+    An Upload with an attached file, which records the handles it opened.
+    """
+
+    def __init__(self, title, path):
+        super().__init__(title)
+        self.path = path
+        self.opened = []
+
+    def post_payload(self):
+        f = open(self.path, "rb")
+        self.opened.append(f)
+        return {"title": self.title}, {"scores": ("scores.csv", f, "text/csv")}
+
+
+@contextlib.contextmanager
+def read_only_directory(path):
+    """
+    Makes a directory read-only. Root can write to it anyway, so for root writes below it fail
+    with a PermissionError as well.
+    """
+    os.chmod(path, 0o555)
+    prefix = f"{os.path.abspath(path)}/"
+    open_file, connect = builtins.open, sqlite3.connect
+
+    def denied(target):
+        return PermissionError(errno.EACCES, "Permission denied", str(target))
+
+    def guarded_open(file, mode="r", *args, **kwargs):
+        if isinstance(file, str) and os.path.abspath(file).startswith(prefix) and set(mode) & set("wax+"):
+            raise denied(file)
+        return open_file(file, mode, *args, **kwargs)
+
+    def guarded_connect(database, *args, **kwargs):
+        if isinstance(database, str) and os.path.abspath(database).startswith(prefix):
+            if not os.path.exists(database):
+                raise sqlite3.OperationalError("unable to open database file")
+            return connect(f"file:{os.path.abspath(database)}?mode=ro", *args, uri=True, **kwargs)
+        return connect(database, *args, **kwargs)
+
+    try:
+        if os.geteuid() == 0:
+            with mock.patch("builtins.open", guarded_open), mock.patch("sqlite3.connect", guarded_connect):
+                yield
+        else:
+            yield
+    finally:
+        os.chmod(path, 0o755)
+
+
+class TestReadOnlyClone(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = f"{self.tmp.name}/mavedb"
+        make_clone(self.path, API_SCORESETS)
+        self.cache_home = f"{self.tmp.name}/cache"
+        self.environ = mock.patch.dict(os.environ, {"XDG_CACHE_HOME": self.cache_home})
+        self.environ.start()
+
+    def tearDown(self):
+        self.environ.stop()
+        self.tmp.cleanup()
+
+    def use(self, local_client):
+        urns = ["urn:mavedb:00000001-a-1", "urn:mavedb:00000001-b-1"]
+        experiment_dict = local_client.search_database(keywords=["DMS"], snapshot=True)
+        self.assertEqual(sorted(experiment_dict), urns)
+        self.assertEqual(local_client.query(Term("keyword", "DMS")), urns)
+        self.assertEqual(len(local_client.retrieve_score_arrays("urn:mavedb:00000001-a-1")["score"]), 3)
+        local_client.catalog.close()
+
+    def test_derived_files_fall_back_to_the_user_cache(self):
+        files = sorted(os.listdir(self.path))
+        with read_only_directory(self.path):
+            local_client = client.LocalClient(self.path)
+            self.use(local_client)
+        self.assertEqual(sorted(os.listdir(self.path)), files)
+        self.assertEqual(local_client.work_path, client.user_work_path(self.path))
+        self.assertTrue(local_client.work_path.startswith(self.cache_home))
+        self.assertTrue(os.path.exists(f"{local_client.work_path}/catalog.sqlite"))
+        self.assertTrue(os.path.exists(f"{local_client.work_path}/function_types.json"))
+
+    def test_current_catalog_in_the_clone_is_read(self):
+        client.LocalClient(self.path).catalog.close()
+        with read_only_directory(self.path):
+            local_client = client.LocalClient(self.path)
+            self.assertEqual(local_client.catalog.path, f"{self.path}/catalog.sqlite")
+            self.use(local_client)
+
+
+class TestPostFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = f"{self.tmp.name}/scores.csv"
+        with open(self.path, "w") as f:
+            f.write(score_table("urn:mavedb:00000001-a-1"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_missing_token_opens_no_files(self):
+        upload = FileUpload("a", self.path)
+        c = client.Client(base_url="http://localhost/api/")
+        with self.assertRaises(client.Client.AuthTokenMissingException):
+            c.post_model_instance(upload)
+        self.assertEqual(upload.opened, [])
+
+    def test_files_closed_when_preparing_the_post_fails(self):
+        upload = FileUpload("a", self.path)
+        c = client.Client(base_url="http://localhost/api/", auth_token="token")
+        with mock.patch.object(client, "idempotency_key", side_effect=ValueError("boom")):
+            results = c.post_model_instances([upload], retry=True)
+        self.assertIsInstance(results[0].error, ValueError)
+        self.assertEqual(len(upload.opened), 1)
+        self.assertTrue(upload.opened[0].closed)
+
+
+class TestPostModelInstances(unittest.TestCase):
+    def post(self, **kwargs):
+        routes = {
+            "/api/uploads/": scripted((503, {}, "busy"), (201, {}, "urn:mavedb:00000001-a-1")),
+        }
+        with StandInServer(routes) as server:
+            session = MaveSession(max_retries=2, sleep=lambda delay: None)
+            c = client.Client(base_url=f"{server.url}api/", auth_token="token", session=session)
+            results = c.post_model_instances([Upload("a")], **kwargs)
+            session.close()
+        return results, server.requests
+
+    def test_post_is_not_retried_by_default(self):
+        results, requests = self.post()
+        self.assertFalse(results[0].ok)
+        self.assertEqual(len(requests), 1)
+        self.assertNotIn("Idempotency-Key", requests[0][2])
+
+    def test_retry_sends_an_idempotency_key(self):
+        results, requests = self.post(retry=True)
+        self.assertTrue(results[0].ok)
+        self.assertEqual(results[0].value.text, "urn:mavedb:00000001-a-1")
+        keys = [request[2]["Idempotency-Key"] for request in requests]
+        self.assertEqual(len(keys), 2)
+        self.assertEqual(keys[0], keys[1])
+
+
+class TestParallelParsing(unittest.TestCase):
+    def setUp(self):
+        self.scoresets = [
+            make_api_scoreset(
+                f"urn:mavedb:0000000{n % 4}-{'ab'[n % 2]}-{n}",
+                keywords=["DMS"] if n % 3 else ["other"],
+                num_variants=n,
+                shortDescription="Deep mutational scan of protein stability" if n % 2 else "Binding assay",
+            )
+            for n in range(1, 25)
+        ]
+
+    def parse(self, max_workers, function_type_cache, predicate=None):
+        template = client.ClientTemplate()
+        experiment_dict = template.parse_json_scoreset_list(
+            self.scoresets,
+            keywords=["DMS"],
+            experiment_types=["protein_coding"],
+            function_type_cache=function_type_cache,
+            max_workers=max_workers,
+            predicate=predicate,
+        )
+        scoresets = {urn: list(experiment.scoreset_dict) for urn, experiment in experiment_dict.items()}
+        return scoresets, list(template.selection.report()), template.selection.accepted
+
+    def test_workers_give_the_serial_result(self):
+        warm = FunctionTypeCache(None)
+        for scoreset in self.scoresets[:10]:
+            warm.classify(scoreset)
+        for predicate in (None, NumVariants(minimum=5)):
+            serial_cache, parallel_cache = FunctionTypeCache(None), FunctionTypeCache(None)
+            serial_cache.entries, parallel_cache.entries = dict(warm.entries), dict(warm.entries)
+            serial = self.parse(None, serial_cache, predicate)
+            parallel = self.parse(2, parallel_cache, predicate)
+            self.assertEqual(parallel, serial)
+            self.assertGreater(serial[2], 0)
+            self.assertEqual(parallel_cache.entries, serial_cache.entries)
+            self.assertEqual((parallel_cache.hits, parallel_cache.misses), (serial_cache.hits, serial_cache.misses))
+            self.assertGreater(serial_cache.hits, 0)
+            self.assertGreater(serial_cache.misses, 0)
+            self.assertTrue(parallel_cache.changed)
+
+    def test_unpicklable_predicate_is_parsed_without_workers(self):
+        predicate = Match(lambda scoreset: scoreset["numVariants"] % 2 == 0)
+        serial = self.parse(None, None, predicate)
+        with self.assertLogs(level="WARNING"):
+            parallel = self.parse(2, None, predicate)
+        self.assertEqual(parallel, serial)
+
+
+class TestLocalClientSearch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        make_clone(self.tmp.name, API_SCORESETS)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_search_paths_agree(self):
+        filters = {"keywords": ["DMS"], "organisms": ["Homo sapiens"], "experiment_types": ["protein_coding"]}
+        expected = ["urn:mavedb:00000001-a-1", "urn:mavedb:00000001-b-1"]
+        with_catalog = client.LocalClient(self.tmp.name)
+        without_catalog = client.LocalClient(self.tmp.name, use_catalog=False)
+        for experiment_dict in (
+            with_catalog.search_database(**filters),
+            without_catalog.search_database(**filters),
+            with_catalog.search_database(streaming=True, **filters),
+        ):
+            self.assertEqual(list(experiment_dict), expected)
+            scoreset = experiment_dict[expected[0]].scoreset_dict[expected[0]]
+            self.assertEqual(scoreset.get_score_table_positions(), (3, 1, 4))
+        with_catalog.catalog.close()
+
+    def test_changed_tables_are_not_read_from_the_score_store(self):
+        local_client = client.LocalClient(self.tmp.name, use_catalog=False)
+        local_client.build_score_store()
+        urn = "urn:mavedb:00000001-a-1"
+        self.assertTrue(local_client.in_score_store(urn))
+        self.assertEqual(local_client.retrieve_score_table(urn), score_table(urn))
+
+        # a sync rewrites the table after the store was built
+        f = open(f"{self.tmp.name}/csv/urn-mavedb-00000001-a-1.scores.csv", "w")
+        f.write(score_table(urn, 6))
+        f.close()
+        self.assertFalse(local_client.in_score_store(urn))
+        self.assertEqual(local_client.retrieve_score_table(urn), score_table(urn, 6))
+        self.assertEqual(len(local_client.retrieve_score_arrays(urn)["score"]), 6)
+        self.assertTrue(local_client.in_score_store("urn:mavedb:00000001-a-2"))
+        local_client.score_store.close()
+
+    def test_missing_clone(self):
+        with self.assertRaises(FileNotFoundError):
+            client.LocalClient(f"{self.tmp.name}/typo")
+        self.assertFalse(os.path.exists(f"{self.tmp.name}/typo.d"))
+
+    def test_score_store_from_a_compressed_tar(self):
+        tar_path = f"{self.tmp.name}.tar.gz"
+        with tarfile.open(tar_path, "w:gz") as archive:
+            archive.add(self.tmp.name, arcname="mavedb")
+        local_client = client.LocalClient(tar_path)
+        self.assertFalse(os.path.exists(f"{tar_path}.d"))
+        opened = []
+        open_stream = local_client.clone._open_stream
+        local_client.clone._open_stream = lambda: opened.append(1) or open_stream()
+
+        local_client.build_score_store()
+        self.assertEqual(len(opened), 1)
+        for scoreset in API_SCORESETS:
+            urn = scoreset["urn"]
+            self.assertTrue(local_client.in_score_store(urn))
+            self.assertEqual(local_client.retrieve_score_table(urn), score_table(urn, scoreset["numVariants"]))
+        self.assertEqual(len(opened), 1)
+        local_client.score_store.close()
+        os.remove(tar_path)
+        shutil.rmtree(f"{tar_path}.d")
+
+    def test_compressed_tar_is_packed_on_first_access(self):
+        tar_path = f"{self.tmp.name}.tar.gz"
+        with tarfile.open(tar_path, "w:gz") as archive:
+            archive.add(self.tmp.name, arcname="mavedb")
+        local_client = client.LocalClient(tar_path)
+        self.assertFalse(local_client.clone.random_access)
+        opened = []
+        open_stream = local_client.clone._open_stream
+        local_client.clone._open_stream = lambda: opened.append(1) or open_stream()
+
+        for scoreset in API_SCORESETS:
+            urn = scoreset["urn"]
+            self.assertEqual(local_client.retrieve_score_table(urn), score_table(urn, scoreset["numVariants"]))
+            self.assertEqual(len(local_client.retrieve_score_arrays(urn)["score"]), scoreset["numVariants"])
+        self.assertEqual(len(opened), 1)
+        self.assertTrue(os.path.exists(local_client.score_store_path))
+        local_client.score_store.close()
+        os.remove(tar_path)
+        shutil.rmtree(f"{tar_path}.d")
+
+    def test_attached_clients_share_the_query_index_of_the_catalog(self):
+        local_client = client.LocalClient(self.tmp.name)
+        handle = local_client.share(score_store=False)
+        self.assertIsInstance(local_client.query_index, QueryIndex)
+        local_client.catalog.close()
+        files = {name: os.stat(f"{self.tmp.name}/{name}").st_mtime_ns for name in os.listdir(self.tmp.name)}
+
+        attached = client.LocalClient.attach(handle)
+        self.assertIsInstance(attached.query_index, CatalogQueryIndex)
+        query = Term("keyword", "DMS") & NumVariantsQuery(minimum=4)
+        self.assertEqual(attached.query(query), ["urn:mavedb:00000001-b-1"])
+        attached.search_database(keywords=["DMS"], snapshot=True)
+        attached.retrieve_score_arrays("urn:mavedb:00000001-a-1")
+        self.assertEqual(
+            {name: os.stat(f"{self.tmp.name}/{name}").st_mtime_ns for name in os.listdir(self.tmp.name)}, files
+        )
+        attached.catalog.close()
+
+    def test_queries_and_predicates_are_not_mixed(self):
+        local_client = client.LocalClient(self.tmp.name)
+        with self.assertRaisesRegex(TypeError, "LocalClient.query"):
+            local_client.search_database(predicate=NumVariantsQuery(minimum=3))
+        with self.assertRaisesRegex(TypeError, "search_database"):
+            local_client.query(NumVariants(minimum=3))
+        with self.assertRaises(TypeError):
+            Term("keyword", "DMS") & NumVariants(minimum=3)
+        with self.assertRaises(TypeError):
+            NumVariants(minimum=3) | NumVariantsQuery(minimum=3)
+        local_client.catalog.close()
+
+    def test_catalog_search_reports_all_rejections(self):
+        filters = {"keywords": ["DMS"], "organisms": ["Homo sapiens"], "experiment_types": ["protein_coding"]}
+        reports = []
+        for use_catalog in (True, False):
+            local_client = client.LocalClient(self.tmp.name, use_catalog=use_catalog)
+            local_client.search_database(report=True, **filters)
+            rejections = [rejections for _, rejections, _ in local_client.selection.report()]
+            reports.append((rejections, local_client.selection.accepted))
+            if use_catalog:
+                local_client.catalog.close()
+        self.assertEqual(reports[0], reports[1])
+        self.assertEqual(sum(reports[0][0]), 3)
+        self.assertEqual(reports[0][1], 2)
+
+    def test_predicates_without_key_are_not_snapshotted(self):
+        local_client = client.LocalClient(self.tmp.name)
+        few = Match(lambda scoreset: scoreset["numVariants"] > 3)
+        many = Match(lambda scoreset: scoreset["numVariants"] > 0)
+        few = local_client.search_database(predicate=few, snapshot=True)
+        many = local_client.search_database(predicate=many, snapshot=True)
+        self.assertEqual(list(few), ["urn:mavedb:00000001-b-1", "urn:mavedb:00000003-a-1"])
+        self.assertEqual(len(many), 4)
+        self.assertFalse(os.path.exists(f"{self.tmp.name}/snapshots"))
+        local_client.catalog.close()
+
+    def test_get_experiment_dict_expands_urns(self):
+        for use_catalog in (True, False):
+            local_client = client.LocalClient(self.tmp.name, use_catalog=use_catalog)
+            experiment_dict = local_client.get_experiment_dict(
+                ["urn:mavedb:00000001-a", "urn:mavedb:00000003-a-1", "urn:mavedb:00000009"]
+            )
+            self.assertEqual(
+                list(experiment_dict),
+                ["urn:mavedb:00000001-a-1", "urn:mavedb:00000001-a-2", "urn:mavedb:00000003-a-1"],
+            )
+            if use_catalog:
+                local_client.catalog.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import threading
+import time
+import unittest
+
+from mavetools.client.concurrency import iter_bounded
+
+
+class TestIterBounded(unittest.TestCase):
+    def test_all_items_are_processed(self):
+        results = {item: future.result() for item, future in iter_bounded(lambda x: x * x, range(20), max_workers=4)}
+        self.assertEqual(results, {x: x * x for x in range(20)})
+
+    def test_in_flight_window_is_bounded(self):
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def work(item):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.01)
+            with lock:
+                state["running"] -= 1
+
+        scheduled = []
+
+        def items():
+            for item in range(30):
+                scheduled.append(item)
+                yield item
+
+        yielded = 0
+        for item, future in iter_bounded(work, items(), max_workers=8, max_in_flight=3):
+            yielded += 1
+            self.assertLessEqual(len(scheduled) - yielded, 3)
+        self.assertLessEqual(state["peak"], 3)
+        self.assertEqual(yielded, 30)
+
+    def test_errors_are_kept_per_item(self):
+        def work(item):
+            if item == 3:
+                raise ValueError(item)
+            return item
+
+        errors = [item for item, future in iter_bounded(work, range(6), max_workers=2) if future.exception() is not None]
+        self.assertEqual(errors, [3])
@@ -0,0 +1,199 @@
+import json
+import random
+import tempfile
+import unittest
+
+from mavetools.client.function_type import FunctionTypeCache, KEYWORD_TIERS, KEYWORD_TUPLES, extract_function_type
+from tests.test_client.local_clone import make_scoreset
+
+
+# The keyword search extract_function_type replaced, kept as reference for its semantics
+def reference_function_type(scoreset):
+    function_type = None
+    sd = scoreset['shortDescription']
+    methodText = scoreset['methodText']
+    abstract = scoreset['abstractText']
+    if abstract is None or abstract == '':
+        try:
+            abstract = scoreset['primaryPublicationIdentifiers'][0]['abstract']
+            if abstract is None:
+                abstract = ''
+        except IndexError:
+            abstract = ''
+        second_abstract = ''
+    else:
+        try:
+            second_abstract = scoreset['primaryPublicationIdentifiers'][0]['abstract']
+            if second_abstract is None:
+                second_abstract = ''
+        except IndexError:
+            second_abstract = ''
+
+    prio_binding_keywords = ['transcription ability', 'protein-protein interaction']
+    prio_fitness_keywords = []
+    prio_act_keywords = ['readout of activity', 'fluorescence of Aequorea victoria GFP', 'loss-of-function', 'Functional scores', 'functional scores']
+    prio_exp_keywords = ['variant abundance', 'protein abundance']
+    prio_stabi_keywords = []
+
+    binding_keywords = ['binding', 'Binding', 'Y2H assay']
+    fitness_keywords = ['fitness', 'Fitness', 'pathogenicity', 'saturation prime editing', 'Growth', 'growth', 'toxicity assay', 'TileSeq', 'viral replication', 'complementation', 'based on survival']
+    act_keywords = ['activity', 'Activity']
+    exp_keywords = ['expression', 'Expression', ]
+    stabi_keywords = ['stability', 'Stability', 'folding free energy', 'dG value', 'Protein folding']
+
+    keyword_tuples = [
+        ('OrganismalFitness', fitness_keywords, prio_fitness_keywords),
+        ('Binding', binding_keywords, prio_binding_keywords),
+        ('Activity', act_keywords, prio_act_keywords),
+        ('Expression', exp_keywords, prio_exp_keywords),
+        ('Stability', stabi_keywords, prio_stabi_keywords)
+    ]
+
+    for ft, keywords, prio_keywords in keyword_tuples:
+        for keyword in prio_keywords:
+            if sd.count(keyword) > 0:
+                function_type = ft
+            elif methodText.count(keyword) > 0:
+                function_type = ft
+            if function_type is not None:
+                break
+        if function_type is not None:
+            break
+
+    if function_type is None:
+        for ft, keywords, prio_keywords in keyword_tuples:
+            for keyword in prio_keywords:
+                if abstract.count(keyword) > 0:
+                    function_type = ft
+                    break
+                elif second_abstract.count(keyword) > 0:
+                    function_type = ft
+                    break
+            if function_type is not None:
+                break
+
+    if function_type is None:
+        for ft, keywords, prio_keywords in keyword_tuples:
+            for keyword in keywords:
+                if sd.count(keyword) > 0:
+                    function_type = ft
+                elif methodText.count(keyword) > 0:
+                    function_type = ft
+                if function_type is not None:
+                    break
+            if function_type is not None:
+                break
+
+    if function_type is None:
+        for ft, keywords, prio_keywords in keyword_tuples:
+            for keyword in keywords:
+                if abstract.count(keyword) > 0:
+                    function_type = ft
+                    break
+                elif second_abstract.count(keyword) > 0:
+                    function_type = ft
+                    break
+            if function_type is not None:
+                break
+
+    
+    if function_type is not None:
+        return function_type
+    else:
+        return 'Activity'
+
+
+def random_text(rng, keywords):
+    words = ["assay", "variant", "cells", "the", "of", "scores", "Protein", "ability", "fold"]
+    parts = [rng.choice(words) for _ in range(rng.randint(0, 12))]
+    for _ in range(rng.randint(0, 2)):
+        keyword = rng.choice(keywords)
+        if rng.random() < 0.3:
+            # fragments and run-together words must not change the result either
+            keyword = keyword[: rng.randint(1, len(keyword))] + rng.choice(keywords)
+        parts.insert(rng.randint(0, len(parts)), keyword)
+    return " ".join(parts)
+
+
+class TestExtractFunctionType(unittest.TestCase):
+    def test_matches_reference(self):
+        rng = random.Random(7)
+        keywords = [keyword for tier in KEYWORD_TIERS for keyword, _ in tier]
+        for n in range(3000):
+            abstract = random_text(rng, keywords) if rng.random() < 0.5 else ""
+            publications = [] if rng.random() < 0.3 else [{"abstract": random_text(rng, keywords) if rng.random() < 0.8 else None}]
+            scoreset = {
+                "shortDescription": random_text(rng, keywords),
+                "methodText": random_text(rng, keywords),
+                "abstractText": abstract,
+                "primaryPublicationIdentifiers": publications,
+            }
+            self.assertEqual(extract_function_type(scoreset), reference_function_type(scoreset), scoreset)
+
+    def test_priorities(self):
+        def scoreset(sd="", method="", abstract=""):
+            return {"shortDescription": sd, "methodText": method, "abstractText": abstract, "primaryPublicationIdentifiers": []}
+
+        self.assertEqual(extract_function_type(scoreset()), "Activity")
+        # an earlier function type wins within a step
+        self.assertEqual(extract_function_type(scoreset(sd="stability and growth")), "OrganismalFitness")
+        # priority keywords in the abstract beat other keywords in the description
+        self.assertEqual(extract_function_type(scoreset(sd="growth", abstract="protein abundance")), "Expression")
+        # keywords in the description beat keywords of the same kind in the abstract
+        self.assertEqual(extract_function_type(scoreset(method="Stability", abstract="binding")), "Stability")
+        self.assertEqual(len(KEYWORD_TUPLES), 5)
+
+
+class TestFunctionTypeCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = f"{self.tmp.name}/function_types.json"
+        self.scoresets = [
+            make_scoreset("urn:mavedb:00000001-a-1", shortDescription="Yeast growth"),
+            make_scoreset("urn:mavedb:00000001-a-2", methodText="Binding to the receptor"),
+            make_scoreset("urn:mavedb:00000002-a-1", primaryPublicationIdentifiers=[{"abstract": "protein abundance"}]),
+        ]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_repeat_builds_skip_classification(self):
+        cache = FunctionTypeCache(self.path)
+        labels = [cache.classify(scoreset) for scoreset in self.scoresets]
+        self.assertEqual(labels, ["OrganismalFitness", "Binding", "Expression"])
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+        cache.save()
+
+        cache = FunctionTypeCache(self.path)
+        self.assertEqual([cache.classify(scoreset) for scoreset in self.scoresets], labels)
+        self.assertEqual((cache.hits, cache.misses), (3, 0))
+        self.assertFalse(cache.changed)
+
+    def test_changed_texts_are_classified_again(self):
+        cache = FunctionTypeCache(self.path)
+        cache.classify(self.scoresets[1])
+        changed = dict(self.scoresets[1], methodText="Thermal stability")
+        self.assertEqual(cache.classify(changed), "Stability")
+        self.assertEqual(cache.misses, 2)
+
+    def test_outdated_keyword_table_drops_the_cache(self):
+        cache = FunctionTypeCache(self.path)
+        cache.classify(self.scoresets[0])
+        cache.save()
+        with open(self.path) as f:
+            content = json.load(f)
+        content["version"] = "older rules"
+        with open(self.path, "w") as f:
+            json.dump(content, f)
+        self.assertEqual(FunctionTypeCache(self.path).entries, {})
+
+    def test_report(self):
+        cache = FunctionTypeCache(self.path)
+        for scoreset in self.scoresets:
+            cache.classify(scoreset)
+        self.assertEqual(cache.report()["Binding"], ["urn:mavedb:00000001-a-2"])
+        cache.write_report(f"{self.tmp.name}/report.tsv")
+        with open(f"{self.tmp.name}/report.tsv") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], "urn\tfunction_type\ttext_hash")
+        self.assertEqual(lines[1].split("\t")[:2], ["urn:mavedb:00000001-a-1", "OrganismalFitness"])
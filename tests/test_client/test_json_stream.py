@@ -0,0 +1,41 @@
+import io
+import json
+import tempfile
+import unittest
+
+from mavetools.client.json_stream import iter_array, iter_scoresets
+from tests.test_client.local_clone import DEFAULT_SCORESETS, make_main_json
+
+
+class TestIterArray(unittest.TestCase):
+    def test_matches_json_load(self):
+        main_meta_data = make_main_json(DEFAULT_SCORESETS)
+        text = json.dumps(main_meta_data, indent=2)
+        for chunk_size in (7, 64, 1 << 20):
+            with self.subTest(chunk_size=chunk_size):
+                items = list(iter_array(io.StringIO(text), "experimentSets", chunk_size=chunk_size))
+                self.assertEqual(items, main_meta_data["experimentSets"])
+
+    def test_key_is_only_matched_at_top_level(self):
+        document = {
+            "title": 'a "quoted" title with experimentSets',
+            "nested": {"experimentSets": [1, 2], "list": [{"experimentSets": []}]},
+            "experimentSets": [{"urn": "a\\"}, {"urn": "b"}],
+        }
+        items = list(iter_array(io.StringIO(json.dumps(document)), "experimentSets", chunk_size=5))
+        self.assertEqual(items, document["experimentSets"])
+
+    def test_empty_array(self):
+        self.assertEqual(list(iter_array(io.StringIO('{"experimentSets": [ ]}'), "experimentSets")), [])
+
+    def test_missing_key(self):
+        with self.assertRaises(ValueError):
+            list(iter_array(io.StringIO('{"experiments": []}'), "experimentSets"))
+
+    def test_iter_scoresets(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as f:
+            json.dump(make_main_json(DEFAULT_SCORESETS), f)
+            f.flush()
+            scoresets = list(iter_scoresets(f.name, chunk_size=100))
+        self.assertEqual([scoreset for _, _, scoreset in scoresets], DEFAULT_SCORESETS)
+        self.assertEqual(scoresets[2][:2], ("urn:mavedb:00000001", "urn:mavedb:00000001-b"))
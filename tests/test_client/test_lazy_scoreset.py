@@ -0,0 +1,84 @@
+import pickle
+import tempfile
+import unittest
+
+from mavetools.client.snapshot import clone_fingerprint, load_snapshot, save_snapshot
+from tests.test_client.client_module import client
+from tests.test_client.local_clone import make_api_scoreset, make_clone
+
+# imported after client_module, which stubs structman if it is not installed
+from mavetools.models.scoreset import LazyScoreSet, ScoreSet  # noqa: E402
+
+
+def make_json():
+    scoreset = make_api_scoreset("urn:mavedb:00000001-a-1", keywords=["DMS"])
+    scoreset["datasetColumns"] = {"scoreColumns": ["sd", "exp.score", "score"], "countColumns": []}
+    scoreset["targetGenes"][0]["targetSequence"] = {"sequence": "ATGAAAGTT", "sequenceType": "dna"}
+    return scoreset
+
+
+class TestLazyScoreSet(unittest.TestCase):
+    def setUp(self):
+        self.json = make_json()
+        self.lazy = LazyScoreSet.deserialize(self.json)
+        self.eager = ScoreSet.deserialize(make_json())
+
+    def test_methods_match_scoreset(self):
+        self.assertEqual(self.lazy.get_protein_sequence(), self.eager.get_protein_sequence())
+        self.assertEqual(self.lazy.get_full_sequence_info(), self.eager.get_full_sequence_info())
+        self.assertEqual(self.lazy.get_score_table_positions(), self.eager.get_score_table_positions())
+        self.assertEqual(self.lazy.get_score_table_positions(), (3, 1, 5))
+
+    def test_attributes_are_read_on_first_access(self):
+        self.assertNotIn("urn", self.lazy.__dict__)
+        self.assertEqual(self.lazy.urn, "urn:mavedb:00000001-a-1")
+        self.assertIn("urn", self.lazy.__dict__)
+        self.assertIs(self.lazy.targetGenes, self.json["targetGenes"])
+        self.assertIsNone(self.lazy.corrected_seq)
+        with self.assertRaises(AttributeError):
+            self.lazy.colour
+
+    def test_materialize_round_trip(self):
+        # attrs compares the classes, so a LazyScoreSet is never equal to a ScoreSet
+        self.assertNotEqual(self.lazy, self.eager)
+        self.assertEqual(self.lazy.materialize(), self.eager)
+        self.assertIs(type(self.lazy.materialize()), ScoreSet)
+
+        self.lazy.title = "Changed"
+        self.lazy.corrected_seq = "MKV"
+        materialized = self.lazy.materialize()
+        self.assertEqual(materialized.title, "Changed")
+        self.assertEqual(materialized.corrected_seq, "MKV")
+        self.assertEqual(self.json["title"], "Scoreset urn:mavedb:00000001-a-1")
+
+    def test_pickle_and_snapshot(self):
+        self.lazy.urn
+        copy = pickle.loads(pickle.dumps(self.lazy))
+        self.assertIsInstance(copy, LazyScoreSet)
+        self.assertEqual(copy, self.lazy)
+        self.assertEqual(copy.materialize(), self.eager)
+
+        with tempfile.TemporaryDirectory() as path:
+            make_clone(path, [self.json])
+            fingerprint = clone_fingerprint(path)
+            snapshot_path = f"{path}/snapshots/search.pickle"
+            save_snapshot(snapshot_path, {"urn:mavedb:00000001-a-1": self.lazy}, fingerprint)
+            loaded = load_snapshot(snapshot_path, fingerprint)["urn:mavedb:00000001-a-1"]
+        self.assertEqual(loaded.get_score_table_positions(), self.eager.get_score_table_positions())
+        self.assertEqual(loaded.materialize(), self.eager)
+
+    def test_lazy_search(self):
+        with tempfile.TemporaryDirectory() as path:
+            make_clone(path, [self.json])
+            local_client = client.LocalClient(path)
+            experiment_dict = local_client.search_database(lazy=True, snapshot=True)
+            scoreset = experiment_dict["urn:mavedb:00000001-a-1"].scoreset_dict["urn:mavedb:00000001-a-1"]
+            self.assertIsInstance(scoreset, LazyScoreSet)
+            loaded = local_client.search_database(lazy=True, snapshot=True)
+            scoreset = loaded["urn:mavedb:00000001-a-1"].scoreset_dict["urn:mavedb:00000001-a-1"]
+            self.assertEqual(scoreset.materialize(), self.eager)
+            local_client.catalog.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+
+from mavetools.client.manifest import CloneManifest, write_atomic
+
+
+class TestCloneManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, manifest, relpath, data):
+        size, sha256 = write_atomic(f"{self.path}/{relpath}", data)
+        manifest.mark_complete(relpath, "urn:mavedb:00000001-a-1", "score_table", size, sha256)
+        return sha256
+
+    def test_complete_artifacts_survive_reload(self):
+        with CloneManifest(self.path) as manifest:
+            sha256 = self.write(manifest, "a.csv", b"accession,score\n")
+            manifest.mark_failed("b.csv", "urn:mavedb:00000001-a-2", "score_table", "503")
+
+        manifest = CloneManifest(self.path)
+        self.assertTrue(manifest.is_complete("a.csv"))
+        self.assertTrue(manifest.is_complete("a.csv", sha256=sha256))
+        self.assertFalse(manifest.is_complete("a.csv", sha256="0" * 64))
+        self.assertFalse(manifest.is_complete("b.csv"))
+        self.assertEqual(manifest.failed(), ["b.csv"])
+
+    def test_corrupted_artifact_is_not_complete(self):
+        manifest = CloneManifest(self.path)
+        self.write(manifest, "a.csv", b"accession,score\n")
+        with open(f"{self.path}/a.csv", "wb") as f:
+            f.write(b"accession,sc0re\n")
+        self.assertTrue(manifest.is_complete("a.csv", verify=False))
+        self.assertFalse(manifest.is_complete("a.csv"))
+        os.remove(f"{self.path}/a.csv")
+        self.assertFalse(manifest.is_complete("a.csv", verify=False))
+
+    def test_checkpoints(self):
+        manifest = CloneManifest(self.path, checkpoint_interval=2)
+        self.write(manifest, "a.csv", b"a")
+        self.assertFalse(os.path.exists(manifest.path))
+        self.write(manifest, "b.csv", b"b")
+        self.assertTrue(CloneManifest(self.path).is_complete("b.csv"))
+
+    def test_hexdigest_changes_with_content(self):
+        manifest = CloneManifest(self.path)
+        self.write(manifest, "a.csv", b"a")
+        digest = manifest.hexdigest()
+        self.write(manifest, "a.csv", b"b")
+        self.assertNotEqual(digest, manifest.hexdigest())
@@ -0,0 +1,61 @@
+import gzip
+import tempfile
+import unittest
+from email.parser import BytesParser
+from email.policy import HTTP
+
+from mavetools.client.multipart import StreamingMultipartEncoder
+from mavetools.client.session import MaveSession
+from tests.test_client.stand_in_server import StandInServer, scripted
+
+
+def parse_parts(content_type, body):
+    message = BytesParser(policy=HTTP).parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+    return {part.get_param("name", header="content-disposition"): part for part in message.iter_parts()}
+
+
+class TestStreamingMultipartEncoder(unittest.TestCase):
+    def setUp(self):
+        self.score_data = b"accession,hgvs_nt,hgvs_pro,score\n" * 5000
+        self.f = tempfile.TemporaryFile()
+        self.f.write(self.score_data)
+        self.f.seek(0)
+        self.files = {"score_data": ("score_data.csv", self.f, "application/octet-stream")}
+
+    def tearDown(self):
+        self.f.close()
+
+    def post(self, encoder):
+        with MaveSession() as session, StandInServer({"/upload": scripted((201, {}, ""))}) as server:
+            session.post(f"{server.url}upload", data=encoder, headers={"Content-Type": encoder.content_type})
+        return server.requests[0]
+
+    def test_streams_files(self):
+        progress = []
+        with StreamingMultipartEncoder(
+            {"request": '{"title": "a"}'}, self.files, chunk_size=4096,
+            progress=lambda sent, total: progress.append((sent, total)),
+        ) as encoder:
+            method, path, headers, body = self.post(encoder)
+        self.assertTrue(self.f.closed)
+        self.assertEqual(int(headers["Content-Length"]), len(body))
+        self.assertEqual(progress[-1], (len(body), len(body)))
+        self.assertGreater(len(progress), 10)
+
+        parts = parse_parts(encoder.content_type, body)
+        self.assertEqual(parts["request"].get_content(), '{"title": "a"}')
+        self.assertEqual(parts["score_data"].get_filename(), "score_data.csv")
+        self.assertEqual(parts["score_data"].get_payload(decode=True), self.score_data)
+
+    def test_compresses_files(self):
+        with StreamingMultipartEncoder({"request": "{}"}, self.files, compress=True) as encoder:
+            method, path, headers, body = self.post(encoder)
+        self.assertEqual(headers["Transfer-Encoding"], "chunked")
+        part = parse_parts(encoder.content_type, body)["score_data"]
+        self.assertEqual(part.get_filename(), "score_data.csv.gz")
+        self.assertEqual(gzip.decompress(part.get_payload(decode=True)), self.score_data)
+
+    def test_can_be_iterated_again(self):
+        encoder = StreamingMultipartEncoder({"request": "{}"}, self.files)
+        self.assertEqual(b"".join(encoder), b"".join(encoder))
+        encoder.close()
@@ -0,0 +1,68 @@
+import json
+import unittest
+from urllib.parse import parse_qs, urlparse
+
+from mavetools.client.pagination import build_query_url, iter_pages
+from mavetools.client.session import MaveSession
+from tests.test_client.stand_in_server import StandInServer
+
+
+CATALOGUE = [
+    {"urn": f"urn:mavedb:{n:08d}-a-1", "organism": "Homo sapiens" if n % 3 == 0 else "Mus musculus"}
+    for n in range(25)
+]
+
+
+def paging_route(handler):
+    query = parse_qs(urlparse(handler.path).query)
+    scoresets = CATALOGUE
+    if "organisms" in query:
+        scoresets = [s for s in scoresets if s["organism"] in query["organisms"]]
+    offset = int(query["offset"][0])
+    limit = int(query["limit"][0])
+    return 200, {"Content-Type": "application/json"}, json.dumps(scoresets[offset : offset + limit])
+
+
+class TestIterPages(unittest.TestCase):
+    def setUp(self):
+        self.session = MaveSession()
+
+    def tearDown(self):
+        self.session.close()
+
+    def fetch(self, url):
+        return self.session.get(url).content
+
+    def test_pages_through_listing(self):
+        with StandInServer({"/scoresets": paging_route}) as server:
+            scoresets = list(iter_pages(self.fetch, f"{server.url}scoresets", page_size=10))
+        self.assertEqual(scoresets, CATALOGUE)
+        self.assertEqual(len(server.requests), 3)
+
+    def test_filters_are_sent_to_the_server(self):
+        with StandInServer({"/scoresets": paging_route}) as server:
+            params = {"organisms": ["Homo sapiens"], "keywords": None}
+            scoresets = list(iter_pages(self.fetch, f"{server.url}scoresets", params=params, page_size=5))
+        self.assertEqual(len(scoresets), 9)
+        self.assertTrue(all(s["organism"] == "Homo sapiens" for s in scoresets))
+        self.assertNotIn("keywords", server.requests[0][1])
+
+    def test_server_without_paging(self):
+        route = lambda handler: (200, {}, json.dumps(CATALOGUE))
+        with StandInServer({"/scoresets": route}) as server:
+            scoresets = list(iter_pages(self.fetch, f"{server.url}scoresets", page_size=10))
+        self.assertEqual(scoresets, CATALOGUE)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_server_ignoring_offset(self):
+        route = lambda handler: (200, {}, json.dumps(CATALOGUE[:10]))
+        with StandInServer({"/scoresets": route}) as server:
+            scoresets = list(iter_pages(self.fetch, f"{server.url}scoresets", page_size=10))
+        self.assertEqual(scoresets, CATALOGUE[:10])
+
+    def test_build_query_url(self):
+        self.assertEqual(build_query_url("a/scoresets", {"x": None}), "a/scoresets")
+        self.assertEqual(
+            build_query_url("a/scoresets", {"organisms": ["A b", "C"], "limit": 5}),
+            "a/scoresets?organisms=A+b&organisms=C&limit=5",
+        )
@@ -0,0 +1,149 @@
+import pickle
+import unittest
+
+from mavetools.client.predicates import (
+    And,
+    Categories,
+    Field,
+    HasTargetGenes,
+    Keywords,
+    License,
+    Match,
+    NumVariants,
+    Organisms,
+    PublicationYear,
+    Selection,
+    publication_year,
+    search_predicate,
+)
+from tests.test_client.local_clone import make_scoreset
+
+
+def has_title(scoreset):
+    return bool(scoreset.get("title"))
+
+
+def make_scoresets():
+    return [
+        make_scoreset("urn:mavedb:00000001-a-1", keywords=["DMS"], num_variants=10, license={"shortName": "CC0"}),
+        make_scoreset("urn:mavedb:00000002-a-1", organism="Mus musculus", num_variants=500),
+        make_scoreset("urn:mavedb:00000003-a-1", keywords=["DMS"], category="other_noncoding", num_variants=200),
+        make_scoreset("urn:mavedb:00000004-a-1", keywords=["DMS"], targetGenes=[], num_variants=300),
+        make_scoreset(
+            "urn:mavedb:00000005-a-1",
+            keywords=["DMS", "MAVE"],
+            num_variants=1000,
+            license={"shortName": "CC BY 4.0"},
+            primaryPublicationIdentifiers=[{"identifier": "1", "publicationYear": 2019}],
+        ),
+    ]
+
+
+def urns(scoresets):
+    return [scoreset["urn"][-6:] for scoreset in scoresets]
+
+
+class TestPredicates(unittest.TestCase):
+    def setUp(self):
+        self.scoresets = make_scoresets()
+
+    def select(self, predicate):
+        return urns(scoreset for scoreset in self.scoresets if predicate(scoreset))
+
+    def test_leaf_predicates(self):
+        self.assertEqual(self.select(Keywords("MAVE", "other")), ["05-a-1"])
+        self.assertEqual(self.select(Organisms("Mus musculus")), ["02-a-1"])
+        self.assertEqual(self.select(HasTargetGenes()), ["01-a-1", "02-a-1", "03-a-1", "05-a-1"])
+        self.assertEqual(self.select(Categories("other_noncoding")), ["03-a-1"])
+        self.assertEqual(self.select(NumVariants(200, 500)), ["02-a-1", "03-a-1", "04-a-1"])
+        self.assertEqual(self.select(NumVariants(maximum=100)), ["01-a-1"])
+        self.assertEqual(self.select(License("CC0", "CC BY 4.0")), ["01-a-1", "05-a-1"])
+        self.assertEqual(self.select(PublicationYear(2018, 2020)), ["05-a-1"])
+        self.assertEqual(self.select(Field(("targetGenes", 0, "name"), "GENEa-1")), ["01-a-1", "02-a-1", "03-a-1", "05-a-1"])
+        self.assertEqual(self.select(Field("numVariants", 10, 1000)), ["01-a-1", "05-a-1"])
+        self.assertEqual(len(self.select(Match(has_title))), 5)
+
+    def test_composition(self):
+        predicate = (Keywords("DMS") & NumVariants(minimum=100)) | Organisms("Mus musculus")
+        self.assertEqual(self.select(predicate), ["02-a-1", "03-a-1", "04-a-1", "05-a-1"])
+        self.assertEqual(self.select(Keywords("DMS") & ~Categories("other_noncoding")), ["01-a-1", "04-a-1", "05-a-1"])
+
+    def test_and_is_flat_and_ordered_by_cost(self):
+        predicate = Keywords("DMS") & (Organisms("Homo sapiens") & NumVariants(minimum=1))
+        self.assertEqual([type(p).__name__ for p in predicate.predicates], ["NumVariants", "Organisms", "Keywords"])
+
+    def test_equality_and_keys(self):
+        self.assertEqual(Keywords("DMS") & NumVariants(1), NumVariants(1) & Keywords("DMS"))
+        self.assertNotEqual(Keywords("DMS"), Organisms("DMS"))
+        self.assertEqual(len({Field("title", "a"), Field(("title",), "a"), Field("title", "b")}), 2)
+        self.assertEqual(
+            (Keywords("DMS") & ~License("CC0")).key(), ("And", ("Not", ("License", "CC0")), ("Keywords", "DMS"))
+        )
+
+        self.assertEqual(Match(has_title), Match(has_title))
+        self.assertEqual(pickle.loads(pickle.dumps(Match(has_title))), Match(has_title))
+        key = Match(has_title).key()
+        self.assertEqual(key[:2], ("Match", f"{__name__}.has_title"))
+        self.assertEqual(key, Match(has_title).key())
+
+    def test_lambdas_are_distinct_and_have_no_key(self):
+        first = Match(lambda scoreset: True, name="test")
+        second = Match(lambda scoreset: False, name="test")
+        self.assertNotEqual(first, second)
+        self.assertEqual(len({first, second}), 2)
+        self.assertEqual(repr(first), repr(second))
+        self.assertIsNone(first.key())
+        self.assertIsNone((Keywords("DMS") & first).key())
+
+        def nested(scoreset):
+            return True
+
+        self.assertIsNone(Match(nested).key())
+
+    def test_publication_year_falls_back_to_published_date(self):
+        self.assertEqual(publication_year({"publishedDate": "2021-05-01"}), 2021)
+        self.assertIsNone(publication_year({}))
+
+
+class TestSelection(unittest.TestCase):
+    def test_counts_rejections_per_conjunct(self):
+        predicate = search_predicate(keywords=["DMS"], experiment_types=["protein_coding"], predicate=NumVariants(minimum=100))
+        for timed in (False, True):
+            selection = Selection(predicate, timed=timed)
+            self.assertEqual(urns(selection.filter(make_scoresets())), ["05-a-1"])
+            report = {repr(conjunct): rejections for conjunct, rejections, _ in selection.report()}
+            self.assertEqual(
+                report,
+                {
+                    "HasTargetGenes()": 1,
+                    "NumVariants(100, None)": 1,
+                    "Categories('protein_coding')": 1,
+                    "Keywords('DMS')": 1,
+                },
+            )
+            self.assertEqual(selection.accepted, 1)
+            seconds = [seconds for _, _, seconds in selection.report()]
+            if timed:
+                self.assertTrue(all(value >= 0 for value in seconds))
+            else:
+                self.assertEqual(seconds, [None] * 4)
+
+    def test_pickle_and_merge(self):
+        selection = Selection(search_predicate(keywords=["DMS"], predicate=Match(has_title)), timed=True)
+        copy = pickle.loads(pickle.dumps(selection))
+        self.assertEqual(len(list(copy.filter(make_scoresets()))), 3)
+        selection.merge(copy)
+        selection.merge(copy)
+        self.assertEqual(selection.accepted, 6)
+        self.assertEqual(sum(rejections for _, rejections, _ in selection.report()), 4)
+        # the compiled function keeps counting after a merge
+        list(selection.filter(make_scoresets()))
+        self.assertEqual(selection.accepted, 9)
+
+    def test_empty_predicate(self):
+        selection = Selection(And())
+        self.assertEqual(len(list(selection.filter(make_scoresets()))), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import tempfile
+import unittest
+
+from mavetools.client.catalog import Catalog
+from mavetools.client.query import CatalogQueryIndex, NumVariantsQuery, QueryIndex, Term, scoreset_terms
+from tests.test_client.local_clone import DEFAULT_SCORESETS, make_clone, make_scoreset
+
+
+ANNOTATED = make_scoreset(
+    "urn:mavedb:00000004-a-1",
+    primaryPublicationIdentifiers=[{"identifier": "29785012", "dbName": "PubMed", "doi": "10.1016/j.cels.2018.01.015"}],
+    doiIdentifiers=[{"identifier": "10.1101/2020.01.01"}],
+)
+ANNOTATED["targetGenes"][0]["externalIdentifiers"] = [
+    {"identifier": {"dbName": "UniProt", "identifier": "P38398"}, "offset": 0},
+    {"identifier": {"dbName": "RefSeq", "identifier": "NP_009225"}, "offset": 0},
+]
+SCORESETS = DEFAULT_SCORESETS + [ANNOTATED]
+
+
+class TestQueryIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = QueryIndex(SCORESETS)
+
+    def test_scoreset_terms(self):
+        terms = scoreset_terms(ANNOTATED)
+        self.assertEqual(terms["uniprot"], {"P38398"})
+        self.assertEqual(terms["refseq"], {"NP_009225"})
+        self.assertEqual(terms["pubmed"], {"29785012"})
+        self.assertEqual(terms["doi"], {"10.1016/j.cels.2018.01.015", "10.1101/2020.01.01"})
+        self.assertEqual(terms["target"], {"GENEa-1"})
+
+    def test_terms(self):
+        self.assertEqual(
+            self.index.select(Term("keyword", "DMS")),
+            ["urn:mavedb:00000001-a-1", "urn:mavedb:00000001-b-1"],
+        )
+        self.assertEqual(self.index.select(Term("uniprot", "P38398")), ["urn:mavedb:00000004-a-1"])
+        self.assertEqual(self.index.select(Term("organism", "Danio rerio")), [])
+        with self.assertRaises(ValueError):
+            self.index.select(Term("colour", "blue"))
+
+    def test_num_variants_ranges(self):
+        self.assertEqual(
+            self.index.select(NumVariantsQuery(minimum=5)),
+            ["urn:mavedb:00000001-b-1", "urn:mavedb:00000003-a-1"],
+        )
+        self.assertEqual(self.index.select(NumVariantsQuery(maximum=4, minimum=4)), [])
+        self.assertEqual(len(self.index.select(NumVariantsQuery())), 6)
+
+    def test_composition(self):
+        query = (Term("keyword", "stability") | Term("organism", "Mus musculus", "Saccharomyces cerevisiae")) & Term(
+            "category", "protein_coding"
+        )
+        self.assertEqual(
+            self.index.select(query),
+            ["urn:mavedb:00000001-a-2", "urn:mavedb:00000001-b-1", "urn:mavedb:00000003-a-1"],
+        )
+        self.assertEqual(
+            self.index.select(query & NumVariantsQuery(maximum=5)),
+            ["urn:mavedb:00000001-a-2", "urn:mavedb:00000001-b-1"],
+        )
+
+    def test_loaded_from_catalog(self):
+        with tempfile.TemporaryDirectory() as path:
+            make_clone(path, SCORESETS)
+            catalog = Catalog.for_clone(path)
+            CatalogQueryIndex.build(catalog)
+            index = QueryIndex.from_catalog(catalog)
+            self.assertEqual(index.source, catalog.meta("source"))
+            self.assertEqual(index.positions, self.index.positions)
+            self.assertEqual(index.postings, self.index.postings)
+            self.assertEqual(index.num_variants_urns, self.index.num_variants_urns)
+            self.assertEqual(index.select(Term("pubmed", "29785012")), ["urn:mavedb:00000004-a-1"])
+            catalog.close()
+
+
+class TestCatalogQueryIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        make_clone(self.tmp.name, SCORESETS)
+        self.catalog = Catalog.for_clone(self.tmp.name)
+
+    def tearDown(self):
+        self.catalog.close()
+        self.tmp.cleanup()
+
+    def test_agrees_with_query_index(self):
+        self.assertFalse(CatalogQueryIndex.is_built(self.catalog))
+        index = CatalogQueryIndex.for_catalog(self.catalog)
+        self.assertTrue(CatalogQueryIndex.is_built(self.catalog))
+        expected = QueryIndex(SCORESETS)
+        queries = [
+            Term("keyword", "DMS"),
+            Term("uniprot", "P38398"),
+            Term("organism", "Danio rerio"),
+            NumVariantsQuery(minimum=5),
+            NumVariantsQuery(maximum=4, minimum=4),
+            (Term("keyword", "stability") | Term("organism", "Mus musculus", "Saccharomyces cerevisiae"))
+            & Term("category", "protein_coding")
+            & NumVariantsQuery(maximum=5),
+        ]
+        for query in queries:
+            self.assertEqual(index.select(query), expected.select(query))
+        self.assertEqual(sorted(index.values("doi")), sorted(expected.values("doi")))
+        self.assertEqual(len(index), 6)
+        with self.assertRaises(ValueError):
+            index.select(Term("colour", "blue"))
+
+    def test_read_only_catalog_is_not_written(self):
+        read_only = Catalog(self.catalog.path, read_only=True)
+        with self.assertRaises(ValueError):
+            CatalogQueryIndex.build(read_only)
+        read_only.close()
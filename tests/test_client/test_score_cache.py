@@ -0,0 +1,51 @@
+import math
+import os
+import tempfile
+import time
+import unittest
+
+from mavetools.client.score_cache import ScoreArrayCache, parse_score_table
+
+
+TABLE = (
+    "# Accession: urn:mavedb:00000001-a-1\n"
+    "accession,hgvs_nt,hgvs_splice,hgvs_pro,score,exp.score\n"
+    "urn:mavedb:00000001-a-1#1,c.1A>G,NA,p.Met1Val,0.5,1.5\n"
+    "urn:mavedb:00000001-a-1#2,NA,NA,p.Lys2Ter,0.1,NA\n"
+)
+
+
+class TestParseScoreTable(unittest.TestCase):
+    def test_columns(self):
+        arrays = parse_score_table(TABLE)
+        self.assertEqual(list(arrays["hgvs_pro"]), ["p.Met1Val", "p.Lys2Ter"])
+        self.assertEqual(list(arrays["hgvs_nt"]), ["c.1A>G", "NA"])
+        self.assertEqual(arrays["score"][0], 1.5)
+        self.assertTrue(math.isnan(arrays["score"][1]))
+
+
+class TestScoreArrayCache(unittest.TestCase):
+    def test_parses_once_until_table_changes(self):
+        urn = "urn:mavedb:00000001-a-1"
+        reads = []
+        with tempfile.TemporaryDirectory() as path:
+            source = f"{path}/table.csv"
+            with open(source, "w") as f:
+                f.write(TABLE)
+            cache = ScoreArrayCache(f"{path}/csv_cache")
+
+            def read_text():
+                reads.append(1)
+                with open(source) as f:
+                    return f.read()
+
+            first = cache.get(urn, source, read_text)
+            second = cache.get(urn, source, read_text)
+            self.assertEqual(len(reads), 1)
+            self.assertEqual(list(first["hgvs_pro"]), list(second["hgvs_pro"]))
+            self.assertTrue(os.path.exists(f"{path}/csv_cache/urn-mavedb-00000001-a-1.npz"))
+
+            later = time.time() + 10
+            os.utime(source, (later, later))
+            cache.get(urn, source, read_text)
+            self.assertEqual(len(reads), 2)
@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from mavetools.client.score_cache import parse_score_table
+from mavetools.client.score_store import PackedScoreStore
+from tests.test_client.local_clone import score_table
+
+
+class TestPackedScoreStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = f"{self.tmp.name}/scores.pack"
+        self.tables = {
+            f"urn:mavedb:0000000{n}-a-1": score_table(f"urn:mavedb:0000000{n}-a-1", rows=n)
+            for n in range(4)
+        }
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        PackedScoreStore.build(self.path, self.tables.items()).close()
+        with PackedScoreStore(self.path) as store:
+            self.assertEqual(sorted(store.urns()), sorted(self.tables))
+            for urn, text in self.tables.items():
+                self.assertEqual(store.get_text(urn), text)
+                expected = parse_score_table(text)
+                arrays = store.get_arrays(urn)
+                for column in expected:
+                    np.testing.assert_array_equal(arrays[column], expected[column])
+            self.assertNotIn("urn:mavedb:00000009-a-1", store)
+
+    def test_arrays_are_read_only_views(self):
+        with PackedScoreStore.build(self.path, self.tables.items()) as store:
+            scores = store.get_arrays("urn:mavedb:00000003-a-1")["score"]
+            self.assertFalse(scores.flags.writeable)
+            self.assertFalse(scores.flags.owndata)
+            self.assertEqual(scores.ctypes.data % 64, 0)
+        # The mapping outlives the store while views on it exist
+        self.assertEqual(len(scores), 3)
+
+    def test_is_fresh(self):
+        tables = [(urn, text, f"{len(text)}:1") for urn, text in self.tables.items()]
+        with PackedScoreStore.build(self.path, tables) as store:
+            urn, text = next(iter(self.tables.items()))
+            self.assertTrue(store.is_fresh(urn, f"{len(text)}:1"))
+            self.assertFalse(store.is_fresh(urn, f"{len(text)}:2"))
+            self.assertFalse(store.is_fresh("urn:mavedb:00000009-a-1", f"{len(text)}:1"))
+
+    def test_empty_store(self):
+        with PackedScoreStore.build(self.path, []) as store:
+            self.assertEqual(len(store), 0)
+
+    def test_index_of_another_build_is_detected(self):
+        PackedScoreStore.build(self.path, self.tables.items()).close()
+        rebuilt = f"{self.tmp.name}/rebuilt/scores.pack"
+        tables = [(urn, text.replace("0.5", "1.5")) for urn, text in self.tables.items()]
+        PackedScoreStore.build(rebuilt, tables).close()
+
+        # a reader between the two replaces of a rebuild sees the new pack with the old index
+        shutil.copy(rebuilt, self.path)
+        with mock.patch("time.sleep"), self.assertRaises(ValueError):
+            PackedScoreStore(self.path)
+
+        # and opens both again once the index is replaced
+        with mock.patch("time.sleep", lambda delay: shutil.copy(f"{rebuilt}.json", f"{self.path}.json")):
+            with PackedScoreStore(self.path) as store:
+                self.assertEqual(store.get_text("urn:mavedb:00000002-a-1"), tables[2][1])
+        self.assertFalse(os.path.exists(f"{self.path}.part"))
@@ -0,0 +1,106 @@
+import json
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from mavetools.client.cache import ResponseCache
+from mavetools.client.exceptions import MaveDBHTTPError
+from mavetools.client.pagination import iter_pages
+from mavetools.client.server import ResponseLRU
+from mavetools.client.session import MaveSession
+from tests.test_client.local_clone import DEFAULT_SCORESETS, make_clone, score_table
+from tests.test_client.stand_in_server import ServedClone
+
+
+class TestMaveDBServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        make_clone(self.tmp.name, DEFAULT_SCORESETS)
+        self.served = ServedClone(self.tmp.name)
+        self.served.start()
+        self.server = self.served.server
+        self.session = MaveSession(max_retries=0)
+
+    def tearDown(self):
+        self.session.close()
+        self.served.stop()
+        self.tmp.cleanup()
+
+    def fetch(self, url):
+        return self.session.get(url).content
+
+    def test_listing_with_filters_and_paging(self):
+        base_url = self.server.base_url
+        # Client joins base_url and "/scoresets"
+        scoresets = list(iter_pages(self.fetch, f"{base_url}/scoresets", page_size=2))
+        self.assertEqual(scoresets, DEFAULT_SCORESETS)
+
+        params = {"keywords": ["DMS"], "organisms": ["Homo sapiens"]}
+        scoresets = list(iter_pages(self.fetch, f"{base_url}/scoresets", params=params, page_size=1))
+        self.assertEqual([s["urn"] for s in scoresets], ["urn:mavedb:00000001-a-1", "urn:mavedb:00000001-b-1"])
+
+    def test_models_and_score_tables(self):
+        base_url = self.server.base_url
+        urn = "urn:mavedb:00000001-b-1"
+        self.assertEqual(json.loads(self.fetch(f"{base_url}scoresets/{urn}/")), DEFAULT_SCORESETS[2])
+        experiment = json.loads(self.fetch(f"{base_url}experiments/urn:mavedb:00000001-a/"))
+        self.assertEqual(experiment["scoreSetUrns"], ["urn:mavedb:00000001-a-1", "urn:mavedb:00000001-a-2"])
+        self.assertEqual(experiment["experimentSetUrn"], "urn:mavedb:00000001")
+
+        score_url = f"{base_url.replace('api/', '')}scoreset/{urn}/scores/"
+        self.assertEqual(self.fetch(score_url).decode(), score_table(urn, 5))
+
+        with self.assertRaises(MaveDBHTTPError) as context:
+            self.fetch(f"{base_url}scoresets/urn:mavedb:00000009-a-1/")
+        self.assertEqual(context.exception.status_code, 404)
+
+    def test_gzip_etag_and_lru(self):
+        url = f"{self.server.base_url}/scoresets"
+        r = self.session.get(url, headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(r.headers["Content-Encoding"], "gzip")
+        self.assertEqual(r.json(), DEFAULT_SCORESETS)
+
+        r = self.session.get(url, headers={"If-None-Match": r.headers["ETag"]})
+        self.assertEqual(r.status_code, 304)
+        self.assertEqual(self.server.cache.hits, 1)
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResponseCache(directory)
+            first = cache.fetch(self.session, url)
+            self.assertEqual(cache.fetch(self.session, url), first)
+
+    def test_concurrent_readers(self):
+        urls = [f"{self.server.base_url}scoresets/{s['urn']}/" for s in DEFAULT_SCORESETS] * 20
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            bodies = list(executor.map(lambda url: json.loads(self.fetch(url)), urls))
+        self.assertEqual(bodies, DEFAULT_SCORESETS * 20)
+
+    def test_threads_read_through_their_own_connections(self):
+        barrier = threading.Barrier(2)
+
+        def catalog(_):
+            catalog = self.server.catalog
+            barrier.wait(5)
+            return catalog
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first, second = executor.map(catalog, range(2))
+        self.assertIsNot(first, second)
+        self.assertTrue(first.read_only and second.read_only)
+        self.assertIsNot(first, self.served.local_client.catalog)
+        self.assertEqual(second.get(DEFAULT_SCORESETS[0]["urn"]), DEFAULT_SCORESETS[0])
+
+
+class TestResponseLRU(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        lru = ResponseLRU(max_bytes=10)
+        lru.put("a", {"body": b"aaaa"})
+        lru.put("b", {"body": b"bbbb"})
+        lru.get("a")
+        lru.put("c", {"body": b"cccc"})
+        self.assertIsNone(lru.get("b"))
+        self.assertIsNotNone(lru.get("a"))
+        self.assertEqual(lru.size, 8)
+        lru.put("huge", {"body": b"x" * 11})
+        self.assertIsNone(lru.get("huge"))
@@ -0,0 +1,102 @@
+import gzip
+import hashlib
+import os
+import tempfile
+import unittest
+
+from mavetools.client.exceptions import MaveDBConnectionError, MaveDBHTTPError
+from mavetools.client.session import MaveSession, parse_retry_after
+from tests.test_client.stand_in_server import StandInServer, scripted
+
+
+class TestMaveSession(unittest.TestCase):
+    def setUp(self):
+        self.sleeps = []
+        self.session = MaveSession(max_retries=3, backoff_factor=0.5, sleep=self.sleeps.append)
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_retries_transient_errors(self):
+        route = scripted((503, {}, "busy"), (502, {}, "busy"), (200, {}, "ok"))
+        with StandInServer({"/scores": route}) as server:
+            r = self.session.get(f"{server.url}scores")
+        self.assertEqual(r.text, "ok")
+        self.assertEqual(self.sleeps, [0.5, 1.0])
+
+    def test_honours_retry_after(self):
+        route = scripted((429, {"Retry-After": "7"}, ""), (200, {}, "ok"))
+        with StandInServer({"/scores": route}) as server:
+            self.session.get(f"{server.url}scores")
+        self.assertEqual(self.sleeps, [7.0])
+
+    def test_gives_up_after_max_retries(self):
+        with StandInServer({"/scores": scripted((503, {}, "busy"))}) as server:
+            with self.assertRaises(MaveDBHTTPError) as cm:
+                self.session.get(f"{server.url}scores")
+        self.assertEqual(cm.exception.status_code, 503)
+        self.assertEqual(len(server.requests), 4)
+
+    def test_client_errors_are_not_retried(self):
+        with StandInServer({}) as server:
+            with self.assertRaises(MaveDBHTTPError) as cm:
+                self.session.get(f"{server.url}missing")
+        self.assertEqual(cm.exception.status_code, 404)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_post_is_not_retried_by_default(self):
+        with StandInServer({"/upload": scripted((503, {}, "busy"))}) as server:
+            with self.assertRaises(MaveDBHTTPError):
+                self.session.post(f"{server.url}upload", data={"a": "b"})
+        self.assertEqual(len(server.requests), 1)
+
+    def test_idempotent_post_is_retried(self):
+        route = scripted((503, {}, "busy"), (201, {}, "urn:mavedb:00000001-a-1"))
+        with StandInServer({"/upload": route}) as server:
+            r = self.session.post(f"{server.url}upload", data={"a": "b"}, idempotent=True)
+        self.assertEqual(r.status_code, 201)
+        self.assertEqual([request[3] for request in server.requests], [b"a=b", b"a=b"])
+
+    def test_connection_error(self):
+        with StandInServer({}) as server:
+            url = server.url
+        with self.assertRaises(MaveDBConnectionError):
+            self.session.get(url)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+
+
+class TestDownload(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.session = MaveSession(sleep=lambda delay: None)
+        self.table = "accession,hgvs_nt,hgvs_pro,score\n" * 1000
+
+    def tearDown(self):
+        self.session.close()
+        self.tmp.cleanup()
+
+    def test_download_accepts_gzip_transfer(self):
+        body = gzip.compress(self.table.encode())
+        route = scripted((200, {"Content-Encoding": "gzip"}, body))
+        filepath = f"{self.tmp.name}/table.csv"
+        with StandInServer({"/scores": route}) as server:
+            size, sha256 = self.session.download(f"{server.url}scores", filepath, chunk_size=100)
+        self.assertEqual(server.requests[0][2]["Accept-Encoding"], "gzip")
+        with open(filepath) as f:
+            self.assertEqual(f.read(), self.table)
+        self.assertEqual(size, len(self.table))
+        self.assertEqual(sha256, hashlib.sha256(self.table.encode()).hexdigest())
+
+    def test_download_compressed(self):
+        filepath = f"{self.tmp.name}/table.csv.gz"
+        with StandInServer({"/scores": scripted((200, {}, self.table))}) as server:
+            size, sha256 = self.session.download(f"{server.url}scores", filepath, compress=True)
+        with open(filepath, "rb") as f:
+            data = f.read()
+        self.assertEqual(gzip.decompress(data).decode(), self.table)
+        self.assertEqual((size, sha256), (len(data), hashlib.sha256(data).hexdigest()))
+        self.assertFalse(os.path.exists(f"{filepath}.part"))
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from mavetools.client.manifest import CloneManifest
+from mavetools.client.snapshot import clone_fingerprint, load_snapshot, save_snapshot
+from tests.test_client.local_clone import DEFAULT_SCORESETS, make_clone
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = self.tmp.name
+        make_clone(self.path, DEFAULT_SCORESETS)
+        self.snapshot_path = f"{self.path}/snapshots/search.pickle"
+        self.experiment_dict = {"urn:mavedb:00000001-a": {"urn:mavedb:00000001-a-1": [1, 2, 3]}}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        fingerprint = clone_fingerprint(self.path)
+        save_snapshot(self.snapshot_path, self.experiment_dict, fingerprint, key=(["DMS"], None))
+        self.assertEqual(load_snapshot(self.snapshot_path, fingerprint, key=(["DMS"], None)), self.experiment_dict)
+        self.assertIsNone(load_snapshot(self.snapshot_path, fingerprint, key=(["stability"], None)))
+        self.assertIsNone(load_snapshot(f"{self.path}/snapshots/missing.pickle", fingerprint))
+
+    def test_invalidated_when_main_json_changes(self):
+        save_snapshot(self.snapshot_path, self.experiment_dict, clone_fingerprint(self.path))
+        make_clone(self.path, DEFAULT_SCORESETS[:2])
+        os.utime(f"{self.path}/main.json", ns=(1, 1))
+        self.assertIsNone(load_snapshot(self.snapshot_path, clone_fingerprint(self.path)))
+
+    def test_invalidated_when_manifest_changes(self):
+        with CloneManifest(self.path) as manifest:
+            manifest.mark_complete("csv/a.scores.csv", "urn:mavedb:00000001-a-1", "scores", 10, "0" * 64)
+        fingerprint = clone_fingerprint(self.path)
+        self.assertIn("manifest:", fingerprint)
+        save_snapshot(self.snapshot_path, self.experiment_dict, fingerprint)
+        self.assertEqual(load_snapshot(self.snapshot_path, clone_fingerprint(self.path)), self.experiment_dict)
+
+        with CloneManifest(self.path) as manifest:
+            manifest.mark_complete("csv/a.scores.csv", "urn:mavedb:00000001-a-1", "scores", 11, "1" * 64)
+        self.assertIsNone(load_snapshot(self.snapshot_path, clone_fingerprint(self.path)))
+
+    def test_invalidated_when_main_json_changes_with_manifest(self):
+        with CloneManifest(self.path) as manifest:
+            manifest.mark_complete("csv/a.scores.csv", "urn:mavedb:00000001-a-1", "scores", 10, "0" * 64)
+        save_snapshot(self.snapshot_path, self.experiment_dict, clone_fingerprint(self.path))
+        make_clone(self.path, DEFAULT_SCORESETS[:2])
+        os.utime(f"{self.path}/main.json", ns=(1, 1))
+        self.assertIsNone(load_snapshot(self.snapshot_path, clone_fingerprint(self.path)))
+
+    def test_invalidated_when_classifier_changes(self):
+        fingerprint = clone_fingerprint(self.path)
+        save_snapshot(self.snapshot_path, self.experiment_dict, fingerprint)
+        with mock.patch("mavetools.client.snapshot.classifier_version", return_value="changed"):
+            self.assertIsNone(load_snapshot(self.snapshot_path, fingerprint))
+        self.assertEqual(load_snapshot(self.snapshot_path, fingerprint), self.experiment_dict)
+
+    def test_corrupt_snapshot(self):
+        os.makedirs(os.path.dirname(self.snapshot_path))
+        with open(self.snapshot_path, "wb") as f:
+            f.write(b"not a pickle")
+        self.assertIsNone(load_snapshot(self.snapshot_path, clone_fingerprint(self.path)))
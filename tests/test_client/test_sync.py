@@ -0,0 +1,61 @@
+import tempfile
+import unittest
+
+from mavetools.client.sync import MainJsonTree, parent_urns, scoreset_version
+
+
+def make_scoreset(urn, modification_date="2023-01-01", **fields):
+    scoreset = {"urn": urn, "modificationDate": modification_date, "currentVersion": "1"}
+    scoreset.update(fields)
+    return scoreset
+
+
+class TestScoresetVersion(unittest.TestCase):
+    def test_version_fields(self):
+        scoreset = make_scoreset("urn:mavedb:00000001-a-1", supersedingScoreSet={"urn": "urn:mavedb:00000001-a-2"})
+        self.assertEqual(scoreset_version(scoreset), ["2023-01-01", "1", "urn:mavedb:00000001-a-2"])
+
+    def test_parent_urns(self):
+        self.assertEqual(
+            parent_urns(make_scoreset("urn:mavedb:00000001-a-1")),
+            ("urn:mavedb:00000001-a", "urn:mavedb:00000001"),
+        )
+        scoreset = make_scoreset(
+            "tmp:1", experiment={"urn": "urn:mavedb:00000002-b", "experimentSetUrn": "urn:mavedb:00000002"}
+        )
+        self.assertEqual(parent_urns(scoreset), ("urn:mavedb:00000002-b", "urn:mavedb:00000002"))
+
+
+class TestMainJsonTree(unittest.TestCase):
+    def test_put_replaces_and_inserts(self):
+        tree = MainJsonTree(
+            {
+                "experimentSets": [
+                    {
+                        "urn": "urn:mavedb:00000001",
+                        "experiments": [
+                            {"urn": "urn:mavedb:00000001-a", "scoreSets": [make_scoreset("urn:mavedb:00000001-a-1")]}
+                        ],
+                    }
+                ]
+            }
+        )
+        tree.put(make_scoreset("urn:mavedb:00000001-a-1", "2024-01-01"))
+        tree.put(make_scoreset("urn:mavedb:00000001-a-2"))
+        tree.put(make_scoreset("urn:mavedb:00000003-a-1"))
+
+        experiment_sets = tree.main_meta_data["experimentSets"]
+        self.assertEqual(len(experiment_sets), 2)
+        scoresets = experiment_sets[0]["experiments"][0]["scoreSets"]
+        self.assertEqual([s["urn"] for s in scoresets], ["urn:mavedb:00000001-a-1", "urn:mavedb:00000001-a-2"])
+        self.assertEqual(scoresets[0]["modificationDate"], "2024-01-01")
+        self.assertEqual(experiment_sets[1]["experiments"][0]["urn"], "urn:mavedb:00000003-a")
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as path:
+            tree = MainJsonTree.load(f"{path}/main.json")
+            tree.put(make_scoreset("urn:mavedb:00000001-a-1"))
+            tree.save(f"{path}/main.json")
+            tree = MainJsonTree.load(f"{path}/main.json")
+        self.assertIsNotNone(tree.get("urn:mavedb:00000001-a-1"))
+        self.assertIsNone(tree.get("urn:mavedb:00000001-a-2"))
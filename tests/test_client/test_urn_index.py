@@ -0,0 +1,51 @@
+import tempfile
+import unittest
+
+from mavetools.client.catalog import Catalog
+from mavetools.client.urn_index import UrnIndex
+from tests.test_client.local_clone import DEFAULT_SCORESETS, make_clone
+
+
+class TestUrnIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = UrnIndex(
+            [
+                ("urn:mavedb:00000001", "urn:mavedb:00000001-a", "urn:mavedb:00000001-a-1"),
+                ("urn:mavedb:00000001", "urn:mavedb:00000001-a", "urn:mavedb:00000001-a-2"),
+                ("urn:mavedb:00000001", "urn:mavedb:00000001-b", "urn:mavedb:00000001-b-1"),
+                ("urn:mavedb:00000002", "urn:mavedb:00000002-a", "urn:mavedb:00000002-a-1"),
+            ]
+        )
+
+    def test_expand_urn(self):
+        self.assertEqual(self.index.expand_urn("urn:mavedb:00000001-a-2"), ["urn:mavedb:00000001-a-2"])
+        self.assertEqual(
+            self.index.expand_urn("urn:mavedb:00000001-a"),
+            ["urn:mavedb:00000001-a-1", "urn:mavedb:00000001-a-2"],
+        )
+        self.assertEqual(
+            self.index.expand_urn("urn:mavedb:00000001"),
+            ["urn:mavedb:00000001-a-1", "urn:mavedb:00000001-a-2", "urn:mavedb:00000001-b-1"],
+        )
+        with self.assertRaises(KeyError):
+            self.index.expand_urn("urn:mavedb:00000001-c")
+
+    def test_expand_deduplicates_and_reports_missing(self):
+        scoreset_urns, missing = self.index.expand(
+            ["urn:mavedb:00000002-a", "urn:mavedb:00000001-a-1", "urn:mavedb:00000009", "urn:mavedb:00000001-a"]
+        )
+        self.assertEqual(
+            scoreset_urns,
+            ["urn:mavedb:00000002-a-1", "urn:mavedb:00000001-a-1", "urn:mavedb:00000001-a-2"],
+        )
+        self.assertEqual(missing, ["urn:mavedb:00000009"])
+
+    def test_from_catalog(self):
+        with tempfile.TemporaryDirectory() as path:
+            make_clone(path, DEFAULT_SCORESETS)
+            catalog = Catalog.for_clone(path)
+            index = catalog.urn_index()
+            scoreset_urns, missing = index.expand(["urn:mavedb:00000001"])
+            self.assertEqual(len(scoreset_urns), 3)
+            self.assertEqual([s["urn"] for s in catalog.get_many(reversed(scoreset_urns))], scoreset_urns[::-1])
+            catalog.close()